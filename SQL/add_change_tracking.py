@@ -0,0 +1,46 @@
+import os
+import sys
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.documents import TABLE_NAMES
+from scraper.common.snapshots import add_change_tracking_columns
+
+load_dotenv()
+
+# Database connection
+def create_connection():
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv('DB_HOST'),
+            user=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD'),
+            database=os.getenv('DB_DATABASE')
+        )
+        if connection.is_connected():
+            print("Connected to MySQL database")
+            return connection
+    except Error as e:
+        print(f"Error: {e}")
+        return None
+
+
+# Add the ingested_at/updated_at columns read by the snapshot tool.
+# Existing rows get the time of the migration in both columns, so the first
+# delta snapshot after it is a full export.
+def main():
+    connection = create_connection()
+    if connection:
+        for table in TABLE_NAMES:
+            try:
+                add_change_tracking_columns(connection, table)
+            except Error as e:
+                print(f"Error altering table '{table}': {e}")
+        connection.close()
+        print("MySQL connection closed.")
+
+
+if __name__ == '__main__':
+    main()
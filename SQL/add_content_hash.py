@@ -0,0 +1,44 @@
+import os
+import sys
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.content_hash import add_content_hash_column, HASHED_TABLES
+
+load_dotenv()
+
+# Database connection
+def create_connection():
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv('DB_HOST'),
+            user=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD'),
+            database=os.getenv('DB_DATABASE')
+        )
+        if connection.is_connected():
+            print("Connected to MySQL database")
+            return connection
+    except Error as e:
+        print(f"Error: {e}")
+        return None
+
+
+# Add the indexed content_hash column used by the skip-unchanged upserts.
+# Existing rows keep a NULL hash and are rewritten once on their next upsert.
+def main():
+    connection = create_connection()
+    if connection:
+        for table in HASHED_TABLES:
+            try:
+                add_content_hash_column(connection, table)
+            except Error as e:
+                print(f"Error altering table '{table}': {e}")
+        connection.close()
+        print("MySQL connection closed.")
+
+
+if __name__ == '__main__':
+    main()
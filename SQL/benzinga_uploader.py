@@ -6,6 +6,14 @@ from dotenv import load_dotenv
 from bs4 import BeautifulSoup
 from datetime import datetime
 import pytz
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.content_hash import upsert_changed
+from scraper.common.instrumentation import timed, instrumented_run
+from scraper.common.tickers import ticker_rows, split_joined, replace_article_tickers, ROLE_STOCK, ROLE_CHANNEL
+from scraper.common.search_index import index_articles, tickers_by_article
+from scraper.common.near_dup import index_documents
 
 load_dotenv()
 
@@ -41,6 +49,7 @@ def alter_table_columns_to_datetime(connection):
     except Error as e:
         print(f"Error altering table: {e}")
 
+@timed()
 def extract_text_from_html(html):
     # Create a BeautifulSoup object to parse the HTML
     soup = BeautifulSoup(html, 'html.parser')
@@ -53,6 +62,7 @@ def extract_text_from_html(html):
 
     return cleaned_text
 
+@timed()
 def convert_to_edt_datetime(date_str):
     # Parse the date string into a naive datetime object (ignoring timezone for now)
     naive_datetime = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %z')
@@ -63,33 +73,57 @@ def convert_to_edt_datetime(date_str):
 
     return edt_datetime.strftime('%Y-%m-%d %H:%M:%S')
 
+# Column values for one Benzinga article, in benzinga_db column order
+def benzinga_row_values(row):
+    return (
+        row.get('id'),
+        row.get('author'),
+        convert_to_edt_datetime(row.get('created')),
+        convert_to_edt_datetime(row.get('updated')),
+        row.get('title'),
+        extract_text_from_html(row.get('teaser')),
+        extract_text_from_html(row.get('body')),
+        row.get('url'),
+        ','.join([stock['name'] for stock in row.get('stocks', [])]),
+        ','.join([channel['name'] for channel in row.get('channels', [])]),
+        1  # The source_id for Benzinga data is 1
+    )
+
 # Parse jsonl file and insert into table
+@timed()
 def insert_data(connection, data):
     insert_query = """
-    INSERT INTO benzinga_db (id, author, created, updated, title, teaser, body, url, stocks, channels, source_id)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    INSERT INTO benzinga_db (id, author, created, updated, title, teaser, body, url, stocks, channels, source_id, content_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     ON DUPLICATE KEY UPDATE
         author=VALUES(author), created=VALUES(created), updated=VALUES(updated),
         title=VALUES(title), teaser=VALUES(teaser), body=VALUES(body), url=VALUES(url),
-        stocks=VALUES(stocks), channels=VALUES(channels), source_id=VALUES(source_id);
+        stocks=VALUES(stocks), channels=VALUES(channels), source_id=VALUES(source_id),
+        content_hash=VALUES(content_hash);
     """
-    cursor = connection.cursor()
-
-    for row in data:
-        cursor.execute(insert_query, (
-            row.get('id'),
-            row.get('author'),
-            convert_to_edt_datetime(row.get('created')),
-            convert_to_edt_datetime(row.get('updated')),
-            row.get('title'),
-            extract_text_from_html(row.get('teaser')),
-            extract_text_from_html(row.get('body')),
-            row.get('url'),
-            ','.join([stock['name'] for stock in row.get('stocks', [])]),
-            ','.join([channel['name'] for channel in row.get('channels', [])]),
-            1  # The source_id for Benzinga data is 1
-        ))
-    connection.commit()
+    rows = [benzinga_row_values(row) for row in data]
+
+    # Rows whose content hash is unchanged are skipped
+    stats = upsert_changed(connection, 'benzinga_db', insert_query, rows, use_cache=False)
+
+    # Normalized stock/channel rows for the articles that were written
+    written = [row for row in rows if str(row[0]) in stats['written_ids']]
+    tickers = []
+    for row in written:
+        tickers += ticker_rows(1, row[0], row[2], split_joined(row[8]), ROLE_STOCK)
+        tickers += ticker_rows(1, row[0], row[2], split_joined(row[9]), ROLE_CHANNEL)
+    try:
+        replace_article_tickers(connection, 1, [row[0] for row in written], tickers)
+    except Error as e:
+        print(f"Error writing article_ticker rows: {e}")
+
+    # Full-text index of the written articles (title, body, stocks)
+    symbols = tickers_by_article(tickers)
+    index_articles([(1, row[0], row[2], row[4], row[6], symbols.get(str(row[0]))) for row in written])
+
+    # Cluster ids in the cross-source near-duplicate index (id, body)
+    index_documents([(1, row[0], row[6]) for row in rows])
+    return stats
 
 # Read all jsonl files from directory
 def process_files(connection, directory):
@@ -103,6 +137,7 @@ def process_files(connection, directory):
 
 
 # Main function to run the process
+@instrumented_run('benzinga_uploader')
 def main():
     connection = create_connection()
     if connection:
@@ -0,0 +1,364 @@
+"""
+Bulk loader for historical backfills.
+
+Instead of one INSERT per row, JSONL files are transformed (HTML stripped,
+timestamps normalized) into a temporary TSV, loaded into a staging table with
+LOAD DATA LOCAL INFILE, and merged into the target table with a single
+INSERT ... SELECT ... ON DUPLICATE KEY UPDATE per chunk. The merged rows are
+then read back from the staging table in pages and get the same article_ticker
+rows, search-index entries and near-duplicate clusters as the scrapers write.
+
+The server must allow local infile (local_infile=ON). For the benchmark, run
+against a throwaway local database, for example:
+
+    docker run -d --name scraper-mysql -p 3306:3306 -e MYSQL_ROOT_PASSWORD=root \
+        -e MYSQL_DATABASE=scraper mysql:8 --local-infile=1
+
+    python bulk_loader.py benzinga ../data/benzinga_data/*.jsonl --benchmark
+"""
+import os
+import sys
+import json
+import glob
+import time
+import tempfile
+import argparse
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.content_hash import with_content_hash
+from scraper.common.tickers import ticker_rows, split_joined, replace_article_tickers, ROLE_STOCK, ROLE_CHANNEL
+from scraper.common.ticker_extraction import extract_ticker_rows
+from scraper.common.search_index import index_articles, tickers_by_article
+from scraper.common.near_dup import index_documents
+
+from SQL.benzinga_uploader import benzinga_row_values, insert_data as insert_benzinga_rows
+from SQL.nasdaq_uploader import nasdaq_row_values, insert_data as insert_nasdaq_rows
+from SQL.reddit_uploader import reddit_row_values, insert_reddit_data as insert_reddit_rows
+
+load_dotenv()
+
+# Rows per LOAD DATA + merge round. Bounds the temp file and transaction size.
+CHUNK_ROWS = 200000
+
+# Merged rows read back from the staging table per page for tickers and indexes
+INDEX_PAGE_ROWS = 5000
+
+
+# article_ticker rows of merged rows, as the scrapers build them
+def benzinga_tickers(connection, rows):
+    tickers = []
+    for row in rows:
+        tickers += ticker_rows(1, row[0], row[2], split_joined(row[8]), ROLE_STOCK)
+        tickers += ticker_rows(1, row[0], row[2], split_joined(row[9]), ROLE_CHANNEL)
+    return tickers
+
+
+def nasdaq_tickers(connection, rows):
+    return extract_ticker_rows(connection, 2, [(row[0], row[2], f"{row[1] or ''}\n{row[3] or ''}") for row in rows])
+
+
+def reddit_tickers(connection, rows):
+    return extract_ticker_rows(connection, 3, [(row[0], row[2], f"{row[3] or ''}\n{row[4] or ''}") for row in rows])
+
+
+# Target table, column order, columns refreshed on duplicate key, row transforms,
+# and what the tickers and indexes are built from
+TABLES = {
+    'benzinga': {
+        'table': 'benzinga_db',
+        'columns': ['id', 'author', 'created', 'updated', 'title', 'teaser', 'body', 'url',
+                    'stocks', 'channels', 'source_id', 'content_hash'],
+        'update_columns': ['author', 'created', 'updated', 'title', 'teaser', 'body', 'url',
+                           'stocks', 'channels', 'source_id', 'content_hash'],
+        'row_values': benzinga_row_values,
+        'insert_rows': insert_benzinga_rows,
+        'source_id': 1,
+        'tickers': benzinga_tickers,
+        'index_columns': ('created', 'title', 'body'),
+        'near_dup': True,
+    },
+    'nasdaq': {
+        'table': 'nasdaq_db',
+        'columns': ['id', 'title', 'datetime', 'body', 'url', 'source_id', 'content_hash'],
+        'update_columns': ['title', 'datetime', 'body', 'url', 'source_id', 'content_hash'],
+        'row_values': nasdaq_row_values,
+        'insert_rows': insert_nasdaq_rows,
+        'source_id': 2,
+        'tickers': nasdaq_tickers,
+        'index_columns': ('datetime', 'title', 'body'),
+        'near_dup': True,
+    },
+    'reddit': {
+        'table': 'reddit_submission',
+        'columns': ['id', 'subreddit', 'created_utc', 'title', 'selftext', 'url', 'score',
+                    'num_comments', 'ups', 'author', 'source_id', 'content_hash'],
+        'update_columns': ['subreddit', 'created_utc', 'title', 'selftext', 'url', 'score',
+                           'num_comments', 'ups', 'author', 'content_hash'],
+        'row_values': reddit_row_values,
+        'insert_rows': insert_reddit_rows,
+        'source_id': 3,
+        'tickers': reddit_tickers,
+        'index_columns': ('created_utc', 'title', 'selftext'),
+        'near_dup': False,
+    },
+}
+
+# Escapes for MySQL's default LOAD DATA format (tab separated, backslash escaped)
+TSV_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': '\\0',
+})
+
+
+# Database connection with LOAD DATA LOCAL enabled
+def create_connection():
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv('DB_HOST'),
+            user=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD'),
+            database=os.getenv('DB_DATABASE'),
+            allow_local_infile=True
+        )
+        if connection.is_connected():
+            print("Connected to MySQL database")
+            return connection
+    except Error as e:
+        print(f"Error: {e}")
+        return None
+
+
+def read_jsonl(paths):
+    """Yield rows from JSONL files one line at a time, skipping the null lines of unextracted articles."""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    row = json.loads(line)
+                    if isinstance(row, dict):
+                        yield row
+
+
+def to_tsv_field(value):
+    if value is None:
+        return '\\N'
+    return str(value).translate(TSV_ESCAPES)
+
+
+def write_tsv(rows, row_values, file):
+    """
+    Transform rows and write them as TSV lines.
+
+    Returns:
+        tuple: (rows written, rows skipped because they could not be transformed)
+    """
+    written = skipped = 0
+    for row in rows:
+        # Scrapers write null lines for articles they could not extract
+        if not isinstance(row, dict):
+            skipped += 1
+            continue
+        try:
+            values = with_content_hash(row_values(row))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Skipping row {row.get('id') or row.get('url')}: {e}")
+            skipped += 1
+            continue
+        file.write('\t'.join(to_tsv_field(value) for value in values))
+        file.write('\n')
+        written += 1
+    return written, skipped
+
+
+def index_chunk(connection, spec, staging, written_ids):
+    """
+    Writes article_ticker rows and search-index entries for the staged rows
+    that were written, and near-duplicate clusters for every staged row, the
+    same as the scrapers do after an upsert.
+    """
+    columns = spec['columns']
+    source_id = spec['source_id']
+    published, title, body = (columns.index(column) for column in spec['index_columns'])
+    cursor = connection.cursor()
+    last_id = None
+
+    try:
+        while True:
+            # Keyset pagination on the primary key, so each page is a range scan
+            if last_id is None:
+                cursor.execute(f"SELECT {', '.join(columns)} FROM {staging} ORDER BY id LIMIT %s;",
+                               (INDEX_PAGE_ROWS,))
+            else:
+                cursor.execute(f"SELECT {', '.join(columns)} FROM {staging} WHERE id > %s ORDER BY id LIMIT %s;",
+                               (last_id, INDEX_PAGE_ROWS))
+            page = cursor.fetchall()
+            if not page:
+                break
+            last_id = page[-1][0]
+
+            written = [row for row in page if str(row[0]) in written_ids]
+            tickers = []
+            try:
+                tickers = spec['tickers'](connection, written)
+                replace_article_tickers(connection, source_id, [row[0] for row in written], tickers)
+            except Error as e:
+                print(f"Error writing article_ticker rows: {e}")
+
+            symbols = tickers_by_article(tickers)
+            index_articles([(source_id, row[0], row[published], row[title], row[body], symbols.get(str(row[0])))
+                            for row in written])
+            if spec['near_dup']:
+                index_documents([(source_id, row[0], row[body]) for row in page])
+    finally:
+        cursor.close()
+
+
+def load_chunk(connection, spec, tsv_path):
+    """
+    Load one TSV file into a staging table, merge it into the target table,
+    and write the tickers and index entries of the merged rows.
+    """
+    table = spec['table']
+    staging = f"{table}_staging"
+    columns = ', '.join(spec['columns'])
+    # Columns only change when the content hash differs. content_hash is assigned
+    # last, because later assignments see the values set by earlier ones.
+    updates = ', '.join(
+        f"{column}=IF({table}.content_hash <=> VALUES(content_hash), {table}.{column}, VALUES({column}))"
+        for column in spec['update_columns'] if column != 'content_hash'
+    ) + ", content_hash=VALUES(content_hash)"
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging};")
+        cursor.execute(f"CREATE TEMPORARY TABLE {staging} LIKE {table};")
+        # REPLACE keeps the last copy of a duplicated id, like the row-by-row upsert
+        cursor.execute(f"""
+        LOAD DATA LOCAL INFILE %s
+        REPLACE INTO TABLE {staging}
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+        ({columns});
+        """, (tsv_path,))
+        # Rows the merge will write: new ids and ids whose content hash changed
+        cursor.execute(f"""
+        SELECT s.id FROM {staging} s LEFT JOIN {table} t ON t.id = s.id
+        WHERE NOT (t.content_hash <=> s.content_hash);
+        """)
+        written_ids = {str(article_id) for (article_id,) in cursor.fetchall()}
+        cursor.execute(f"""
+        INSERT INTO {table} ({columns})
+        SELECT {columns} FROM {staging}
+        ON DUPLICATE KEY UPDATE {updates};
+        """)
+        connection.commit()
+        index_chunk(connection, spec, staging, written_ids)
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging};")
+    finally:
+        cursor.close()
+
+
+def bulk_load(connection, source, rows, chunk_rows=CHUNK_ROWS):
+    """
+    Bulk load rows of one source into its table.
+
+    Args:
+        connection: MySQL connection opened with allow_local_infile=True.
+        source (str): 'benzinga', 'nasdaq' or 'reddit'.
+        rows (iterable): Raw JSONL rows, as written by the scrapers.
+        chunk_rows (int, optional): Rows per LOAD DATA + merge round.
+
+    Returns:
+        tuple: (rows loaded, rows skipped)
+    """
+    spec = TABLES[source]
+    rows = iter(rows)
+    loaded = skipped = 0
+
+    while True:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.tsv', delete=False) as file:
+            tsv_path = file.name
+            chunk = (row for _, row in zip(range(chunk_rows), rows))
+            written, chunk_skipped = write_tsv(chunk, spec['row_values'], file)
+        try:
+            if written:
+                load_chunk(connection, spec, tsv_path)
+        finally:
+            os.remove(tsv_path)
+
+        loaded += written
+        skipped += chunk_skipped
+        if written + chunk_skipped < chunk_rows:
+            break
+        print(f"Loaded {loaded} rows into {spec['table']} so far.")
+
+    return loaded, skipped
+
+
+def benchmark(connection, source, paths):
+    """
+    Time the row-by-row uploader against the bulk path on the same files.
+    Both write the article_ticker rows and index entries of what they load,
+    so they are timed doing the same work. The target table is truncated
+    before each run, so only use a scratch database.
+    """
+    spec = TABLES[source]
+    cursor = connection.cursor()
+    results = {}
+
+    cursor.execute(f"TRUNCATE TABLE {spec['table']};")
+    started = time.perf_counter()
+    spec['insert_rows'](connection, list(read_jsonl(paths)))
+    results['row_by_row'] = time.perf_counter() - started
+
+    cursor.execute(f"TRUNCATE TABLE {spec['table']};")
+    started = time.perf_counter()
+    loaded, _ = bulk_load(connection, source, read_jsonl(paths))
+    results['bulk'] = time.perf_counter() - started
+    cursor.close()
+
+    for mode, seconds in results.items():
+        print(f"{mode:>10}: {loaded} rows in {seconds:.2f}s ({loaded / seconds:,.0f} rows/sec)")
+    print(f"Speedup: {results['row_by_row'] / results['bulk']:.1f}x")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk load scraped JSONL files with LOAD DATA LOCAL INFILE.")
+    parser.add_argument('source', choices=sorted(TABLES))
+    parser.add_argument('paths', nargs='+', help="JSONL files or glob patterns")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Compare against the row-by-row uploader (truncates the target table)")
+    args = parser.parse_args(argv)
+
+    paths = sorted(path for pattern in args.paths for path in glob.glob(pattern))
+    if not paths:
+        print("No JSONL files matched.")
+        return 1
+
+    connection = create_connection()
+    if not connection:
+        return 1
+
+    try:
+        if args.benchmark:
+            benchmark(connection, args.source, paths)
+        else:
+            loaded, skipped = bulk_load(connection, args.source, read_jsonl(paths), args.chunk_rows)
+            print(f"Loaded {loaded} rows into {TABLES[args.source]['table']} ({skipped} skipped).")
+    finally:
+        connection.close()
+        print("MySQL connection closed.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
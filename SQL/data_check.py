@@ -1,8 +1,12 @@
 import os
+import sys
 import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.streaming import iter_rows, release_cursor
+
 table_name = 'seeking_alpha_db'
 
 
@@ -27,20 +31,24 @@ def create_connection():
 # Function to check if data exists in the table
 def check_data(connection):
     check_query = f"SELECT * FROM {table_name} LIMIT 10;"  # Modify the query as needed
-    cursor = connection.cursor(dictionary=True)  # dictionary=True to return rows as dicts
+    cursor = connection.cursor(buffered=False)  # Rows are streamed as tuples
 
     try:
         cursor.execute(check_query)
-        results = cursor.fetchall()
-
-        if results:
-            print(f"Data found in '{table_name}':")
-            for row in results:
-                print(row)
-        else:
+        columns = [column[0] for column in cursor.description]
+
+        found = 0
+        for row in iter_rows(cursor):
+            if not found:
+                print(f"Data found in '{table_name}':")
+            print(dict(zip(columns, row)))
+            found += 1
+        if not found:
             print(f"No data found in '{table_name}'.")
     except Error as e:
         print(f"Error while checking data: {e}")
+    finally:
+        release_cursor(connection, cursor)
 
 # Main function to run the process
 def main():
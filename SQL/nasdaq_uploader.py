@@ -7,6 +7,15 @@ from bs4 import BeautifulSoup
 from datetime import datetime
 import pytz
 import hashlib
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.content_hash import upsert_changed
+from scraper.common.instrumentation import timed, instrumented_run
+from scraper.common.tickers import replace_article_tickers
+from scraper.common.ticker_extraction import extract_ticker_rows
+from scraper.common.search_index import index_articles, tickers_by_article
+from scraper.common.near_dup import index_documents
 
 load_dotenv()
 
@@ -48,6 +57,7 @@ def create_table(connection):
 
 
 # Function to convert date string to EDT datetime
+@timed()
 def convert_to_edt_datetime(date_str):
     # Define possible date formats
     formats = [
@@ -96,28 +106,49 @@ def generate_id_from_url(url):
     return unique_id
 
 
+# Column values for one Nasdaq article, in nasdaq_db column order
+def nasdaq_row_values(row):
+    return (
+        generate_id_from_url(row.get('url','')),
+        row.get('title'),
+        convert_to_edt_datetime(row.get('date','')),
+        row.get('body'),
+        row.get('url'),
+        2  # source_id for Nasdaq is 2
+    )
+
+
 # Insert Nasdaq data into the table
+@timed()
 def insert_data(connection, data):
     insert_query = """
-    INSERT INTO nasdaq_db (id, title, datetime, body, url, source_id)
-    VALUES (%s, %s, %s, %s, %s, %s)
+    INSERT INTO nasdaq_db (id, title, datetime, body, url, source_id, content_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
     ON DUPLICATE KEY UPDATE
         title=VALUES(title), datetime=VALUES(datetime), body=VALUES(body),
-        url=VALUES(url), source_id=VALUES(source_id);
+        url=VALUES(url), source_id=VALUES(source_id), content_hash=VALUES(content_hash);
     """
-    cursor = connection.cursor()
+    rows = [nasdaq_row_values(row) for row in data if row is not None]
 
-    # Insert the data with source_id = 2 for Nasdaq
-    for row in data:
-        cursor.execute(insert_query, (
-            generate_id_from_url(row.get('url','')),
-            row.get('title'),
-            convert_to_edt_datetime(row.get('date','')),
-            row.get('body'),
-            row.get('url'),
-            2  # source_id for Nasdaq is 2
-        ))
-    connection.commit()
+    # Rows whose content hash is unchanged are skipped
+    stats = upsert_changed(connection, 'nasdaq_db', insert_query, rows, use_cache=False)
+
+    # Tickers extracted from the title and text of the rows that were written
+    written = [row for row in rows if str(row[0]) in stats['written_ids']]
+    tickers = []
+    try:
+        tickers = extract_ticker_rows(connection, 2, [(row[0], row[2], f"{row[1] or ''}\n{row[3] or ''}") for row in written])
+        replace_article_tickers(connection, 2, [row[0] for row in written], tickers)
+    except Error as e:
+        print(f"Error writing article_ticker rows: {e}")
+
+    # Full-text index of the written articles (title, body, tickers)
+    symbols = tickers_by_article(tickers)
+    index_articles([(2, row[0], row[2], row[1], row[3], symbols.get(str(row[0]))) for row in written])
+
+    # Cluster ids in the cross-source near-duplicate index (id, body)
+    index_documents([(2, row[0], row[3]) for row in rows])
+    return stats
 
 
 # Process a single JSON file and insert into the database
@@ -129,6 +160,7 @@ def process_file(connection, file_path):
 
 
 # Main function to run the process
+@instrumented_run('nasdaq_uploader')
 def main():
     connection = create_connection()
     if connection:
@@ -5,6 +5,14 @@ from mysql.connector import Error
 from datetime import datetime
 import pytz
 from dotenv import load_dotenv
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.content_hash import upsert_changed
+from scraper.common.instrumentation import timed, instrumented_run
+from scraper.common.tickers import replace_article_tickers
+from scraper.common.ticker_extraction import extract_ticker_rows
+from scraper.common.search_index import index_articles, tickers_by_article
 
 load_dotenv()
 
@@ -70,6 +78,7 @@ def alter_reddit_table(connection):
 
 
 # Convert the 'created_utc' field to Eastern Time DATETIME format for SQL
+@timed()
 def convert_to_eastern_datetime(utc_string):
     # Convert from the format '2019-07-01T20:54:49Z' to a Python datetime object
     utc_datetime = datetime.strptime(utc_string, '%Y-%m-%dT%H:%M:%SZ')
@@ -84,34 +93,53 @@ def convert_to_eastern_datetime(utc_string):
     return eastern_datetime.strftime('%Y-%m-%d %H:%M:%S')
 
 
+# Column values for one Reddit submission, in reddit_submission column order
+def reddit_row_values(row):
+    return (
+        row['id'],
+        row['subreddit'],
+        convert_to_eastern_datetime(row['created_utc']),
+        row['title'],
+        row['selftext'],
+        row['url'],
+        row['score'],
+        row['num_comments'],
+        row['ups'],
+        row['author'],
+        3  # Reddit submission is source_id 3
+    )
+
+
 # Insert reddit post data into the SQL table
+@timed()
 def insert_reddit_data(connection, data):
     insert_query = """
-    INSERT INTO reddit_submission (id, subreddit, created_utc, title, selftext, url, score, num_comments, ups, author, source_id)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    INSERT INTO reddit_submission (id, subreddit, created_utc, title, selftext, url, score, num_comments, ups, author, source_id, content_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     ON DUPLICATE KEY UPDATE
         subreddit=VALUES(subreddit), created_utc=VALUES(created_utc), 
         title=VALUES(title), selftext=VALUES(selftext), url=VALUES(url), 
-        score=VALUES(score), num_comments=VALUES(num_comments), ups=VALUES(ups), author=VALUES(author);
+        score=VALUES(score), num_comments=VALUES(num_comments), ups=VALUES(ups), author=VALUES(author),
+        content_hash=VALUES(content_hash);
     """
-    cursor = connection.cursor()
-
-    # Loop through each post and insert it into the database
-    for row in data:
-        cursor.execute(insert_query, (
-            row['id'],
-            row['subreddit'],
-            convert_to_eastern_datetime(row['created_utc']),
-            row['title'],
-            row['selftext'],
-            row['url'],
-            row['score'],
-            row['num_comments'],
-            row['ups'],
-            row['author'],
-            3  # Reddit submission is source_id 3
-        ))
-    connection.commit()
+    rows = [reddit_row_values(row) for row in data]
+
+    # Rows whose content hash is unchanged are skipped
+    stats = upsert_changed(connection, 'reddit_submission', insert_query, rows, use_cache=False)
+
+    # Tickers extracted from the title and selftext of the rows that were written
+    written = [row for row in rows if str(row[0]) in stats['written_ids']]
+    tickers = []
+    try:
+        tickers = extract_ticker_rows(connection, 3, [(row[0], row[2], f"{row[3] or ''}\n{row[4] or ''}") for row in written])
+        replace_article_tickers(connection, 3, [row[0] for row in written], tickers)
+    except Error as e:
+        print(f"Error writing article_ticker rows: {e}")
+
+    # Full-text index of the written posts (title, selftext, tickers)
+    symbols = tickers_by_article(tickers)
+    index_articles([(3, row[0], row[2], row[3], row[4], symbols.get(str(row[0]))) for row in written])
+    return stats
 
 
 # Process JSONL file and insert into the database
@@ -123,6 +151,7 @@ def process_reddit_file(connection, file_path):
 
 
 # Main function to create the table and upload the data
+@instrumented_run('reddit_uploader')
 def main():
     connection = create_connection()
     if connection:
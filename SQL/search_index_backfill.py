@@ -0,0 +1,116 @@
+import os
+import sys
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.search_index import SearchIndex, INDEX_PATH_ENV
+
+load_dotenv()
+
+# Source rows read per keyset page
+PAGE_SIZE = 10000
+
+# (table, published column, title column, body expression)
+SOURCES = [
+    ('benzinga_db', 'created', 'title', 'body'),
+    ('nasdaq_db', 'datetime', 'title', 'body'),
+    ('reddit_submission', 'created_utc', 'title', 'selftext'),
+    ('seeking_alpha_db', 'published_on', 'title', 'COALESCE(content, summary)'),
+]
+
+
+# Database connection
+def create_connection():
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv('DB_HOST'),
+            user=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD'),
+            database=os.getenv('DB_DATABASE')
+        )
+        if connection.is_connected():
+            print("Connected to MySQL database")
+            return connection
+    except Error as e:
+        print(f"Error: {e}")
+        return None
+
+
+# Tickers of a page of articles from article_ticker, {(source_id, article_id): [ticker, ...]}
+def fetch_tickers(cursor, page):
+    ids = [str(record[0]) for record in page]
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(
+        f"SELECT source_id, article_id, ticker FROM article_ticker "
+        f"WHERE article_id IN ({placeholders}) AND role <> 'channel';", ids
+    )
+    tickers = {}
+    for source_id, article_id, ticker in cursor.fetchall():
+        tickers.setdefault((source_id, article_id), []).append(ticker)
+    return tickers
+
+
+# Index every row of one table
+def backfill_table(connection, index, table, published_column, title_column, body_expression):
+    columns = f"id, source_id, {published_column}, {title_column}, {body_expression}"
+    read_cursor = connection.cursor()
+    ticker_cursor = connection.cursor()
+    last_id = None
+    total = 0
+
+    try:
+        while True:
+            # Keyset pagination on the primary key keeps every page an index range scan
+            if last_id is None:
+                read_cursor.execute(f"SELECT {columns} FROM {table} ORDER BY id LIMIT %s;", (PAGE_SIZE,))
+            else:
+                read_cursor.execute(
+                    f"SELECT {columns} FROM {table} WHERE id > %s ORDER BY id LIMIT %s;", (last_id, PAGE_SIZE)
+                )
+            page = read_cursor.fetchall()
+            if not page:
+                break
+
+            tickers = fetch_tickers(ticker_cursor, page)
+            total += index.add_many(
+                (source_id, article_id, published, title, body, tickers.get((source_id, str(article_id))))
+                for article_id, source_id, published, title, body in page
+            )
+
+            last_id = page[-1][0]
+            print(f"{table}: indexed through id {last_id} ({total} documents).")
+    finally:
+        read_cursor.close()
+        ticker_cursor.close()
+
+    return total
+
+
+# Main function to build the search index from the existing tables
+def main():
+    path = os.getenv(INDEX_PATH_ENV)
+    if not path:
+        print(f"Set {INDEX_PATH_ENV} to the search index file.")
+        return
+
+    connection = create_connection()
+    if connection:
+        index = SearchIndex(path)
+        try:
+            for table, published_column, title_column, body_expression in SOURCES:
+                try:
+                    total = backfill_table(connection, index, table, published_column, title_column, body_expression)
+                    print(f"Indexed {total} documents from '{table}'.")
+                except Error as e:
+                    print(f"Error indexing '{table}': {e}")
+            index.optimize()
+        finally:
+            index.close()
+        connection.close()
+        print("MySQL connection closed.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.tickers import (
+    create_article_ticker_table, insert_article_tickers, ticker_rows, split_joined,
+    ROLE_STOCK, ROLE_CHANNEL, ROLE_PRIMARY, ROLE_SECONDARY
+)
+
+load_dotenv()
+
+# Source rows read per keyset page
+PAGE_SIZE = 10000
+
+# (table, published column, source_id column, [(comma-joined column, role), ...])
+SOURCES = [
+    ('benzinga_db', 'created', 'source_id', [('stocks', ROLE_STOCK), ('channels', ROLE_CHANNEL)]),
+    ('seeking_alpha_db', 'published_on', 'source_id', [('tickers_primary', ROLE_PRIMARY),
+                                                       ('tickers_secondary', ROLE_SECONDARY)]),
+]
+
+
+# Database connection
+def create_connection():
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv('DB_HOST'),
+            user=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD'),
+            database=os.getenv('DB_DATABASE')
+        )
+        if connection.is_connected():
+            print("Connected to MySQL database")
+            return connection
+    except Error as e:
+        print(f"Error: {e}")
+        return None
+
+
+# Populate article_ticker from the comma-joined columns of one table
+def migrate_table(connection, table, published_column, source_column, joined_columns):
+    columns = ', '.join(['id', published_column, source_column] + [column for column, _ in joined_columns])
+    read_cursor = connection.cursor()
+    write_cursor = connection.cursor()
+    last_id = None
+    total = 0
+
+    try:
+        while True:
+            # Keyset pagination on the primary key keeps every page an index range scan
+            if last_id is None:
+                read_cursor.execute(f"SELECT {columns} FROM {table} ORDER BY id LIMIT %s;", (PAGE_SIZE,))
+            else:
+                read_cursor.execute(
+                    f"SELECT {columns} FROM {table} WHERE id > %s ORDER BY id LIMIT %s;", (last_id, PAGE_SIZE)
+                )
+            page = read_cursor.fetchall()
+            if not page:
+                break
+
+            rows = []
+            for record in page:
+                article_id, published, source_id = record[0], record[1], record[2]
+                for (_, role), joined in zip(joined_columns, record[3:]):
+                    rows += ticker_rows(source_id, article_id, published, split_joined(joined), role)
+
+            insert_article_tickers(write_cursor, rows)
+            connection.commit()
+
+            last_id = page[-1][0]
+            total += len(rows)
+            print(f"{table}: migrated through id {last_id} ({total} ticker rows).")
+    finally:
+        read_cursor.close()
+        write_cursor.close()
+
+    return total
+
+
+# Main function to create and populate article_ticker
+def main():
+    connection = create_connection()
+    if connection:
+        create_article_ticker_table(connection)
+        for table, published_column, source_column, joined_columns in SOURCES:
+            try:
+                total = migrate_table(connection, table, published_column, source_column, joined_columns)
+                print(f"Migrated {total} ticker rows from '{table}'.")
+            except Error as e:
+                print(f"Error migrating '{table}': {e}")
+        connection.close()
+        print("MySQL connection closed.")
+
+
+if __name__ == '__main__':
+    main()
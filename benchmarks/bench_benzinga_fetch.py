@@ -0,0 +1,181 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common import rate_limiter
+from scraper.benzinga import benzinga_fetch
+from scraper.benzinga.benzinga_pages import process_page
+from scraper.benzinga.benzinga_fetch import (get_page, new_transfer, list_updates, changed_ids,
+                                             iter_changed_pages, unix_time, FULL_OUTPUT)
+
+# ----------------------------
+# Stub News API
+# ----------------------------
+
+HEADLINE_KEYS = ('id', 'author', 'created', 'updated', 'title', 'url', 'stocks', 'channels')
+
+
+def synthetic_articles(count, body_bytes=6000, seed=0):
+    """API-shaped articles, newest first, with HTML bodies of about body_bytes."""
+    generator = random.Random(seed)
+    start = datetime(2024, 5, 1, tzinfo=timezone(timedelta(hours=-4)))
+    words = ['market', 'shares', 'earnings', 'guidance', 'analyst', 'rating', 'revenue', 'quarter']
+    articles = []
+    for number in range(count):
+        created = start - timedelta(seconds=number * 90)
+        paragraph = ' '.join(generator.choice(words) for _ in range(60))
+        articles.append({
+            'id': 30000000 + count - number,
+            'author': 'Benzinga Newsdesk',
+            'created': created.strftime('%a, %d %b %Y %H:%M:%S %z'),
+            'updated': (created + timedelta(minutes=2)).strftime('%a, %d %b %Y %H:%M:%S %z'),
+            'title': f"Headline {number}",
+            'teaser': f"<p>{paragraph[:200]}</p>",
+            'body': ''.join(f"<p>{paragraph}</p>" for _ in range(max(1, body_bytes // (len(paragraph) + 7)))),
+            'url': f"https://www.benzinga.com/news/{number}",
+            'stocks': [{'name': 'AAPL'}],
+            'channels': [{'name': 'News'}],
+        })
+    return articles
+
+
+class NewsServer(ThreadingHTTPServer):
+    """Serves `articles` in pages with the full or headline output, after `latency` seconds."""
+    daemon_threads = True
+
+    def __init__(self, articles, latency):
+        super().__init__(('127.0.0.1', 0), NewsHandler)
+        self.articles = articles
+        self.latency = latency
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v2/news"
+
+
+class NewsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query.get('page', ['1'])[0])
+        page_size = int(query.get('pageSize', ['100'])[0])
+        output = query.get('displayOutput', [FULL_OUTPUT])[0]
+        articles = self.server.articles
+        if 'updatedSince' in query:
+            since = int(query['updatedSince'][0])
+            articles = [article for article in articles if unix_time(article['updated']) >= since]
+        articles = articles[(page - 1) * page_size:page * page_size]
+        if output != FULL_OUTPUT:
+            articles = [{key: article[key] for key in HEADLINE_KEYS} for article in articles]
+        time.sleep(self.server.latency)
+        body = json.dumps(articles).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ----------------------------
+# Strategies
+# ----------------------------
+
+def fetch_full(page_size, max_pages, transfer, session):
+    """Today's fetch: every page in full output, one after another."""
+    articles = 0
+    for page in range(1, max_pages + 1):
+        page_articles, response = get_page(None, '2024-05-01', page, page_size, FULL_OUTPUT, session)
+        transfer['full_requests'] += 1
+        transfer['full_bytes'] += len(response.content)
+        if not page_articles:
+            break
+        articles += len(page_articles)
+    return articles
+
+
+def fetch_lean(page_size, max_pages, transfer, session, stored, workers):
+    """Listing pass, lookup against `stored`, then full output for the new or changed articles only."""
+    listing, _ = list_updates(None, '2024-05-01', page_size, max_pages, transfer, session)
+    wanted = changed_ids(listing, stored)
+    pages = iter_changed_pages(None, '2024-05-01', page_size, listing, wanted, transfer, workers, session)
+    articles = sum(len(page_articles) for page_articles, _ in pages)
+    assert articles == len(wanted), (articles, len(wanted))
+    return articles
+
+
+def poll_state(articles, new, edited, seed=1):
+    """
+    What benzinga_db holds at the start of a polling run: every article but
+    the `new` newest ones, with `edited` older articles since updated on the
+    server (their 'updated' moves to after the newest article).
+    """
+    generator = random.Random(seed)
+    copies = [dict(article) for article in articles]
+    process_page(copies)
+    stored = {str(article['id']): article['updated_edt'] for article in copies[new:]}
+
+    newest = articles[0]['updated']
+    for article in generator.sample(articles[new:], edited):
+        article['updated'] = newest
+    return stored
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare full and two-phase Benzinga polling against a stub API.")
+    parser.add_argument('--articles', type=int, default=2000, help="Articles in the polled date range")
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--new', type=int, default=40, help="Articles published since the last run")
+    parser.add_argument('--edited', type=int, default=10, help="Older articles updated since the last run")
+    parser.add_argument('--latency', type=float, default=0.15, help="Stub response latency in seconds")
+    parser.add_argument('--workers', type=int, default=benzinga_fetch.FETCH_WORKERS)
+    args = parser.parse_args(argv)
+
+    # Take the limiter out of the measurement; it is checked by check_rate_limiter.py
+    rate_limiter.RATE_LIMITS['benzinga'] = {'rate': 1000.0, 'max_rate': 1000.0, 'burst': 32}
+
+    articles = synthetic_articles(args.articles)
+    stored = poll_state(articles, args.new, args.edited)
+    server = NewsServer(articles, args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    benzinga_fetch.BASE_URL = server.url
+    max_pages = args.articles // args.page_size + 2
+
+    try:
+        results = {}
+        for name, run in (('full', lambda t, s: fetch_full(args.page_size, max_pages, t, s)),
+                          ('lean', lambda t, s: fetch_lean(args.page_size, max_pages, t, s, stored, args.workers))):
+            transfer = new_transfer()
+            started = time.perf_counter()
+            with requests.Session() as session:
+                fetched = run(transfer, session)
+            results[name] = (fetched, time.perf_counter() - started, transfer)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"{args.articles} articles, {args.new} new and {args.edited} edited since the last run, "
+          f"{args.latency * 1000:.0f} ms latency")
+    for name, (fetched, seconds, transfer) in results.items():
+        received = (transfer['list_bytes'] + transfer['full_bytes']) / (1024 * 1024)
+        print(f"{name}: {fetched:6d} articles  {transfer['list_requests']:3d} list + {transfer['full_requests']:3d} full "
+              f"requests  {received:8.2f} MB  {seconds:6.2f}s")
+    full_bytes = sum(results['full'][2][key] for key in ('list_bytes', 'full_bytes'))
+    lean_bytes = sum(results['lean'][2][key] for key in ('list_bytes', 'full_bytes'))
+    print(f"lean/full: {lean_bytes / full_bytes:.1%} of the bytes, {results['lean'][1] / results['full'][1]:.1%} of the time")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import os
+import sys
+import glob
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytz
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.benzinga.benzinga_pages import process_page
+
+# ----------------------------
+# Page Sets
+# ----------------------------
+
+def load_recorded_pages(directory):
+    """Pages recorded by fetch_news with BENZINGA_RECORD_DIR set (page-NNNN.json)."""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, 'page-*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        pages.append(data.get('articles', []) if isinstance(data, dict) else data)
+    return pages
+
+
+def synthetic_pages(pages=100, page_size=100, seed=0):
+    """API-shaped pages with RFC 2822 timestamps across EST and EDT offsets."""
+    generator = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    result = []
+    for _ in range(pages):
+        page = []
+        for _ in range(page_size):
+            created = start + timedelta(seconds=generator.randrange(365 * 86400))
+            offset = timezone(timedelta(hours=-4 if 3 <= created.month <= 10 else -5))
+            page.append({
+                'id': generator.randrange(10 ** 8),
+                'created': created.astimezone(offset).strftime('%a, %d %b %Y %H:%M:%S %z'),
+                'updated': (created + timedelta(minutes=5)).astimezone(offset).strftime('%a, %d %b %Y %H:%M:%S %z'),
+            })
+        result.append(page)
+    return result
+
+
+# ----------------------------
+# Strategies
+# ----------------------------
+
+def legacy_convert(date_str):
+    """The per-row conversion fetch_news and insert_data used before batching."""
+    naive_datetime = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %z')
+    return naive_datetime.astimezone(pytz.timezone('US/Eastern')).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def per_row(pages):
+    """max_date tracking per article in fetch_news, then created/updated parsed again in insert_data."""
+    max_date = pd.to_datetime('1900-01-01')
+    for articles in pages:
+        for article in articles:
+            article_date = pd.to_datetime(legacy_convert(article.get('created', '1900-01-01')))
+            if article_date > max_date:
+                max_date = article_date
+    for articles in pages:
+        for article in articles:
+            legacy_convert(article.get('created'))
+            legacy_convert(article.get('updated'))
+    return max_date
+
+
+def batched(pages):
+    """process_page per page; insert_data reuses the normalized values."""
+    max_date = pd.to_datetime('1900-01-01')
+    for articles in pages:
+        page_max_date = process_page(articles)
+        if page_max_date is not None and page_max_date > max_date:
+            max_date = page_max_date
+    for articles in pages:
+        for article in articles:
+            article['created_edt'], article['updated_edt']
+    return max_date
+
+
+def best_of(function, pages, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        copies = [[dict(article) for article in articles] for articles in pages]
+        started = time.perf_counter()
+        result = function(copies)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Benzinga page timestamp processing.")
+    parser.add_argument('--pages-dir', help="Directory of recorded page-NNNN.json responses")
+    parser.add_argument('--pages', type=int, default=100, help="Synthetic pages when no recording is given")
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    pages = load_recorded_pages(args.pages_dir) if args.pages_dir else synthetic_pages(args.pages, args.page_size)
+    articles = sum(len(page) for page in pages)
+
+    legacy_seconds, legacy_max = best_of(per_row, pages, args.repeat)
+    batched_seconds, batched_max = best_of(batched, pages, args.repeat)
+    assert legacy_max == batched_max, (legacy_max, batched_max)
+
+    print(f"{len(pages)} pages, {articles} articles")
+    print(f"per-row: {legacy_seconds * 1000:9.1f} ms  ({articles / legacy_seconds:,.0f} articles/sec)")
+    print(f"batched: {batched_seconds * 1000:9.1f} ms  ({articles / batched_seconds:,.0f} articles/sec)")
+    print(f"speedup: {legacy_seconds / batched_seconds:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# (module, budget in ms). Measured at 50-75 ms on one CPU after the heavy
+# imports were made lazy (420-840 ms before); the budgets leave headroom for
+# slower machines but not for pandas (~550 ms) or praw (~200 ms) creeping back.
+MODULES = [
+    ('scraper.benzinga.benzinga_scraper', 250),
+    ('scraper.benzinga.benzinga_fetch', 150),
+    ('scraper.reddit.reddit_scraper', 250),
+    ('scraper.seeking_alpha.seeking_alpha_scraper', 250),
+    ('scraper.nasdaq.nasdaq_scraper', 250),
+    ('scraper.cli', 150),
+]
+
+# Dependencies only the functions that need them may import
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'requests', 'mysql', 'bs4', 'pytz', 'praw', 'selenium',
+                 'webdriver_manager', 'dropbox', 'apscheduler', 'schedule', 'dotenv']
+
+# Imports the module in a fresh interpreter and reports what the import did;
+# a plain import statement, as importlib.import_module skips -X importtime
+PROBE = """
+import os, sys, json, logging
+before = set(os.listdir('.'))
+import {module}
+schedule = sys.modules.get('schedule')
+print(json.dumps({{
+    'heavy': [name for name in {heavy!r} if name in sys.modules],
+    'schedule_jobs': len(schedule.jobs) if schedule else 0,
+    'log_handlers': [type(handler).__name__ for handler in logging.getLogger().handlers],
+    'new_files': sorted(set(os.listdir('.')) - before),
+}}))
+"""
+
+
+# ----------------------------
+# Measurement
+# ----------------------------
+
+def import_ms(stderr, module):
+    """Cumulative import time of `module` from `python -X importtime` output, in ms."""
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    return None
+
+
+def probe(module):
+    """Imports `module` once in a subprocess. Returns (ms, report dict)."""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    with tempfile.TemporaryDirectory(prefix='import-check-') as cwd:
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                 PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    return import_ms(result.stderr, module), json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check(module, budget, repeat):
+    """
+    Best-of-`repeat` import time and the problems found for one module. With
+    budget None only the side effects are checked, not the import time.
+    """
+    timings = []
+    for _ in range(repeat):
+        ms, report = probe(module)
+        timings.append(ms)
+    ms = min(timings)
+
+    problems = []
+    if budget is not None and ms > budget:
+        problems.append(f"import took {ms:.0f} ms, budget {budget} ms")
+    if report['heavy']:
+        problems.append(f"imports {', '.join(report['heavy'])}")
+    if report['schedule_jobs']:
+        problems.append(f"registers {report['schedule_jobs']} schedule jobs")
+    if report['log_handlers']:
+        problems.append(f"configures root logging ({', '.join(report['log_handlers'])})")
+    if report['new_files']:
+        problems.append(f"creates {', '.join(report['new_files'])}")
+    limit = f"budget {budget} ms" if budget is not None else "no budget"
+    print(f"{module:<44} {ms:7.1f} ms  ({limit})  {'FAIL' if problems else 'ok'}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that importing the scrapers is cheap and side-effect free.")
+    parser.add_argument('--repeat', type=int, default=3, help="Imports per module; the fastest counts")
+    args = parser.parse_args(argv)
+
+    ok = True
+    for module, budget in MODULES:
+        for problem in check(module, budget, args.repeat):
+            print(f"FAIL: {module} {problem}.")
+            ok = False
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
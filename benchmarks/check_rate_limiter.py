@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.rate_limiter import RateLimiter
+
+# ----------------------------
+# Stub Server
+# ----------------------------
+
+class LimitedServer(ThreadingHTTPServer):
+    """
+    Serves JSON pages and allows `limit` requests per `window` seconds.
+    Requests over the limit get a 429 with Retry-After. With `headers` set,
+    every response also carries RapidAPI-style x-ratelimit-requests-* headers.
+    """
+    daemon_threads = True
+
+    def __init__(self, limit, window, headers=True):
+        super().__init__(('127.0.0.1', 0), LimitedHandler)
+        self.limit = limit
+        self.window = window
+        self.headers = headers
+        self.window_start = time.monotonic()
+        self.used = 0
+        self.served = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/news"
+
+    def admit(self):
+        """Returns (allowed, remaining, seconds to reset) for one request."""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= self.window:
+                self.window_start, self.used = now, 0
+            reset = self.window - (now - self.window_start)
+            if self.used >= self.limit:
+                self.rejected += 1
+                return False, 0, reset
+            self.used += 1
+            self.served += 1
+            return True, self.limit - self.used, reset
+
+
+class LimitedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        allowed, remaining, reset = self.server.admit()
+        body = json.dumps([{'id': self.server.served}] if allowed else {'message': 'Too many requests'}).encode()
+        self.send_response(200 if allowed else 429)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if not allowed:
+            self.send_header('Retry-After', f"{reset:.3f}")
+        if self.server.headers:
+            self.send_header('x-ratelimit-requests-limit', str(self.server.limit))
+            self.send_header('x-ratelimit-requests-remaining', str(remaining))
+            self.send_header('x-ratelimit-requests-reset', f"{reset:.3f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ----------------------------
+# Scenarios
+# ----------------------------
+
+def fetch_pages(url, pages, limiter=None):
+    """Fetches `pages` pages like iter_news_pages; without a limiter, sleeps 1s between pages."""
+    import requests
+
+    session = requests.Session()
+    failures = 0
+    started = time.perf_counter()
+    for _ in range(pages):
+        if limiter is None:
+            response = session.get(url)
+            time.sleep(1)
+        else:
+            response = limiter.get(url, session=session)
+        if response.status_code != 200:
+            failures += 1
+    return time.perf_counter() - started, failures
+
+
+def run(name, pages, limit, window, headers, limiter):
+    server = LimitedServer(limit, window, headers)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        seconds, failures = fetch_pages(server.url, pages, limiter)
+    finally:
+        server.shutdown()
+        server.server_close()
+    allowed = limit / window
+    print(f"{name:<32} {pages / seconds:6.2f} pages/s  (server allows {allowed:.1f}/s)  "
+          f"{server.rejected:3d} throttled  {failures} failed  {seconds:6.2f}s")
+    return {'name': name, 'pages_per_second': pages / seconds, 'allowed': allowed,
+            'throttled': server.rejected, 'failures': failures}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the adaptive rate limiter against a rate-limited stub API.")
+    parser.add_argument('--pages', type=int, default=60)
+    parser.add_argument('--limit', type=int, default=5, help="Requests the stub allows per window")
+    parser.add_argument('--window', type=float, default=1.0, help="Stub window in seconds")
+    parser.add_argument('--baseline', action='store_true', help="Also run the fixed 1s sleep (takes --pages seconds)")
+    args = parser.parse_args(argv)
+
+    results = [
+        run("limiter, rate limit headers", args.pages, args.limit, args.window, True,
+            RateLimiter(rate=1.0, max_rate=50.0, burst=1)),
+        run("limiter, 429 + Retry-After only", args.pages, args.limit, args.window, False,
+            RateLimiter(rate=1.0, max_rate=50.0, burst=1)),
+    ]
+    if args.baseline:
+        results.append(run("fixed time.sleep(1)", args.pages, args.limit, args.window, True, None))
+
+    ok = True
+    for result in results:
+        if result['failures']:
+            print(f"FAIL: {result['name']} returned {result['failures']} throttled responses to the caller.")
+            ok = False
+    for result in results[:2]:
+        if result['pages_per_second'] < 0.5 * result['allowed']:
+            print(f"FAIL: {result['name']} reached under half of the allowed rate.")
+            ok = False
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
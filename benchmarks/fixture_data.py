@@ -0,0 +1,184 @@
+import os
+import sys
+import copy
+import json
+import argparse
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Small API responses and pages, one file per shape. The generators below
+# clone them into data sets of any size; `import` replaces a fixture with
+# records from a real recorded response (e.g. BENZINGA_RECORD_DIR pages).
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+FIXTURES = {
+    'benzinga_page': 'benzinga_page.json',
+    'seeking_alpha_article_list': 'seeking_alpha_article_list.json',
+    'seeking_alpha_article_detail': 'seeking_alpha_article_detail.json',
+    'seeking_alpha_news_list': 'seeking_alpha_news_list.json',
+    'reddit_submissions': 'reddit_submissions.json',
+    'nasdaq_article': 'nasdaq_article.html',
+}
+
+# Records kept when importing a recorded response
+IMPORT_RECORDS = 3
+
+EASTERN = timezone(timedelta(hours=-4))
+START = datetime(2024, 5, 3, 16, 0, tzinfo=EASTERN)
+
+
+def load(name):
+    """Parsed JSON fixture, or the text of an HTML fixture."""
+    path = os.path.join(FIXTURE_DIR, FIXTURES[name])
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read() if path.endswith('.html') else json.load(f)
+
+
+# ----------------------------
+# Scaled Data Sets
+# ----------------------------
+
+def benzinga_articles(count):
+    """`count` API articles, newest first, one minute apart."""
+    templates = load('benzinga_page')
+    articles = []
+    for number in range(count):
+        article = copy.deepcopy(templates[number % len(templates)])
+        created = START - timedelta(minutes=number)
+        article['id'] = 40000000 + count - number
+        article['created'] = created.strftime('%a, %d %b %Y %H:%M:%S %z')
+        article['updated'] = (created + timedelta(minutes=2)).strftime('%a, %d %b %Y %H:%M:%S %z')
+        article['url'] = f"{article['url']}-{number}"
+        articles.append(article)
+    return articles
+
+
+def seeking_alpha_article_list(count):
+    """An /articles/v2/list response with `count` ids."""
+    response = load('seeking_alpha_article_list')
+    template = response['data'][0]
+    response['data'] = []
+    for number in range(count):
+        item = copy.deepcopy(template)
+        item['id'] = str(5000000 + number)
+        response['data'].append(item)
+    return response
+
+
+def seeking_alpha_article_detail(article_id):
+    """An /articles/get-details response for one id."""
+    response = load('seeking_alpha_article_detail')
+    number = int(article_id) % 100000
+    published = START - timedelta(minutes=number)
+    response['data']['id'] = str(article_id)
+    response['data']['attributes']['publishOn'] = published.isoformat()
+    response['data']['attributes']['lastModified'] = (published + timedelta(minutes=5)).isoformat()
+    response['data']['links']['canonical'] += f"-{article_id}"
+    return response
+
+
+def seeking_alpha_news_list(count):
+    """A /news/v2/list response with `count` news items."""
+    response = load('seeking_alpha_news_list')
+    templates = response['data']
+    response['data'] = []
+    for number in range(count):
+        item = copy.deepcopy(templates[number % len(templates)])
+        published = START - timedelta(minutes=number)
+        item['id'] = str(4200000 + count - number)
+        item['attributes']['publishOn'] = published.isoformat()
+        item['attributes']['lastModified'] = published.isoformat()
+        item['links']['canonical'] += f"-{number}"
+        response['data'].append(item)
+    return response
+
+
+def reddit_submission_dicts(count):
+    """`count` submissions as plain dicts of the PRAW attributes process_submission reads."""
+    templates = load('reddit_submissions')
+    submissions = []
+    for number in range(count):
+        submission = dict(templates[number % len(templates)])
+        submission['id'] = f"b{number:07x}"
+        submission['created_utc'] = START.timestamp() - number * 30
+        submissions.append(submission)
+    return submissions
+
+
+def reddit_submissions(count):
+    """`count` objects shaped like praw Submission (attribute access, str() of subreddit/author)."""
+    return [SimpleNamespace(**submission) for submission in reddit_submission_dicts(count)]
+
+
+def nasdaq_pages(count):
+    """`count` (url, html) article pages."""
+    html = load('nasdaq_article')
+    pages = []
+    for number in range(count):
+        url = f"https://www.nasdaq.com/articles/benchmark-article-{number}"
+        pages.append((url, html.replace('Apple Stock Rises After Record Buyback',
+                                        f"Apple Stock Rises After Record Buyback ({number})")))
+    return pages
+
+
+class PageSource:
+    """Holds a page for extract_article_fields(mode='page_source'), which only reads .page_source."""
+
+    def __init__(self, html):
+        self.page_source = html
+
+
+# ----------------------------
+# Importing Recordings
+# ----------------------------
+
+def import_recorded(name, path, records=IMPORT_RECORDS):
+    """
+    Replaces a fixture with the first `records` items of a recorded response.
+    List responses keep their envelope ('data' for Seeking Alpha, 'articles'
+    or a bare list for Benzinga).
+    """
+    target = os.path.join(FIXTURE_DIR, FIXTURES[name])
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if target.endswith('.html'):
+        content = text
+    else:
+        data = json.loads(text)
+        if isinstance(data, list):
+            data = data[:records]
+        elif isinstance(data, dict) and isinstance(data.get('articles'), list):
+            data = data['articles'][:records]
+        elif isinstance(data, dict) and isinstance(data.get('data'), list):
+            data['data'] = data['data'][:records]
+        content = json.dumps(data, indent=1)
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the benchmark fixtures.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help="Replace a fixture with a recorded response")
+    import_parser.add_argument('name', choices=sorted(FIXTURES))
+    import_parser.add_argument('path', help="Recorded response, e.g. a BENZINGA_RECORD_DIR page-NNNN.json")
+    import_parser.add_argument('--records', type=int, default=IMPORT_RECORDS)
+    subparsers.add_parser('list', help="Show the fixtures and their sizes")
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        print(f"Wrote {import_recorded(args.name, args.path, args.records)}")
+    else:
+        for name, filename in sorted(FIXTURES.items()):
+            size = os.path.getsize(os.path.join(FIXTURE_DIR, filename))
+            print(f"{name:<30} {filename:<36} {size:>8,} bytes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,571 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+import subprocess
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from urllib.parse import parse_qsl
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import fixture_data
+from stub_server import serve, json_response
+from scraper.common.runtime import DATA_DIR_ENV
+from scraper.common.parquet_archive import ARCHIVE_DIR_ENV
+from scraper.common.search_index import INDEX_PATH_ENV as SEARCH_INDEX_PATH_ENV
+from scraper.common.near_dup import INDEX_PATH_ENV as NEAR_DUP_INDEX_PATH_ENV
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Sink environment variable -> its path under the soak output
+SOAK_SINKS = {
+    ARCHIVE_DIR_ENV: 'parquet',
+    SEARCH_INDEX_PATH_ENV: 'search_index.sqlite',
+    NEAR_DUP_INDEX_PATH_ENV: 'near_dup.sqlite',
+}
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+APIS = ['benzinga', 'seeking_alpha', 'reddit', 'telegram']
+
+# Items already published when the harness starts, and new items per second
+# of wall time afterwards. Item timestamps are spaced 1 / publish_rate apart
+# (or DEFAULT_SPACING seconds when nothing is published during the run).
+INITIAL_ITEMS = 100000
+PUBLISH_RATE = 0.05
+DEFAULT_SPACING = 20.0
+
+# Benzinga marks an article updated this long after it was created
+UPDATE_DELAY = 120
+
+# Reddit serves at most this many items of a listing, whatever the limit
+REDDIT_LISTING_CAP = 1000
+REDDIT_TOKEN = 'mock-reddit-token'
+
+# Posts per cycle of the Reddit feed by subreddit, skewed like the live ones:
+# wallstreetbets alone posts about as much as all the others together.
+# Subreddits not listed have no posts.
+REDDIT_POST_WEIGHTS = {
+    'wallstreetbets': 30, 'stocks': 6, 'investing': 4, 'StockMarket': 4, 'options': 3, 'pennystocks': 3,
+    'daytrading': 2, 'Economics': 2, 'Forex': 2, 'Bogleheads': 2, 'RobinHood': 1, 'Finance': 1,
+    'SwingTrading': 1, 'TechnicalAnalysis': 1, 'QuantitativeFinance': 1, 'algotrading': 1,
+    'DividendInvesting': 1, 'HighFrequencyTrading': 1, 'EToro': 1,
+}
+
+# Id ranges of the synthetic items
+BENZINGA_ID_BASE = 50000000
+SEEKING_ALPHA_NEWS_ID_BASE = 4000000
+SEEKING_ALPHA_ARTICLE_ID_BASE = 5000000
+REDDIT_ID_BASE = 36 ** 6
+
+EASTERN = timezone(timedelta(hours=-4))
+
+# Scraper entry points driven by `soak`: (module, directory put on sys.path)
+JOBS = {
+    'benzinga': ('scraper.benzinga.benzinga_scraper', os.path.join('scraper', 'benzinga')),
+    'seeking_alpha': ('scraper.seeking_alpha.seeking_alpha_scraper', os.path.join('scraper', 'seeking_alpha')),
+    'reddit': ('scraper.reddit.reddit_scraper', os.path.join('scraper', 'reddit')),
+}
+
+RUNNER = """
+import sys, time, importlib
+sys.path[:0] = {paths!r}
+module = importlib.import_module({module!r})
+deadline = time.monotonic() + float({duration!r})
+for run in range({runs!r}):
+    module.main()
+    if time.monotonic() >= deadline:
+        break
+    time.sleep({interval!r})
+"""
+
+
+# ----------------------------
+# Synthetic Feeds
+# ----------------------------
+
+class Feed:
+    """
+    Append-only feed of `initial` items that grows by `publish_rate` items per
+    second. Items are addressed by index (0 is the oldest) and built on demand,
+    so a feed of millions of items costs no memory.
+    """
+
+    def __init__(self, initial=INITIAL_ITEMS, publish_rate=PUBLISH_RATE, clock=time.time):
+        self.initial = initial
+        self.publish_rate = publish_rate
+        self.spacing = 1.0 / publish_rate if publish_rate > 0 else DEFAULT_SPACING
+        self.clock = clock
+        self.started = clock()
+
+    def total(self):
+        return self.initial + int((self.clock() - self.started) * self.publish_rate)
+
+    def created(self, index):
+        """Unix time an item was published."""
+        return self.started + (index - self.initial) * self.spacing
+
+    def index_at(self, timestamp):
+        """Index of the first item published at or after `timestamp`."""
+        return min(max(math.ceil((timestamp - self.started) / self.spacing + self.initial), 0), self.total())
+
+    def newest(self, count, offset=0, lowest=0):
+        """Indexes of up to `count` items, newest first, skipping `offset` and stopping before `lowest`."""
+        top = self.total() - 1 - offset
+        return range(top, max(lowest - 1, top - count), -1)
+
+
+@lru_cache(maxsize=None)
+def template(name):
+    return fixture_data.load(name)
+
+
+def rfc2822(timestamp):
+    return datetime.fromtimestamp(timestamp, EASTERN).strftime('%a, %d %b %Y %H:%M:%S %z')
+
+
+def iso(timestamp):
+    return datetime.fromtimestamp(timestamp, EASTERN).isoformat()
+
+
+def benzinga_article(feed, index):
+    article = dict(template('benzinga_page')[index % len(template('benzinga_page'))])
+    created = feed.created(index)
+    article['id'] = BENZINGA_ID_BASE + index
+    article['created'] = rfc2822(created)
+    article['updated'] = rfc2822(created + UPDATE_DELAY)
+    article['url'] = f"{article['url']}-{index}"
+    return article
+
+
+def seeking_alpha_news_item(feed, index):
+    templates = template('seeking_alpha_news_list')['data']
+    item = dict(templates[index % len(templates)])
+    published = feed.created(index)
+    item['id'] = str(SEEKING_ALPHA_NEWS_ID_BASE + index)
+    item['attributes'] = dict(item['attributes'], publishOn=iso(published), lastModified=iso(published))
+    item['links'] = dict(item['links'], canonical=f"{item['links']['canonical']}-{index}")
+    return item
+
+
+def seeking_alpha_article_detail(feed, index):
+    response = dict(template('seeking_alpha_article_detail'))
+    data = dict(response['data'])
+    published = feed.created(index)
+    data['id'] = str(SEEKING_ALPHA_ARTICLE_ID_BASE + index)
+    data['attributes'] = dict(data['attributes'], publishOn=iso(published), lastModified=iso(published + 300))
+    data['links'] = dict(data['links'], canonical=f"{data['links']['canonical']}-{index}")
+    response['data'] = data
+    return response
+
+
+def base36(number):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    text = ''
+    while number:
+        number, remainder = divmod(number, 36)
+        text = digits[remainder] + text
+    return text or '0'
+
+
+def weighted_cycle(weights):
+    """Names repeated by weight and spread evenly over one cycle."""
+    slots = sorted(((position + 0.5) / weight, name) for name, weight in weights.items() for position in range(weight))
+    return [name for _, name in slots]
+
+
+REDDIT_CYCLE = weighted_cycle(REDDIT_POST_WEIGHTS)
+
+
+def cycle_matches(low, high, slots):
+    """Number of feed indexes in [low, high] whose REDDIT_CYCLE slot is in `slots`."""
+    def up_to(index):
+        full, rest = divmod(index + 1, len(REDDIT_CYCLE))
+        return full * len(slots) + sum(1 for slot in slots if slot < rest)
+    return up_to(high) - up_to(low - 1) if high >= low else 0
+
+
+def reddit_child(feed, index):
+    submission = dict(template('reddit_submissions')[index % len(template('reddit_submissions'))])
+    submission_id = base36(REDDIT_ID_BASE + index)
+    submission.update(
+        id=submission_id,
+        name=f"t3_{submission_id}",
+        subreddit=REDDIT_CYCLE[index % len(REDDIT_CYCLE)],
+        created_utc=feed.created(index),
+        author=submission['author'] or '[deleted]',
+    )
+    return {'kind': 't3', 'data': submission}
+
+
+# ----------------------------
+# Mock APIs
+# ----------------------------
+
+class Bucket:
+    """Token bucket of one API's rate limit (requests per second)."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Returns (allowed, remaining, seconds until the next token, seconds until the bucket is full)."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            allowed = self.tokens >= 1
+            if allowed:
+                self.tokens -= 1
+            return (allowed, int(self.tokens), max(0.0, 1 - self.tokens) / self.rate,
+                    (self.capacity - self.tokens) / self.rate)
+
+
+class MockAPIs:
+    """
+    Route table emulating the Benzinga news API, the RapidAPI Seeking Alpha
+    endpoints, Reddit's OAuth token and listing endpoints and Telegram's
+    sendMessage, for a StubServer.
+
+    Every response waits `latency` seconds plus up to `jitter` more. With
+    `rate_limit` set, each API admits that many requests per second (bursts
+    of `burst`) and answers the rest with 429 and its own rate-limit
+    headers; `error_rate` is the share of requests answered with 503.
+    """
+
+    def __init__(self, initial=INITIAL_ITEMS, publish_rate=PUBLISH_RATE, latency=0.0, jitter=0.0,
+                 rate_limit=None, burst=5, error_rate=0.0, seed=0):
+        self.feeds = {
+            'benzinga': Feed(initial, publish_rate),
+            'seeking_alpha_news': Feed(initial, publish_rate),
+            'seeking_alpha_articles': Feed(initial, publish_rate),
+            'reddit': Feed(initial, publish_rate),
+        }
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.buckets = {api: Bucket(rate_limit, burst) for api in APIS} if rate_limit else {}
+        self.random = random.Random(seed)
+        self.stats = {api: {'requests': 0, 'throttled': 0, 'errors': 0, 'items': 0} for api in APIS}
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def record(self, api, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                self.stats[api][name] += value
+
+    def limit_headers(self, api, remaining, reset):
+        if api == 'seeking_alpha':
+            return {'x-ratelimit-requests-limit': str(self.buckets[api].capacity),
+                    'x-ratelimit-requests-remaining': str(remaining),
+                    'x-ratelimit-requests-reset': str(math.ceil(reset))}
+        if api == 'reddit':
+            return {'x-ratelimit-remaining': str(remaining), 'x-ratelimit-used': '0',
+                    'x-ratelimit-reset': str(math.ceil(reset))}
+        return {}
+
+    def endpoint(self, api, handler):
+        """Wraps a handler with latency, error and rate-limit injection and request counting."""
+        def respond(request):
+            with self.lock:
+                delay = self.latency + self.random.random() * self.jitter
+                failed = self.random.random() < self.error_rate
+            if delay:
+                time.sleep(delay)
+            self.record(api, requests=1)
+
+            headers = {}
+            if api in self.buckets:
+                allowed, remaining, wait, reset = self.buckets[api].take()
+                headers = self.limit_headers(api, remaining, reset)
+                if not allowed:
+                    self.record(api, throttled=1)
+                    return json_response({'message': 'Too many requests'}, 429,
+                                         dict(headers, **{'Retry-After': str(max(1, math.ceil(wait)))}))
+            if failed:
+                self.record(api, errors=1)
+                return json_response({'message': 'Service unavailable'}, 503, headers)
+
+            status, response_headers, body = handler(request)
+            return status, dict(headers, **response_headers), body
+        return respond
+
+    # Benzinga
+
+    def benzinga_news(self, request):
+        if not request.query.get('token'):
+            return json_response({'message': 'Missing token'}, 401)
+        feed = self.feeds['benzinga']
+        page, page_size = int(request.query.get('page', 1)), int(request.query.get('pageSize', 15))
+        lowest = 0
+        if request.query.get('dateFrom'):
+            day = datetime.strptime(request.query['dateFrom'], '%Y-%m-%d').replace(tzinfo=EASTERN)
+            lowest = feed.index_at(day.timestamp())
+        if request.query.get('updatedSince'):
+            lowest = max(lowest, feed.index_at(int(request.query['updatedSince']) - UPDATE_DELAY))
+
+        articles = [benzinga_article(feed, index)
+                    for index in feed.newest(page_size, (page - 1) * page_size, lowest)]
+        if request.query.get('displayOutput', 'full') != 'full':
+            for article in articles:
+                for key in ('teaser', 'body'):
+                    article.pop(key, None)
+        self.record('benzinga', items=len(articles))
+        return json_response(articles)
+
+    # Seeking Alpha
+
+    def seeking_alpha_request(self, request):
+        """Error response for a request without a RapidAPI key, else None."""
+        if not request.headers.get('x-rapidapi-key'):
+            return json_response({'message': 'You are not subscribed to this API.'}, 401)
+        return None
+
+    def seeking_alpha_news(self, request):
+        error = self.seeking_alpha_request(request)
+        if error:
+            return error
+        size, number = int(request.query.get('size', 20)), int(request.query.get('number', 1))
+        feed = self.feeds['seeking_alpha_news']
+        data = [seeking_alpha_news_item(feed, index) for index in feed.newest(size, (number - 1) * size)]
+        self.record('seeking_alpha', items=len(data))
+        return json_response(dict(template('seeking_alpha_news_list'), data=data))
+
+    def seeking_alpha_article_list(self, request):
+        error = self.seeking_alpha_request(request)
+        if error:
+            return error
+        size, number = int(request.query.get('size', 20)), int(request.query.get('number', 1))
+        feed = self.feeds['seeking_alpha_articles']
+        item = template('seeking_alpha_article_list')['data'][0]
+        data = [dict(item, id=str(SEEKING_ALPHA_ARTICLE_ID_BASE + index))
+                for index in feed.newest(size, (number - 1) * size)]
+        return json_response(dict(template('seeking_alpha_article_list'), data=data))
+
+    def seeking_alpha_article_details(self, request):
+        error = self.seeking_alpha_request(request)
+        if error:
+            return error
+        feed = self.feeds['seeking_alpha_articles']
+        try:
+            index = int(request.query.get('id')) - SEEKING_ALPHA_ARTICLE_ID_BASE
+        except (TypeError, ValueError):
+            index = -1
+        if not 0 <= index < feed.total():
+            return json_response({'errors': [{'status': '404', 'title': 'Record not found'}]}, 404)
+        self.record('seeking_alpha', items=1)
+        return json_response(seeking_alpha_article_detail(feed, index))
+
+    # Reddit
+
+    def reddit_token(self, request):
+        if not request.headers.get('Authorization', '').startswith('Basic '):
+            return json_response({'error': 401}, 401)
+        return json_response({'access_token': REDDIT_TOKEN, 'token_type': 'bearer',
+                              'expires_in': 86400, 'scope': '*'})
+
+    def reddit_listing(self, request):
+        if request.headers.get('Authorization', '').lower() != f"bearer {REDDIT_TOKEN}":
+            return json_response({'message': 'Unauthorized', 'error': 401}, 401)
+        parts = request.path.strip('/').split('/')
+        if len(parts) < 3 or parts[2] != 'new':
+            return json_response({'message': 'Not Found', 'error': 404}, 404)
+
+        feed = self.feeds['reddit']
+        wanted = {name.lower() for name in parts[1].split('+')}
+        slots = {slot for slot, name in enumerate(REDDIT_CYCLE) if name.lower() in wanted}
+        limit = min(int(request.query.get('limit', 25)), 100)
+        newest = feed.total() - 1
+        start = newest
+        if request.query.get('after', '').startswith('t3_'):
+            start = int(request.query['after'][3:], 36) - REDDIT_ID_BASE - 1
+        # Items of this listing already served on earlier pages
+        served = cycle_matches(start + 1, newest, slots)
+        limit = max(0, min(limit, REDDIT_LISTING_CAP - served)) if slots else 0
+
+        indexes = []
+        index = start
+        while len(indexes) < limit and index >= 0:
+            if index % len(REDDIT_CYCLE) in slots:
+                indexes.append(index)
+            index -= 1
+        children = [reddit_child(feed, index) for index in indexes]
+        more = index >= 0 and served + len(children) < REDDIT_LISTING_CAP
+        after = children[-1]['data']['name'] if children and more else None
+        self.record('reddit', items=len(children))
+        return json_response({'kind': 'Listing', 'data': {'after': after, 'before': None, 'dist': len(children),
+                                                           'modhash': None, 'children': children}})
+
+    # Telegram
+
+    def telegram_send(self, request):
+        if not request.path.endswith('/sendMessage'):
+            return json_response({'ok': False, 'error_code': 404, 'description': 'Not Found'}, 404)
+        fields = dict(parse_qsl(request.body.decode()))
+        with self.lock:
+            self.messages.append(fields)
+            message_id = len(self.messages)
+        self.record('telegram', items=1)
+        return json_response({'ok': True, 'result': {'message_id': message_id, 'date': int(time.time())}})
+
+    def routes(self):
+        return {
+            '/api/v2/news': self.endpoint('benzinga', self.benzinga_news),
+            '/news/v2/list': self.endpoint('seeking_alpha', self.seeking_alpha_news),
+            '/articles/v2/list': self.endpoint('seeking_alpha', self.seeking_alpha_article_list),
+            '/articles/get-details': self.endpoint('seeking_alpha', self.seeking_alpha_article_details),
+            '/api/v1/access_token': self.endpoint('reddit', self.reddit_token),
+            '/r/': self.endpoint('reddit', self.reddit_listing),
+            '/telegram/': self.endpoint('telegram', self.telegram_send),
+        }
+
+
+def environment(url):
+    """Variables that point every scraper at a MockAPIs server."""
+    return {
+        'BENZINGA_BASE_URL': f"{url}/api/v2/news",
+        'BENZINGA_API_KEY': 'mock-benzinga-key',
+        'SEEKING_ALPHA_BASE_URL': url,
+        'SEEKING_ALPHA_API_KEY': 'mock-rapidapi-key',
+        'REDDIT_OAUTH_URL': url,
+        'REDDIT_URL': url,
+        'REDDIT_CLIENT_ID': 'mock-client',
+        'REDDIT_CLIENT_SECRET': 'mock-secret',
+        'REDDIT_USER_AGENT': 'llm-scraper-soak/1.0',
+        'TELEGRAM_API_URL': f"{url}/telegram",
+        'TELEGRAM_BOT_TOKEN': 'mock-telegram-token',
+        'TELEGRAM_CHAT_ID': '1',
+    }
+
+
+def database_environment():
+    """DB_* pointing at the benchmark database, never the configured one."""
+    import mysql_standin
+
+    params = mysql_standin.connection_params()
+    try:
+        connection = mysql_standin.connect()
+        mysql_standin.create_schema(connection)
+        connection.close()
+    except Exception as e:
+        print(f"Benchmark database unavailable ({e}); scrapers will run without it.")
+    return {'DB_HOST': params['host'], 'DB_PORT': str(params['port']), 'DB_USER': params['user'],
+            'DB_PASSWORD': params['password'], 'DB_DATABASE': params['database']}
+
+
+# ----------------------------
+# Soak Runs
+# ----------------------------
+
+def soak(apis, sources, runs, duration, interval, output):
+    """
+    Runs each source's main() in its own process against the mock APIs,
+    `runs` times or until `duration` seconds have passed, all sources at
+    once. Returns the summary written to <output>/summary.json.
+    """
+    os.makedirs(output, exist_ok=True)
+    started = time.perf_counter()
+    with serve(apis.routes()) as server:
+        env = dict(os.environ, **environment(server.url), **database_environment(), METRICS_DIR=output)
+        # Scraper output and state (e.g. the Reddit shard cursors) stay with the soak results
+        env[DATA_DIR_ENV] = os.path.join(output, 'data')
+        # Sinks enabled in the environment are written under the soak results
+        # instead, so mock articles never reach the real archive or indexes.
+        # The others are set empty, which keeps a .env from enabling them.
+        for name, path in SOAK_SINKS.items():
+            env[name] = os.path.join(output, path) if env.get(name) else ''
+        processes = {}
+        for source in sources:
+            module, directory = JOBS[source]
+            code = RUNNER.format(paths=[REPO_ROOT, os.path.join(REPO_ROOT, directory)], module=module,
+                                 runs=runs, duration=str(duration or 'inf'), interval=interval)
+            log = open(os.path.join(output, f"{source}.log"), 'w', encoding='utf-8')
+            processes[source] = (subprocess.Popen([sys.executable, '-c', code], env=env, stdout=log,
+                                                  stderr=subprocess.STDOUT, cwd=os.path.join(REPO_ROOT, directory)),
+                                 log, time.perf_counter())
+        jobs = {}
+        for source, (process, log, job_started) in processes.items():
+            process.wait()
+            log.close()
+            jobs[source] = {'exit_code': process.returncode, 'seconds': round(time.perf_counter() - job_started, 3)}
+        requests_by_path = dict(server.requests)
+        bytes_sent = server.bytes_sent
+
+    seconds = time.perf_counter() - started
+    summary = {
+        'seconds': round(seconds, 3),
+        'jobs': jobs,
+        'apis': apis.stats,
+        'requests_by_path': requests_by_path,
+        'megabytes_sent': round(bytes_sent / (1024 * 1024), 3),
+        'telegram_messages': len(apis.messages),
+    }
+    with open(os.path.join(output, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Benzinga, Seeking Alpha, Reddit and Telegram APIs for "
+                                                 "end-to-end soak and throughput runs.")
+    parser.add_argument('--initial', type=int, default=INITIAL_ITEMS, help="Items per feed at start")
+    parser.add_argument('--publish-rate', type=float, default=PUBLISH_RATE, help="New items per second per feed")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.05, help="Up to this many more seconds, uniformly")
+    parser.add_argument('--rate-limit', type=float, help="Requests per second admitted per API (default unlimited)")
+    parser.add_argument('--burst', type=int, default=5)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 503")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="Serve the mock APIs and print the variables that point "
+                                                       "scrapers at them")
+    serve_parser.add_argument('--port', type=int, default=8787)
+
+    soak_parser = subparsers.add_parser('soak', help="Run scraper main() flows against the mock APIs")
+    soak_parser.add_argument('--source', action='append', choices=sorted(JOBS), help="Repeatable; defaults to all")
+    soak_parser.add_argument('--runs', type=int, default=1, help="main() calls per source")
+    soak_parser.add_argument('--duration', type=float, help="Stop starting new runs after this many seconds")
+    soak_parser.add_argument('--interval', type=float, default=0.0, help="Seconds between runs")
+    soak_parser.add_argument('--output', help=f"Logs, metrics and summary; defaults to {RESULTS_DIR}/soak-<time>")
+    args = parser.parse_args(argv)
+
+    apis = MockAPIs(args.initial, args.publish_rate, args.latency, args.jitter, args.rate_limit, args.burst,
+                    args.error_rate)
+    if args.command == 'serve':
+        with serve(apis.routes(), port=args.port) as server:
+            for name, value in environment(server.url).items():
+                print(f"export {name}={value}")
+            try:
+                while True:
+                    time.sleep(60)
+            except KeyboardInterrupt:
+                pass
+        print(json.dumps(apis.stats, indent=2))
+        return 0
+
+    output = args.output or os.path.join(RESULTS_DIR, f"soak-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    summary = soak(apis, args.source or sorted(JOBS), args.runs if not args.duration else sys.maxsize,
+                   args.duration, args.interval, output)
+    for source, job in summary['jobs'].items():
+        print(f"{source:<14} exit {job['exit_code']}  {job['seconds']:8.1f}s")
+    for api, stats in summary['apis'].items():
+        print(f"{api:<14} {stats['requests']:>8} requests  {stats['throttled']:>6} throttled  "
+              f"{stats['errors']:>6} errors  {stats['items']:>9} items")
+    print(f"{summary['megabytes_sent']:.2f} MB sent in {summary['seconds']:.1f}s - {output}")
+    return 0 if all(job['exit_code'] == 0 for job in summary['jobs'].values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.tickers import CREATE_ARTICLE_TICKER_TABLE
+from scraper.common.snapshots import CHANGE_COLUMNS
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# The benchmark database is configured separately from DB_* so a benchmark
+# never writes to the production database. The defaults match
+# benchmarks/docker-compose.yml.
+BENCH_DB_DEFAULTS = {
+    'BENCH_DB_HOST': '127.0.0.1',
+    'BENCH_DB_PORT': '3307',
+    'BENCH_DB_USER': 'root',
+    'BENCH_DB_PASSWORD': 'bench',
+    'BENCH_DB_DATABASE': 'llm_scraper_bench',
+}
+
+# Port of a mysqld started by embedded()
+EMBEDDED_PORT = 3317
+
+# Same tables and columns as production after the content hash and change
+# tracking migrations
+SOURCES = [
+    (1, 'benzinga', 'benzinga'),
+    (2, 'nasdaq', 'nasdaq'),
+    (3, 'reddit', 'reddit'),
+    (4, 'seeking_alpha_news', 'seeking_alpha'),
+    (5, 'seeking_alpha_article', 'seeking_alpha'),
+]
+
+_TRACKING = ',\n    '.join(f"{column} {definition}" for column, definition in CHANGE_COLUMNS.items())
+
+SCHEMA = [
+    """
+CREATE TABLE IF NOT EXISTS sources (
+    source_id INT PRIMARY KEY,
+    source_name VARCHAR(64),
+    source_type VARCHAR(64)
+);
+""",
+    f"""
+CREATE TABLE IF NOT EXISTS benzinga_db (
+    id BIGINT PRIMARY KEY,
+    author VARCHAR(255),
+    created DATETIME,
+    updated DATETIME,
+    title TEXT,
+    teaser TEXT,
+    body MEDIUMTEXT,
+    url TEXT,
+    stocks TEXT,
+    channels TEXT,
+    source_id INT,
+    content_hash CHAR(40),
+    {_TRACKING},
+    INDEX idx_benzinga_db_content_hash (content_hash),
+    INDEX idx_benzinga_db_updated_at (updated_at, id),
+    FOREIGN KEY (source_id) REFERENCES sources (source_id)
+);
+""",
+    f"""
+CREATE TABLE IF NOT EXISTS nasdaq_db (
+    id VARCHAR(16) PRIMARY KEY,
+    title TEXT,
+    datetime DATETIME,
+    body MEDIUMTEXT,
+    url TEXT,
+    source_id INT,
+    content_hash CHAR(40),
+    {_TRACKING},
+    INDEX idx_nasdaq_db_content_hash (content_hash),
+    INDEX idx_nasdaq_db_updated_at (updated_at, id),
+    FOREIGN KEY (source_id) REFERENCES sources (source_id)
+);
+""",
+    f"""
+CREATE TABLE IF NOT EXISTS reddit_submission (
+    id VARCHAR(15) PRIMARY KEY,
+    subreddit VARCHAR(255),
+    created_utc DATETIME,
+    title TEXT,
+    selftext MEDIUMTEXT,
+    url TEXT,
+    score INT,
+    num_comments INT,
+    ups INT,
+    author VARCHAR(255),
+    source_id INT,
+    content_hash CHAR(40),
+    {_TRACKING},
+    INDEX idx_reddit_submission_content_hash (content_hash),
+    INDEX idx_reddit_submission_updated_at (updated_at, id),
+    FOREIGN KEY (source_id) REFERENCES sources (source_id)
+);
+""",
+    f"""
+CREATE TABLE IF NOT EXISTS seeking_alpha_db (
+    id VARCHAR(20) PRIMARY KEY,
+    title TEXT,
+    published_on DATETIME NOT NULL,
+    last_modified DATETIME,
+    summary TEXT,
+    content MEDIUMTEXT NOT NULL,
+    url TEXT,
+    tickers_primary VARCHAR(255),
+    tickers_secondary VARCHAR(1000),
+    source_id INT,
+    content_hash CHAR(40),
+    {_TRACKING},
+    INDEX idx_seeking_alpha_db_content_hash (content_hash),
+    INDEX idx_seeking_alpha_db_updated_at (updated_at, id),
+    FOREIGN KEY (source_id) REFERENCES sources (source_id)
+);
+""",
+    CREATE_ARTICLE_TICKER_TABLE,
+]
+
+TABLES = ['article_ticker', 'benzinga_db', 'nasdaq_db', 'reddit_submission', 'seeking_alpha_db']
+
+
+# ----------------------------
+# Connection
+# ----------------------------
+
+def connection_params():
+    settings = {name: os.getenv(name, default) for name, default in BENCH_DB_DEFAULTS.items()}
+    return {
+        'host': settings['BENCH_DB_HOST'],
+        'port': int(settings['BENCH_DB_PORT']),
+        'user': settings['BENCH_DB_USER'],
+        'password': settings['BENCH_DB_PASSWORD'],
+        'database': settings['BENCH_DB_DATABASE'],
+    }
+
+
+def connect(create_database=True):
+    """
+    Connects to the benchmark database, creating it when missing.
+
+    Raises:
+        ImportError: When mysql-connector is not installed.
+        mysql.connector.Error: When the server is unreachable.
+    """
+    import mysql.connector
+
+    params = connection_params()
+    if create_database:
+        server = mysql.connector.connect(**{key: value for key, value in params.items() if key != 'database'})
+        cursor = server.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {params['database']} CHARACTER SET utf8mb4;")
+        cursor.close()
+        server.close()
+    return mysql.connector.connect(**params)
+
+
+def create_schema(connection):
+    cursor = connection.cursor()
+    try:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        cursor.executemany(
+            "INSERT INTO sources (source_id, source_name, source_type) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE source_name=VALUES(source_name);", SOURCES)
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def reset(connection):
+    """Empties the article tables, so every write benchmark starts from the same state."""
+    cursor = connection.cursor()
+    try:
+        for table in TABLES:
+            cursor.execute(f"TRUNCATE TABLE {table};")
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+# ----------------------------
+# Embedded Server
+# ----------------------------
+
+@contextlib.contextmanager
+def embedded(port=EMBEDDED_PORT, timeout=60):
+    """
+    Starts a throwaway mysqld from PATH on a temporary data directory and
+    points the BENCH_DB_* variables at it for the duration of the block.
+
+    Raises:
+        RuntimeError: When mysqld is not installed or does not come up.
+    """
+    mysqld = shutil.which('mysqld')
+    if mysqld is None:
+        raise RuntimeError("mysqld is not on PATH; use benchmarks/docker-compose.yml or set BENCH_DB_*")
+
+    directory = tempfile.mkdtemp(prefix='bench-mysql-')
+    datadir = os.path.join(directory, 'data')
+    common = [f"--datadir={datadir}", f"--socket={os.path.join(directory, 'mysql.sock')}",
+              f"--pid-file={os.path.join(directory, 'mysql.pid')}"]
+    subprocess.run([mysqld, '--no-defaults', '--initialize-insecure', *common],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    process = subprocess.Popen([mysqld, '--no-defaults', *common, f"--port={port}", '--bind-address=127.0.0.1',
+                                '--mysqlx=OFF', '--skip-log-bin'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    previous = {name: os.environ.get(name) for name in BENCH_DB_DEFAULTS}
+    os.environ.update({'BENCH_DB_HOST': '127.0.0.1', 'BENCH_DB_PORT': str(port),
+                       'BENCH_DB_USER': 'root', 'BENCH_DB_PASSWORD': ''})
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                connect().close()
+                break
+            except Exception:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Embedded mysqld did not start")
+                time.sleep(0.5)
+        yield connection_params()
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prepare the benchmark MySQL database.")
+    parser.add_argument('command', choices=['create', 'reset'])
+    args = parser.parse_args(argv)
+
+    connection = connect()
+    try:
+        create_schema(connection)
+        if args.command == 'reset':
+            reset(connection)
+    finally:
+        connection.close()
+    params = connection_params()
+    print(f"{args.command}: {params['user']}@{params['host']}:{params['port']}/{params['database']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import json
+import time
+import threading
+import contextlib
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# ----------------------------
+# Responses
+# ----------------------------
+
+def json_response(data, status=200, headers=None):
+    """(status, headers, body) for a JSON body."""
+    return status, dict(headers or {}, **{'Content-Type': 'application/json'}), json.dumps(data).encode()
+
+
+def text_response(text, status=200, content_type='text/html; charset=utf-8', headers=None):
+    return status, dict(headers or {}, **{'Content-Type': content_type}), text.encode()
+
+
+# ----------------------------
+# Stub Server
+# ----------------------------
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Local HTTP server answering from a route table.
+
+    `routes` maps a path to a handler called with a request object (method,
+    path, query as {name: first value}, headers, body) that returns
+    (status, headers, body bytes). A key ending in '/' also matches every
+    path under it (the longest such prefix wins). Every response is delayed by `latency`
+    seconds. Requests and response bytes are counted per path.
+    """
+    daemon_threads = True
+
+    def __init__(self, routes, latency=0.0, host='127.0.0.1', port=0):
+        super().__init__((host, port), StubHandler)
+        self.routes = routes
+        self.latency = latency
+        self.requests = {}
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    def route(self, path):
+        """Handler for a path: an exact match, else the longest matching '/'-terminated prefix."""
+        if path in self.routes:
+            return self.routes[path]
+        prefixes = [key for key in self.routes if key.endswith('/') and path.startswith(key)]
+        return self.routes[max(prefixes, key=len)] if prefixes else None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, path, size):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.bytes_sent += size
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _handle(self, method):
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        request = SimpleNamespace(
+            method=method,
+            path=parsed.path,
+            query={name: values[0] for name, values in parse_qs(parsed.query).items()},
+            headers=self.headers,
+            body=self.rfile.read(length) if length else b'',
+        )
+
+        handler = self.server.route(parsed.path)
+        if handler is None:
+            status, headers, body = json_response({'message': f"No route for {parsed.path}"}, 404)
+        else:
+            status, headers, body = handler(request)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record(parsed.path, len(body))
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve(routes, latency=0.0, host='127.0.0.1', port=0):
+    """Runs a StubServer on a background thread for the duration of the block."""
+    server = StubServer(routes, latency, host, port)
+    thread = threading.Thread(target=server.serve_forever, name='stub-server', daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,433 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common import rate_limiter
+from scraper.common.instrumentation import metrics
+from scraper.common.content_hash import with_content_hash, clear_caches
+
+import fixture_data
+from stub_server import serve, json_response
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+SOURCES = ['benzinga', 'seeking_alpha', 'reddit', 'nasdaq']
+STAGES = ['fetch', 'parse', 'transform', 'write']
+SIZES = [100, 1000, 10000]
+REPEAT = 3
+
+# Benzinga page size used by the scraper
+PAGE_SIZE = 100
+
+# A stage this much slower than the baseline is reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+# The stub answers instantly and the limiter is tested on its own
+# (check_rate_limiter.py), so it is opened up for the fetch stages.
+UNLIMITED = {'rate': 100000.0, 'max_rate': 100000.0, 'burst': 64}
+
+
+class Skip(Exception):
+    """A stage that cannot run here (missing dependency or database)."""
+
+
+def require(import_module):
+    """Runs an import function, turning a missing dependency into Skip."""
+    try:
+        return import_module()
+    except ImportError as e:
+        raise Skip(f"{type(e).__name__}: {e}")
+
+
+def best_of(repeat, run, setup=None):
+    """Best wall time of `repeat` calls of run(setup()), with setup outside the timing."""
+    best = float('inf')
+    for _ in range(repeat):
+        value = setup() if setup else None
+        started = time.perf_counter()
+        run(value)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def chunks(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def copies(pages):
+    return [[dict(item) for item in page] for page in pages]
+
+
+# ----------------------------
+# Database
+# ----------------------------
+
+_connection = None
+
+
+def bench_connection():
+    """Shared connection to the benchmark database (benchmarks/mysql_standin.py)."""
+    global _connection
+    if _connection is None:
+        import mysql_standin
+        try:
+            _connection = require(mysql_standin.connect)
+            mysql_standin.create_schema(_connection)
+        except Skip:
+            raise
+        except Exception as e:
+            raise Skip(f"benchmark database unavailable: {e}")
+    return _connection
+
+
+def fresh_tables():
+    """Empty tables and cold hash caches, so every write repeat inserts every row."""
+    import mysql_standin
+    connection = bench_connection()
+    mysql_standin.reset(connection)
+    clear_caches()
+    return connection
+
+
+# ----------------------------
+# Benzinga
+# ----------------------------
+
+def benzinga_modules():
+    from scraper.benzinga import benzinga_fetch, benzinga_pages
+    return benzinga_fetch, benzinga_pages
+
+
+def benzinga_scraper():
+    from scraper.benzinga import benzinga_scraper
+    return benzinga_scraper
+
+
+def benzinga_routes(articles):
+    def news(request):
+        page, page_size = int(request.query.get('page', 1)), int(request.query.get('pageSize', PAGE_SIZE))
+        return json_response(articles[(page - 1) * page_size:page * page_size])
+    return {'/api/v2/news': news}
+
+
+def benzinga_parsed(size):
+    benzinga_fetch, benzinga_pages = require(benzinga_modules)
+    pages = chunks(fixture_data.benzinga_articles(size), PAGE_SIZE)
+    for page in pages:
+        benzinga_pages.process_page(page)
+    return pages
+
+
+def bench_benzinga(stage, size, repeat):
+    benzinga_fetch, benzinga_pages = require(benzinga_modules)
+
+    if stage == 'fetch':
+        import requests
+        with serve(benzinga_routes(fixture_data.benzinga_articles(size))) as server:
+            benzinga_fetch.BASE_URL = server.url + '/api/v2/news'
+
+            def run(_):
+                with requests.Session() as session:
+                    page = 1
+                    while benzinga_fetch.get_page(None, '2024-05-01', page, PAGE_SIZE, session=session)[0]:
+                        page += 1
+            return best_of(repeat, run)
+
+    if stage == 'parse':
+        pages = chunks(fixture_data.benzinga_articles(size), PAGE_SIZE)
+        return best_of(repeat, lambda pages: [benzinga_pages.process_page(page) for page in pages],
+                       lambda: copies(pages))
+
+    scraper = require(benzinga_scraper)
+    pages = benzinga_parsed(size)
+    if stage == 'transform':
+        return best_of(repeat, lambda pages: [with_content_hash(scraper.benzinga_row_values(article))
+                                              for page in pages for article in page], lambda: copies(pages))
+
+    def write(connection):
+        for page in pages:
+            scraper.insert_data(connection, page)
+    return best_of(repeat, write, fresh_tables)
+
+
+# ----------------------------
+# Seeking Alpha
+# ----------------------------
+
+def seeking_alpha_modules():
+    from scraper.seeking_alpha import seeking_alpha_utils, seeking_alpha_article_fetcher, seeking_alpha_news_fecther
+    return seeking_alpha_utils, seeking_alpha_article_fetcher, seeking_alpha_news_fecther
+
+
+def seeking_alpha_routes(size):
+    details = {}
+
+    def article_list(request):
+        return json_response(fixture_data.seeking_alpha_article_list(int(request.query.get('size', size))))
+
+    def article_detail(request):
+        article_id = request.query.get('id')
+        if article_id not in details:
+            details[article_id] = fixture_data.seeking_alpha_article_detail(article_id)
+        return json_response(details[article_id])
+
+    def news_list(request):
+        return json_response(fixture_data.seeking_alpha_news_list(int(request.query.get('size', size))))
+
+    return {'/articles/v2/list': article_list, '/articles/get-details': article_detail, '/news/v2/list': news_list}
+
+
+def seeking_alpha_parsed(size):
+    utils, articles, news = require(seeking_alpha_modules)
+    article_list = fixture_data.seeking_alpha_article_list(size)
+    details = [articles.extract_article_detail(fixture_data.seeking_alpha_article_detail(item['id']))
+               for item in articles.extract_id(article_list)]
+    return news.extract_news(fixture_data.seeking_alpha_news_list(size)), details
+
+
+def bench_seeking_alpha(stage, size, repeat):
+    utils, articles, news = require(seeking_alpha_modules)
+
+    if stage == 'fetch':
+        with serve(seeking_alpha_routes(size)) as server:
+            previous = os.environ.get(utils.SEEKING_ALPHA_BASE_URL_ENV)
+            os.environ[utils.SEEKING_ALPHA_BASE_URL_ENV] = server.url
+
+            def run(_):
+                for item in articles.extract_id(articles.get_article_list(size)):
+                    articles.get_article_details(item['id'])
+                news.get_news(size)
+            try:
+                return best_of(repeat, run)
+            finally:
+                if previous is None:
+                    os.environ.pop(utils.SEEKING_ALPHA_BASE_URL_ENV, None)
+                else:
+                    os.environ[utils.SEEKING_ALPHA_BASE_URL_ENV] = previous
+
+    if stage == 'parse':
+        article_list = fixture_data.seeking_alpha_article_list(size)
+        details = [fixture_data.seeking_alpha_article_detail(item['id']) for item in article_list['data']]
+        news_list = fixture_data.seeking_alpha_news_list(size)
+
+        def run(_):
+            for detail in details:
+                articles.extract_article_detail(detail)
+            news.extract_news(news_list)
+        return best_of(repeat, run)
+
+    news_items, details = seeking_alpha_parsed(size)
+    if stage == 'transform':
+        def run(_):
+            [with_content_hash(utils.seeking_alpha_row_values(item, 4)) for item in news_items]
+            [with_content_hash(utils.seeking_alpha_row_values(item, 5)) for item in details]
+        return best_of(repeat, run)
+
+    def write(connection):
+        utils.insert_seeking_alpha_batch(connection, news_items, 4)
+        utils.insert_seeking_alpha_batch(connection, details, 5)
+    return best_of(repeat, write, fresh_tables)
+
+
+# ----------------------------
+# Reddit
+# ----------------------------
+
+def reddit_scraper():
+    from scraper.reddit import reddit_scraper
+    return reddit_scraper
+
+
+def bench_reddit(stage, size, repeat):
+    if stage == 'fetch':
+        raise Skip("PRAW listings are driven end to end by the mock API harness")
+    scraper = require(reddit_scraper)
+    submissions = fixture_data.reddit_submissions(size)
+
+    if stage == 'parse':
+        return best_of(repeat, lambda _: [scraper.process_submission(submission) for submission in submissions])
+
+    data = [scraper.process_submission(submission) for submission in submissions]
+    if stage == 'transform':
+        return best_of(repeat, lambda _: [with_content_hash(scraper.reddit_row_values(row)) for row in data])
+    return best_of(repeat, lambda connection: scraper.insert_reddit_data(connection, data), fresh_tables)
+
+
+# ----------------------------
+# Nasdaq
+# ----------------------------
+
+def nasdaq_modules():
+    from scraper.nasdaq import nasdaq_news_getter_for_scraping, nasdaq_scraper
+    return nasdaq_news_getter_for_scraping, nasdaq_scraper
+
+
+def bench_nasdaq(stage, size, repeat):
+    if stage == 'fetch':
+        raise Skip("Selenium page loads need Chrome; parse covers the page_source extraction")
+    getter, scraper = require(nasdaq_modules)
+    pages = [(url, fixture_data.PageSource(html)) for url, html in fixture_data.nasdaq_pages(size)]
+
+    def parse(_):
+        return [dict(getter.extract_article_fields(page, mode='page_source'), url=url) for url, page in pages]
+
+    if stage == 'parse':
+        return best_of(repeat, parse)
+
+    data = parse(None)
+    if stage == 'transform':
+        return best_of(repeat, lambda _: [with_content_hash(scraper.nasdaq_row_values(row)) for row in data])
+    return best_of(repeat, lambda connection: scraper.insert_data(connection, data), fresh_tables)
+
+
+BENCHMARKS = {
+    'benzinga': bench_benzinga,
+    'seeking_alpha': bench_seeking_alpha,
+    'reddit': bench_reddit,
+    'nasdaq': bench_nasdaq,
+}
+
+
+# ----------------------------
+# Runs and Comparison
+# ----------------------------
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def run_suite(sources, stages, sizes, repeat):
+    """
+    Runs every (source, stage, size) and returns the result document.
+    Stages that cannot run here are recorded with the reason instead of a time.
+    """
+    rate_limiter.RATE_LIMITS.update({'benzinga': UNLIMITED, 'seeking_alpha': UNLIMITED})
+    results = []
+    for source in sources:
+        for stage in stages:
+            for size in sizes:
+                entry = {'source': source, 'stage': stage, 'size': size}
+                metrics.reset()
+                try:
+                    seconds = BENCHMARKS[source](stage, size, repeat)
+                    entry.update(seconds=round(seconds, 6), items_per_second=round(size / seconds, 1))
+                    spans = sorted(metrics.snapshot()['spans'], key=lambda span: -span['seconds'])[:5]
+                    entry['top_spans'] = {span['name']: round(span['seconds'] / repeat, 6) for span in spans}
+                    print(f"{source:<14} {stage:<10} {size:>7}  {seconds * 1000:10.1f} ms  "
+                          f"{size / seconds:>12,.0f} items/s")
+                except Skip as e:
+                    entry['skipped'] = str(e)
+                    print(f"{source:<14} {stage:<10} {size:>7}  skipped: {e}")
+                    results.append(entry)
+                    break
+                results.append(entry)
+
+    commit, dirty = git_revision()
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Lines comparing two result documents and the number of regressions
+    (stages more than `threshold` slower than in the baseline).
+    """
+    key = lambda entry: (entry['source'], entry['stage'], entry['size'])
+    before = {key(entry): entry for entry in baseline['results'] if 'seconds' in entry}
+    lines = [f"{baseline['commit']} -> {current['commit']}" + (' (dirty)' if current.get('dirty') else '')]
+    regressions = 0
+    for entry in current['results']:
+        if 'seconds' not in entry or key(entry) not in before:
+            continue
+        ratio = entry['seconds'] / before[key(entry)]['seconds']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = '  faster'
+        lines.append(f"{entry['source']:<14} {entry['stage']:<10} {entry['size']:>7}  "
+                     f"{before[key(entry)]['seconds'] * 1000:10.1f} ms -> {entry['seconds'] * 1000:10.1f} ms  "
+                     f"{ratio:6.2f}x{flag}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark suite over recorded fixtures.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Benchmark the stages and write a JSON result file")
+    run_parser.add_argument('--source', action='append', choices=SOURCES, help="Repeatable; defaults to all")
+    run_parser.add_argument('--stage', action='append', choices=STAGES, help="Repeatable; defaults to all")
+    run_parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="Comma-separated item counts")
+    run_parser.add_argument('--repeat', type=int, default=REPEAT)
+    run_parser.add_argument('--embedded-mysql', action='store_true', help="Start a throwaway mysqld for the write stage")
+    run_parser.add_argument('--output', help=f"Result file; defaults to {RESULTS_DIR}/<time>-<commit>.json")
+    run_parser.add_argument('--baseline', help="Compare against this result file afterwards")
+
+    compare_parser = subparsers.add_parser('compare', help="Compare two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        lines, regressions = compare(baseline, current, args.threshold)
+        print('\n'.join(lines))
+        return 1 if regressions else 0
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    sources, stages = args.source or SOURCES, args.stage or STAGES
+    if args.embedded_mysql:
+        import mysql_standin
+        with mysql_standin.embedded():
+            document = run_suite(sources, stages, sizes, args.repeat)
+    else:
+        document = run_suite(sources, stages, sizes, args.repeat)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{document['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            lines, regressions = compare(json.load(f), document)
+        print('\n'.join(lines))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
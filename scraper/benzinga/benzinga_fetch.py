@@ -0,0 +1,233 @@
+import os
+import math
+import email.utils
+from concurrent.futures import ThreadPoolExecutor
+
+from scraper.benzinga.benzinga_pages import process_page
+from scraper.common.rate_limiter import limiter_for
+from scraper.common.instrumentation import timed
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Base URL for the Benzinga News API (overridable to point at a stub server)
+BASE_URL = os.getenv('BENZINGA_BASE_URL', "https://api.benzinga.com/api/v2/news")
+
+# Headers for the HTTP request
+HEADERS = {
+    "Accept": "application/json"
+}
+
+# displayOutput of the listing pass: 'headline' carries id, created and
+# updated without teaser or body; 'full' adds the HTML body.
+LIST_OUTPUT = os.getenv('BENZINGA_LIST_OUTPUT', 'headline')
+FULL_OUTPUT = 'full'
+
+# Full pages requested at once in the second pass; the shared limiter still
+# sets the overall request rate.
+FETCH_WORKERS = 4
+
+# Ids per lookup query against benzinga_db
+LOOKUP_BATCH = 1000
+
+
+# ----------------------------
+# Page Requests
+# ----------------------------
+
+def page_articles(data):
+    """Articles of a response body, which is either a list or a dict with an 'articles' key."""
+    if isinstance(data, dict):
+        articles = data.get("articles", [])
+        return articles if articles else []
+    if isinstance(data, list):
+        return data
+    raise ValueError("Unexpected response format. Unable to locate articles.")
+
+
+def get_page(api_key, date, page, page_size, display_output=FULL_OUTPUT, session=None, **filters):
+    """
+    Requests one page of news through the shared Benzinga rate limiter.
+    Extra keyword arguments (e.g. updatedSince) are added to the query.
+
+    Returns:
+        tuple: (articles, response)
+
+    Raises:
+        requests.exceptions.RequestException: On HTTP or connection errors.
+    """
+    query_params = {
+        "token": api_key,
+        "dateFrom": date,
+        "displayOutput": display_output,
+        "page": page,
+        "pageSize": page_size,
+        **filters
+    }
+    response = limiter_for('benzinga').get(BASE_URL, session=session, headers=HEADERS, params=query_params)
+    response.raise_for_status()
+    return page_articles(response.json()), response
+
+
+def new_transfer():
+    """Counters of one fetch run: requests and response bytes per pass."""
+    return {'list_requests': 0, 'list_bytes': 0, 'full_requests': 0, 'full_bytes': 0}
+
+
+# ----------------------------
+# Two-Phase Fetch
+# ----------------------------
+
+def unix_time(value):
+    """Unix timestamp of an RFC 2822 time, or None."""
+    try:
+        return int(email.utils.parsedate_to_datetime(value).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+@timed()
+def list_updates(api_key, date, page_size, max_pages, transfer, session=None, workers=None):
+    """
+    First pass: pages through the date with the lightweight output, `workers`
+    (default FETCH_WORKERS) pages at a time, until a short page. A page that
+    fails (an HTTP error, or the limiter's QuotaExhausted) ends the listing
+    after its batch; the pages listed so far are kept, so their articles are
+    still fetched and their 'created' times still count.
+
+    Returns:
+        tuple: ({article id: (page number, normalized 'updated', 'updated' as a
+        Unix timestamp or None)}, latest 'created' time)
+    """
+    import pandas as pd
+
+    workers = workers or FETCH_WORKERS
+    listing = {}
+    max_date = pd.to_datetime('1900-01-01')
+
+    def fetch(page):
+        try:
+            return get_page(api_key, date, page, page_size, LIST_OUTPUT, session)
+        except Exception as e:
+            print(f"Error listing page {page}: {e}")
+            return None, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for first in range(1, max_pages + 1, workers):
+            pages = range(first, min(first + workers, max_pages + 1))
+            done = False
+            for page, (articles, response) in zip(pages, executor.map(fetch, pages)):
+                if response is None:
+                    # Later pages of the batch may have succeeded; keep them and stop after it
+                    done = True
+                    continue
+                transfer['list_requests'] += 1
+                transfer['list_bytes'] += len(response.content)
+                if not articles:
+                    done = True
+                    break
+                page_max_date = process_page(articles)
+                if page_max_date is not None and page_max_date > max_date:
+                    max_date = page_max_date
+                for article in articles:
+                    listing.setdefault(str(article.get('id')), (page, article.get('updated_edt'),
+                                                                unix_time(article.get('updated'))))
+                if len(articles) < page_size:
+                    done = True
+                    break
+            if done:
+                break
+    return listing, max_date
+
+
+@timed()
+def stored_updates(connection, ids):
+    """{id: 'YYYY-MM-DD HH:MM:SS'} of the given ids already in benzinga_db."""
+    stored = {}
+    ids = list(ids)
+    cursor = connection.cursor()
+    try:
+        for start in range(0, len(ids), LOOKUP_BATCH):
+            chunk = ids[start:start + LOOKUP_BATCH]
+            cursor.execute(f"SELECT id, updated FROM benzinga_db WHERE id IN ({', '.join(['%s'] * len(chunk))});",
+                           chunk)
+            for article_id, updated in cursor.fetchall():
+                stored[str(article_id)] = updated.strftime('%Y-%m-%d %H:%M:%S') if updated is not None else None
+    finally:
+        cursor.close()
+    return stored
+
+
+def changed_ids(listing, stored):
+    """Ids that are new or whose 'updated' differs from the stored row."""
+    return {article_id for article_id, (_, updated, _) in listing.items()
+            if article_id not in stored or stored[article_id] != updated}
+
+
+def iter_changed_pages(api_key, date, page_size, listing, wanted, transfer, workers=None, session=None):
+    """
+    Second pass: fetches full output for the new or changed articles only,
+    `workers` (default FETCH_WORKERS) pages at a time, and yields just those
+    articles.
+
+    A new or edited article always has a recent 'updated' time, so the pass
+    asks for the date's articles with updatedSince set to the oldest
+    'updated' among them; the listing says how many pages that is, so they
+    are requested at once. Anything still missing (e.g. an old article that
+    never made it into the database) is taken from its listing page in full
+    output instead, and otherwise left for the next run.
+
+    Yields:
+        tuple: (articles of one page that are new or changed, latest 'created' time on them or None)
+    """
+    workers = workers or FETCH_WORKERS
+
+    def fetch(request):
+        page, filters = request
+        try:
+            return get_page(api_key, date, page, page_size, FULL_OUTPUT, session, **filters)
+        except Exception as e:
+            # Including QuotaExhausted: the article stays missing and is fetched next run
+            print(f"Error fetching full page {page}: {e}")
+            return [], None
+
+    def fetch_pages(batch):
+        """Yields (articles on the page, the new or changed ones) for (page, filters) requests."""
+        for articles, response in executor.map(fetch, batch):
+            if response is not None:
+                transfer['full_requests'] += 1
+                transfer['full_bytes'] += len(response.content)
+            found = [article for article in articles if str(article.get('id')) in missing]
+            missing.difference_update(str(article.get('id')) for article in found)
+            yield len(articles), found
+
+    missing = set(wanted)
+    if not missing:
+        return
+    times = [listing[article_id][2] for article_id in missing if listing[article_id][2] is not None]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if times:
+            filters = {'updatedSince': min(times)}
+            expected = sum(1 for (_, _, updated) in listing.values() if updated is not None and updated >= min(times))
+            pages = max(1, math.ceil(expected / page_size))
+            last = 0
+            for last, found in fetch_pages([(page, filters) for page in range(1, pages + 1)]):
+                if found:
+                    yield found, process_page(found)
+            # More articles were updated since the listing; keep paging until a short page
+            while last == page_size and missing:
+                pages += 1
+                last, found = next(fetch_pages([(pages, filters)]))
+                if found:
+                    yield found, process_page(found)
+
+        if missing:
+            pages = sorted({listing[article_id][0] for article_id in missing})
+            for _, found in fetch_pages([(page, {}) for page in pages]):
+                if found:
+                    yield found, process_page(found)
+
+    if missing:
+        print(f"{len(missing)} changed Benzinga articles were not found; they will be fetched on the next run.")
@@ -0,0 +1,99 @@
+import re
+
+# numpy and pandas are imported by the functions that use them, so importing
+# this module stays cheap
+
+from scraper.common.instrumentation import timed
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# RFC 2822 timestamps as returned by the API, e.g. "Wed, 17 May 2023 12:00:00 -0400"
+BENZINGA_DATE_FORMAT = '%a, %d %b %Y %H:%M:%S %z'
+BENZINGA_DATE_RE = re.compile(r'^\w{3}, (\d{2}) (\w{3}) (\d{4}) (\d{2}:\d{2}:\d{2}) ([+-])(\d{2})(\d{2})$')
+MONTHS = {name: f"{number:02d}" for number, name in enumerate(
+    ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], 1)}
+TIMEZONE = 'US/Eastern'
+
+# Keys added to each article with the timestamps already converted for MySQL
+NORMALIZED_KEYS = {'created': 'created_edt', 'updated': 'updated_edt'}
+
+
+# ----------------------------
+# Page Processing
+# ----------------------------
+
+def to_eastern(values):
+    """
+    Converts RFC 2822 timestamps to naive US/Eastern times in one batch.
+
+    Values in the API's fixed layout are rearranged into ISO strings and
+    shifted by their offsets with numpy; anything else goes through pandas'
+    format parser. Missing or unparseable values become NaT.
+
+    Returns:
+        np.ndarray: datetime64[s] values.
+    """
+    import numpy as np
+    import pandas as pd
+
+    iso, offsets, irregular = [], [], []
+    for position, value in enumerate(values):
+        match = BENZINGA_DATE_RE.match(value) if isinstance(value, str) else None
+        if match and match.group(2) in MONTHS:
+            day, month, year, clock, sign, hours, minutes = match.groups()
+            iso.append(f"{year}-{MONTHS[month]}-{day}T{clock}")
+            offset = int(hours) * 60 + int(minutes)
+            offsets.append(-offset if sign == '-' else offset)
+        else:
+            iso.append('NaT')
+            offsets.append(0)
+            if value:
+                irregular.append(position)
+
+    utc = np.array(iso, dtype='datetime64[s]') - np.array(offsets, dtype='timedelta64[m]')
+    if irregular:
+        parsed = pd.to_datetime(pd.Series([values[position] for position in irregular], dtype=object),
+                                format=BENZINGA_DATE_FORMAT, utc=True, errors='coerce')
+        utc[irregular] = parsed.dt.tz_localize(None).to_numpy().astype('datetime64[s]')
+
+    eastern = pd.DatetimeIndex(utc).tz_localize('UTC').tz_convert(TIMEZONE).tz_localize(None)
+    return eastern.to_numpy().astype('datetime64[s]')
+
+
+@timed()
+def process_page(articles):
+    """
+    Normalizes the timestamps of one API page as a batch.
+
+    Every article gets 'created_edt' and 'updated_edt' as MySQL DATETIME
+    strings (None when the value cannot be parsed), so insert_data does not
+    parse them again.
+
+    Args:
+        articles (list): Article dicts of one page.
+
+    Returns:
+        pd.Timestamp: Latest 'created' time on the page (naive US/Eastern), or None.
+    """
+    if not articles:
+        return None
+
+    import numpy as np
+    import pandas as pd
+
+    keys = list(NORMALIZED_KEYS)
+    times = to_eastern([article.get(key) for key in keys for article in articles])
+    formatted = np.datetime_as_string(times, unit='s').tolist()
+    missing = np.isnat(times).tolist()
+
+    for index, key in enumerate(keys):
+        offset = index * len(articles)
+        for position, article in enumerate(articles):
+            value = formatted[offset + position]
+            article[NORMALIZED_KEYS[key]] = None if missing[offset + position] else value.replace('T', ' ')
+
+    created = times[:len(articles)]
+    created = created[~np.isnat(created)]
+    return pd.Timestamp(created.max()) if len(created) else None
@@ -1,9 +1,19 @@
 from scraper.benzinga.benzinga_scraper import *
 import pandas as pd
 
-if __name__ == '__main__':
-    date = "2010-01-01"
-    end_date = datetime.now() - timedelta(days=10)
+# Backfill window: from START_DATE up to END_LAG_DAYS before today
+START_DATE = "2010-01-01"
+END_LAG_DAYS = 10
+
+
+def backfill(start_date=START_DATE, end_date=None):
+    """
+    Walks the Benzinga history from start_date to end_date (default:
+    END_LAG_DAYS ago), one main() run per step; each step starts two days
+    before the latest 'created' time of the previous one.
+    """
+    date = start_date
+    end_date = pd.to_datetime(end_date) if end_date else datetime.now() - timedelta(days=END_LAG_DAYS)
 
     while pd.to_datetime(date) <= end_date:
         max_date = main(date)
@@ -11,3 +21,8 @@ if __name__ == '__main__':
 
         next_date = max_date - timedelta(days = 2)
         date = next_date.strftime('%Y-%m-%d')
+
+
+if __name__ == '__main__':
+    load_environment()
+    backfill()
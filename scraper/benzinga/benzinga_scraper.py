@@ -1,114 +1,100 @@
-import requests
 import json
 import time
 import os
-from mysql.connector import Error
 from datetime import datetime, timedelta
-import pytz
-from dotenv import load_dotenv
-import os
-import json
-import schedule
-import mysql.connector
-from mysql.connector import Error
-from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-from datetime import datetime
-import pytz
-import pandas as pd
-
-load_dotenv()
+import sys
+import queue
+import threading
+
+# requests, pandas, pytz, BeautifulSoup and mysql.connector are imported by the
+# functions that use them, so importing this module (benzinga_past_upload does
+# it with import *) stays cheap and side-effect free
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scraper.common.parquet_archive import open_archive
+from scraper.common.instrumentation import timed, instrumented_run
+from scraper.benzinga.benzinga_pages import process_page
+from scraper.benzinga.benzinga_fetch import (BASE_URL, HEADERS, get_page, new_transfer, list_updates,
+                                             stored_updates, changed_ids, iter_changed_pages)
+from scraper.common.content_hash import upsert_changed
+from scraper.common.near_dup import index_documents
+from scraper.common.search_index import index_articles, tickers_by_article
+from scraper.common.tickers import ticker_rows, split_joined, replace_article_tickers, ROLE_STOCK, ROLE_CHANNEL
+from scraper.common.runtime import load_environment, run_daily
 
 # ----------------------------
 # Configuration and Parameters
 # ----------------------------
 
-# Replace with your actual Benzinga API key
-API_KEY = os.getenv('BENZINGA_API_KEY')
-
-# Base URL for the Benzinga News API
-BASE_URL = "https://api.benzinga.com/api/v2/news"
+# Benzinga API key, read when a fetch starts so .env loaded by the entry point applies
+API_KEY_ENV = 'BENZINGA_API_KEY'
 
 # Pagination settings
 PAGE_SIZE = 100  # Number of articles per page (adjust based on API limits)
 MAX_PAGES = 100  # Maximum number of pages to fetch to prevent infinite loops
 
-# Headers for the HTTP request
-HEADERS = {
-    "Accept": "application/json"
-}
+# Fetch/insert pipeline
+QUEUE_PAGES = 4  # Pages buffered between the fetching and writing threads
+WRITE_BATCH_PAGES = 2  # Pages upserted per insert_data call
+
+# 'lean' lists ids and updated times first and downloads full bodies only for
+# new or changed articles; 'full' downloads every article in full output.
+FETCH_MODE_ENV = 'BENZINGA_FETCH_MODE'
+FETCH_MODE = 'lean'
+
+# Directory that receives every raw 'full' page response; unset means none are kept
+RECORD_DIR_ENV = 'BENZINGA_RECORD_DIR'
+
+# Daily run times, every two hours on the hour
+SCHEDULE = [f"{hour:02d}:00" for hour in range(1, 24, 2)]
 
 # ----------------------------
 # Function Definitions
 # ----------------------------
 
-def fetch_news(api_key, date, page_size=50, max_pages=100):
+def iter_news_pages(api_key, date, page_size=50, max_pages=100, archive=None, record_dir=None, transfer=None):
     """
-    Fetches all news articles from Benzinga for a specific date.
+    Fetches news articles from Benzinga for a specific date, one page at a time.
 
     Args:
         api_key (str): Your Benzinga API key.
         date (str): The date for which to retrieve news (format: YYYY-MM-DD).
         page_size (int, optional): Number of articles per page. Defaults to 50.
         max_pages (int, optional): Maximum number of pages to fetch. Defaults to 100.
+        archive (ArchiveWriter, optional): Parquet archive that receives each page as it arrives.
+        record_dir (str, optional): Directory that receives each raw page response as page-NNNN.json.
+        transfer (dict, optional): Counters from new_transfer() that receive requests and bytes.
 
-    Returns:
-        list: A list of all fetched news articles.
+    Yields:
+        tuple: (articles of one page, latest 'created' time on the page or None)
     """
-    all_articles = []
+    import requests
+
     current_page = 1
-    max_date = pd.to_datetime('1900-01-01')
 
     while current_page <= max_pages:
         print(f"Fetching page {current_page}...")
 
-        # Define query parameters for the API request
-        query_params = {
-            "token": api_key,
-            "dateFrom": date,
-            "displayOutput": "full",  # Options: 'abstract', 'full', etc.
-            "page": current_page,
-            "pageSize": page_size
-        }
-
         try:
-            response = requests.get(BASE_URL, headers=HEADERS, params=query_params)
-            response.raise_for_status()  # Raises HTTPError for bad responses (4xx or 5xx)
-
-            data = response.json()
-
-            # Inspect the response structure
-            if isinstance(data, dict):
-                # Assuming articles are under the 'articles' key
-                articles = data.get("articles", [])
-
-                # If 'articles' key doesn't exist, assume the entire response is a list
-                if not articles:
-                    articles = data if isinstance(data, list) else []
-            elif isinstance(data, list):
-                # If the response is a list, assign it directly
-                articles = data
-            else:
-                # Unexpected format
-                print("Unexpected response format. Unable to locate articles.")
-                break
+            articles, response = get_page(api_key, date, current_page, page_size)
+            if transfer is not None:
+                transfer['full_requests'] += 1
+                transfer['full_bytes'] += len(response.content)
+            if record_dir:
+                with open(os.path.join(record_dir, f"page-{current_page:04d}.json"), 'w', encoding='utf-8') as f:
+                    f.write(response.text)
 
             if not articles:
                 print("No more articles found.")
                 break  # Exit the loop if no articles are returned
 
-            # Update last date
-            for article in articles:
-                article_date = article.get('created', '1900-01-01')
-                article_date = pd.to_datetime(convert_to_edt_datetime(article_date))
-                if article_date > max_date:
-                    max_date = article_date
+            # Normalize the page's timestamps in one pass
+            page_max_date = process_page(articles)
 
-            all_articles.extend(articles)
+            if archive is not None:
+                archive.write(articles)
             print(f"Fetched {len(articles)} articles from page {current_page}.")
-
-            # Optional: Respect API rate limits by adding a delay
-            time.sleep(1)  # Sleep for 1 second between requests
+            yield articles, page_max_date
 
             current_page += 1  # Move to the next page
 
@@ -124,11 +110,31 @@ def fetch_news(api_key, date, page_size=50, max_pages=100):
             print(f"JSON decode error: {json_err}")
             print("Terminating the fetch process.")
             break
+        except ValueError as value_err:
+            print(value_err)
+            break
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
             print("Terminating the fetch process.")
             break
 
+
+@timed()
+def fetch_news(api_key, date, page_size=50, max_pages=100, archive=None, record_dir=None):
+    """
+    Fetches all news articles from Benzinga for a specific date.
+
+    Returns:
+        tuple: (list of all fetched news articles, latest 'created' time)
+    """
+    import pandas as pd
+
+    all_articles = []
+    max_date = pd.to_datetime('1900-01-01')
+    for articles, page_max_date in iter_news_pages(api_key, date, page_size, max_pages, archive, record_dir):
+        all_articles.extend(articles)
+        if page_max_date is not None and page_max_date > max_date:
+            max_date = page_max_date
     return all_articles, max_date
 
 # ----------------------------
@@ -137,9 +143,13 @@ def fetch_news(api_key, date, page_size=50, max_pages=100):
 
 # Database connection
 def create_connection():
+    import mysql.connector
+    from mysql.connector import Error
+
     try:
         connection = mysql.connector.connect(
             host=os.getenv('DB_HOST'),
+            port=int(os.getenv('DB_PORT', 3306)),
             user=os.getenv('DB_USER'),
             password=os.getenv('DB_PASSWORD'),
             database=os.getenv('DB_DATABASE')
@@ -151,7 +161,10 @@ def create_connection():
         print(f"Error: {e}")
         return None
 
+@timed()
 def extract_text_from_html(html):
+    from bs4 import BeautifulSoup
+
     # Create a BeautifulSoup object to parse the HTML
     soup = BeautifulSoup(html, 'html.parser')
 
@@ -163,7 +176,10 @@ def extract_text_from_html(html):
 
     return cleaned_text
 
+@timed()
 def convert_to_edt_datetime(date_str):
+    import pytz
+
     # Parse the date string into a naive datetime object (ignoring timezone for now)
     naive_datetime = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %z')
 
@@ -173,39 +189,200 @@ def convert_to_edt_datetime(date_str):
 
     return edt_datetime.strftime('%Y-%m-%d %H:%M:%S')
 
+# Column values for one Benzinga article, in benzinga_db column order
+def benzinga_row_values(row):
+    return (
+        row.get('id'),
+        row.get('author'),
+        # Normalized by process_page while fetching; parsed here only for other callers
+        row['created_edt'] if 'created_edt' in row else convert_to_edt_datetime(row.get('created')),
+        row['updated_edt'] if 'updated_edt' in row else convert_to_edt_datetime(row.get('updated')),
+        row.get('title'),
+        extract_text_from_html(row.get('teaser')),
+        extract_text_from_html(row.get('body')),
+        row.get('url'),
+        ','.join([stock['name'] for stock in row.get('stocks', [])]),
+        ','.join([channel['name'] for channel in row.get('channels', [])]),
+        1  # The source_id for Benzinga data is 1
+    )
+
 # Parse jsonl file and insert into table
+@timed()
 def insert_data(connection, data):
+    from mysql.connector import Error
+
     insert_query = """
-    INSERT INTO benzinga_db (id, author, created, updated, title, teaser, body, url, stocks, channels, source_id)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    INSERT INTO benzinga_db (id, author, created, updated, title, teaser, body, url, stocks, channels, source_id, content_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     ON DUPLICATE KEY UPDATE
         author=VALUES(author), created=VALUES(created), updated=VALUES(updated),
         title=VALUES(title), teaser=VALUES(teaser), body=VALUES(body), url=VALUES(url),
-        stocks=VALUES(stocks), channels=VALUES(channels), source_id=VALUES(source_id);
+        stocks=VALUES(stocks), channels=VALUES(channels), source_id=VALUES(source_id),
+        content_hash=VALUES(content_hash);
     """
-    cursor = connection.cursor()
-
-    for row in data:
-        cursor.execute(insert_query, (
-            row.get('id'),
-            row.get('author'),
-            convert_to_edt_datetime(row.get('created')),
-            convert_to_edt_datetime(row.get('updated')),
-            row.get('title'),
-            extract_text_from_html(row.get('teaser')),
-            extract_text_from_html(row.get('body')),
-            row.get('url'),
-            ','.join([stock['name'] for stock in row.get('stocks', [])]),
-            ','.join([channel['name'] for channel in row.get('channels', [])]),
-            1  # The source_id for Benzinga data is 1
-        ))
-    connection.commit()
+    rows = [benzinga_row_values(row) for row in data]
+
+    # Rows whose content hash is unchanged are skipped
+    stats = upsert_changed(connection, 'benzinga_db', insert_query, rows)
+
+    # Normalized stock/channel rows for the articles that were written
+    written = [row for row in rows if str(row[0]) in stats['written_ids']]
+    tickers = []
+    for row in written:
+        tickers += ticker_rows(1, row[0], row[2], split_joined(row[8]), ROLE_STOCK)
+        tickers += ticker_rows(1, row[0], row[2], split_joined(row[9]), ROLE_CHANNEL)
+    try:
+        replace_article_tickers(connection, 1, [row[0] for row in written], tickers)
+    except Error as e:
+        print(f"Error writing article_ticker rows: {e}")
+
+    # Full-text index of the written articles (title, body, stocks)
+    symbols = tickers_by_article(tickers)
+    index_articles([(1, row[0], row[2], row[4], row[6], symbols.get(str(row[0]))) for row in written])
+
+    # Cluster ids in the cross-source near-duplicate index (id, body)
+    index_documents([(1, row[0], row[6]) for row in rows])
+    return stats
+
+
+# ----------------------------
+# Fetch/Insert Pipeline
+# ----------------------------
+
+def write_pages(page_queue, totals):
+    """
+    Writer thread: drains pages from the queue until a None sentinel and
+    upserts them in batches of up to WRITE_BATCH_PAGES pages. Pages are still
+    drained when the database is unreachable, so the fetcher never blocks.
+    """
+    connection = create_connection()
+    finished = False
+    try:
+        while not finished:
+            batch = []
+            page = page_queue.get()
+            while True:
+                if page is None:
+                    finished = True
+                    break
+                batch.extend(page)
+                if len(batch) >= WRITE_BATCH_PAGES * PAGE_SIZE:
+                    break
+                try:
+                    page = page_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if not batch or connection is None:
+                continue
+            started = time.perf_counter()
+            try:
+                stats = insert_data(connection, batch)
+                totals['written'] += stats['inserted'] + stats['updated']
+            except Exception as e:
+                # Keep draining: a dead writer would leave the fetcher blocked on a full queue
+                print(f"Error inserting {len(batch)} Benzinga articles: {e}")
+            totals['write_seconds'] += time.perf_counter() - started
+    finally:
+        if connection is not None:
+            connection.close()
+            print("MySQL connection closed.")
+
+
+def iter_lean_pages(api_key, date, page_size, max_pages, archive=None, transfer=None):
+    """
+    Two-phase fetch: lists the date's ids and updated times with the
+    lightweight output, looks them up in benzinga_db and downloads full
+    output only for the pages holding new or changed articles.
+
+    Returns:
+        tuple: (iterator of (articles, page max 'created') for the changed
+        articles, latest 'created' time over the whole listing)
+    """
+    from mysql.connector import Error
+
+    transfer = transfer if transfer is not None else new_transfer()
+    listing, max_date = list_updates(api_key, date, page_size, max_pages, transfer)
+
+    stored = {}
+    if listing:
+        connection = create_connection()
+        if connection is not None:
+            try:
+                stored = stored_updates(connection, listing)
+            except Error as e:
+                print(f"Error looking up stored Benzinga articles: {e}")
+            finally:
+                connection.close()
+    wanted = changed_ids(listing, stored)
+    print(f"Listed {len(listing)} Benzinga articles, {len(wanted)} new or changed.")
+
+    def pages():
+        for articles, page_max_date in iter_changed_pages(api_key, date, page_size, listing, wanted, transfer):
+            if archive is not None:
+                archive.write(articles)
+            yield articles, page_max_date
+
+    return pages(), max_date
+
+
+@timed()
+def fetch_and_insert(date, archive=None, record_dir=None, mode=None):
+    """
+    Fetches pages on the calling thread while a writer thread upserts them.
+
+    Pages pass through a queue bounded at QUEUE_PAGES, so at most a few pages
+    are held in memory, and network and database time overlap. `mode` is
+    'lean' or 'full' (defaults to $BENZINGA_FETCH_MODE, then FETCH_MODE);
+    record_dir applies to 'full'.
+
+    Returns:
+        tuple: (articles fetched, latest 'created' time, totals dict with the transfer counters)
+    """
+    import pandas as pd
+
+    mode = mode or os.getenv(FETCH_MODE_ENV, FETCH_MODE)
+    api_key = os.getenv(API_KEY_ENV)
+    page_queue = queue.Queue(maxsize=QUEUE_PAGES)
+    totals = {'written': 0, 'write_seconds': 0.0}
+    transfer = new_transfer()
+    writer = threading.Thread(target=write_pages, args=(page_queue, totals), name='benzinga-writer')
+    writer.start()
+
+    fetched = 0
+    max_date = pd.to_datetime('1900-01-01')
+    try:
+        if mode == 'lean':
+            try:
+                pages, max_date = iter_lean_pages(api_key, date, PAGE_SIZE, MAX_PAGES, archive, transfer)
+            except Exception as e:
+                # list_updates keeps the pages it could list; this is a failure outside them
+                print(f"Error listing Benzinga articles: {e}")
+                pages = iter([])
+        else:
+            pages = iter_news_pages(api_key, date, PAGE_SIZE, MAX_PAGES, archive, record_dir, transfer)
+        try:
+            for articles, page_max_date in pages:
+                page_queue.put(articles)
+                fetched += len(articles)
+                if page_max_date is not None and page_max_date > max_date:
+                    max_date = page_max_date
+        except Exception as e:
+            # End the run with what was fetched: the queued pages are still
+            # written, and max_date and the totals cover them
+            print(f"Error fetching Benzinga pages: {e}")
+    finally:
+        page_queue.put(None)
+        writer.join()
+    totals.update(transfer)
+    return fetched, max_date, totals
 
 
 # ----------------------------
 # Main Execution Flow
 # ----------------------------
 
+@instrumented_run('benzinga')
 def main(date=None):
 
 
@@ -223,32 +400,23 @@ def main(date=None):
 
     print(f"Starting to fetch Benzinga news articles from {START_DATE}...")
 
-    # Fetch all news articles
-    news_articles, max_date = fetch_news(
-        api_key=API_KEY,
-        date=START_DATE,
-        page_size=PAGE_SIZE,
-        max_pages=MAX_PAGES
-    )
-
-    print(f"Total articles fetched: {len(news_articles)} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    # Fetch news articles and save them to SQL db as the pages arrive
+    archive = open_archive('benzinga')
+    started = time.perf_counter()
+    try:
+        fetched, max_date, totals = fetch_and_insert(START_DATE, archive, os.getenv(RECORD_DIR_ENV))
+    finally:
+        if archive is not None:
+            archive.close()
 
-    connection = create_connection()
-    if connection and news_articles:
-        # Save the fetched articles to SQL db
-        insert_data(connection, news_articles)
-        connection.close()
-        print("MySQL connection closed.")
+    received = (totals['list_bytes'] + totals['full_bytes']) / (1024 * 1024)
+    print(f"Total articles fetched: {fetched}, written: {totals['written']} - "
+          f"{time.perf_counter() - started:.1f}s wall, {totals['write_seconds']:.1f}s writing, "
+          f"{totals['list_requests'] + totals['full_requests']} requests, {received:.2f} MB received - "
+          f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     return max_date
 
-# Schedule the function to run at specific times
-for hour in range(1, 24, 2):
-    time_str = f"{hour:02d}:00"
-    schedule.every().day.at(time_str).do(main)
-
 if __name__ == "__main__":
-    main()
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    load_environment()
+    run_daily(main, SCHEDULE, run_now=True)
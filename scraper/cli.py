@@ -0,0 +1,258 @@
+"""
+llm-scraper: one entry point for every scraper and loader.
+
+    llm-scraper benzinga --once --workers 8 --rate-limit 5
+    llm-scraper reddit --limit 1000 --interval 20 --archive-dir /srv/parquet
+    llm-scraper seeking-alpha --news 50 --articles 50 --workers 4
+    llm-scraper nasdaq --max-pages 10 --data-dir /srv/data
+    llm-scraper upload benzinga 'data/benzinga_data/*.jsonl' --batch-size 50000
+    llm-scraper backfill --start-date 2020-01-01
+
+Flags override the module settings of the scraper they run (the same
+constants the scripts use), and output sinks are passed on through the
+environment variables the shared modules already read. Without --once a
+scraper follows its own schedule, as when it is run as a script.
+"""
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper.common.runtime import load_environment, configure_logging, run_daily, run_periodically, DATA_DIR_ENV
+from scraper.common.parquet_archive import ARCHIVE_DIR_ENV
+from scraper.common.instrumentation import METRICS_DIR_ENV, PROFILER_ENV
+from scraper.common.search_index import INDEX_PATH_ENV as SEARCH_INDEX_PATH_ENV
+from scraper.common.near_dup import INDEX_PATH_ENV as NEAR_DUP_INDEX_PATH_ENV
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Sink flag -> environment variable it sets for the run
+SINK_ENVS = {
+    'archive_dir': ARCHIVE_DIR_ENV,
+    'metrics_dir': METRICS_DIR_ENV,
+    'profiler': PROFILER_ENV,
+    'search_index': SEARCH_INDEX_PATH_ENV,
+    'near_dup_index': NEAR_DUP_INDEX_PATH_ENV,
+}
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+
+def override(module, **settings):
+    """Sets module-level settings, skipping the flags that were not given."""
+    for name, value in settings.items():
+        if value is not None:
+            setattr(module, name, value)
+
+
+def set_env(name, value):
+    if value is not None:
+        os.environ[name] = str(value)
+
+
+def apply_rate_limit(api, args):
+    """Applies --rate-limit/--max-rate/--burst to the API's shared limiter settings."""
+    from scraper.common import rate_limiter
+
+    limits = dict(rate_limiter.RATE_LIMITS.get(api, rate_limiter.DEFAULT_LIMITS))
+    if args.rate_limit is not None:
+        limits['rate'] = args.rate_limit
+        limits['max_rate'] = max(limits['max_rate'], args.rate_limit)
+    if args.max_rate is not None:
+        limits['max_rate'] = args.max_rate
+    if args.burst is not None:
+        limits['burst'] = args.burst
+    rate_limiter.RATE_LIMITS[api] = limits
+
+
+def data_dir(args, *parts):
+    """Path under --data-dir (or $SCRAPER_DATA_DIR), or None to keep the module default."""
+    root = args.data_dir or os.getenv(DATA_DIR_ENV)
+    return os.path.join(root, *parts) if root else None
+
+
+def follow(job, args, times=None, seconds=None, run_now=True):
+    """Runs job once with --once; otherwise on the daily times or every `seconds`."""
+    if args.once:
+        job()
+    elif times:
+        run_daily(job, times, run_now=run_now)
+    else:
+        run_periodically(job, seconds)
+    return 0
+
+
+# ----------------------------
+# Commands
+# ----------------------------
+
+def apply_benzinga(args):
+    from scraper.benzinga import benzinga_scraper, benzinga_fetch
+
+    override(benzinga_scraper, PAGE_SIZE=args.page_size, MAX_PAGES=args.max_pages,
+             QUEUE_PAGES=args.queue_pages, WRITE_BATCH_PAGES=args.batch_size)
+    override(benzinga_fetch, FETCH_WORKERS=args.workers)
+    set_env(benzinga_scraper.FETCH_MODE_ENV, args.mode)
+    set_env(benzinga_scraper.RECORD_DIR_ENV, args.record_dir)
+    apply_rate_limit('benzinga', args)
+    return benzinga_scraper
+
+
+def run_benzinga(args):
+    scraper = apply_benzinga(args)
+    return follow(lambda: scraper.main(args.date), args, times=scraper.SCHEDULE)
+
+
+def run_backfill(args):
+    apply_benzinga(args)
+    from scraper.benzinga.benzinga_past_upload import backfill
+
+    backfill(args.start_date, args.end_date)
+    return 0
+
+
+def run_reddit(args):
+    from scraper.reddit import reddit_scraper, reddit_fetch
+
+    override(reddit_scraper, SUBMISSION_LIMIT=args.limit, RUN_INTERVAL_MINUTES=args.interval,
+             OUTPUT_DIR=data_dir(args, 'reddit_data'))
+    override(reddit_fetch, FETCH_WORKERS=args.workers, SHARD_CAPACITY=args.shard_capacity)
+    apply_rate_limit('reddit', args)
+    if args.subreddits:
+        reddit_scraper.SUBREDDITS = [name.strip() for name in args.subreddits.split(',') if name.strip()]
+    return follow(reddit_scraper.main, args, seconds=reddit_scraper.RUN_INTERVAL_MINUTES * 60)
+
+
+def run_seeking_alpha(args):
+    from scraper.seeking_alpha import seeking_alpha_scraper, seeking_alpha_article_fetcher
+
+    override(seeking_alpha_scraper, NEWS_COUNT=args.news, ARTICLE_COUNT=args.articles)
+    override(seeking_alpha_article_fetcher, DETAIL_WORKERS=args.workers)
+    apply_rate_limit('seeking_alpha', args)
+    return follow(seeking_alpha_scraper.main, args, times=seeking_alpha_scraper.SCHEDULE, run_now=False)
+
+
+def run_nasdaq(args):
+    from scraper.nasdaq import nasdaq_scraper, nasdaq_url_getter_for_scraping, nasdaq_news_getter_for_scraping
+
+    override(nasdaq_url_getter_for_scraping, MAX_PAGES=args.max_pages,
+             NASDAQ_DATA_DIR=data_dir(args, 'nasdaq_data', 'urls'))
+    override(nasdaq_news_getter_for_scraping, EXTRACTION_MODE=args.extraction_mode,
+             NASDAQ_DATA_DIR=data_dir(args, 'nasdaq_data', 'articles'))
+    if args.show_browser:
+        nasdaq_scraper.HEADLESS = False
+    try:
+        return follow(nasdaq_scraper.main, args, times=nasdaq_scraper.SCHEDULE)
+    finally:
+        if nasdaq_scraper.browser is not None:
+            nasdaq_scraper.browser.quit()
+
+
+def run_upload(args):
+    from SQL import bulk_loader
+
+    argv = [args.source, *args.paths]
+    if args.batch_size:
+        argv += ['--chunk-rows', str(args.batch_size)]
+    if args.benchmark:
+        argv.append('--benchmark')
+    return bulk_loader.main(argv)
+
+
+# ----------------------------
+# Argument Parsing
+# ----------------------------
+
+def build_parser():
+    sinks = argparse.ArgumentParser(add_help=False)
+    group = sinks.add_argument_group('output')
+    group.add_argument('--archive-dir', help=f"Write raw records to a Parquet archive (${ARCHIVE_DIR_ENV})")
+    group.add_argument('--metrics-dir', help=f"Export run metrics (${METRICS_DIR_ENV})")
+    group.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], help=f"Profile every run (${PROFILER_ENV})")
+    group.add_argument('--search-index', help=f"Full-text index path (${SEARCH_INDEX_PATH_ENV})")
+    group.add_argument('--near-dup-index', help=f"Near-duplicate index path (${NEAR_DUP_INDEX_PATH_ENV})")
+    group.add_argument('--log-file', help="Log file; defaults to the scraper's own, or stderr")
+
+    scheduled = argparse.ArgumentParser(add_help=False)
+    scheduled.add_argument('--once', action='store_true', help="Run a single pass and exit instead of following the schedule")
+
+    limits = argparse.ArgumentParser(add_help=False)
+    group = limits.add_argument_group('rate limits')
+    group.add_argument('--rate-limit', type=float, help="Starting requests per second")
+    group.add_argument('--max-rate', type=float, help="Ceiling the limiter may ramp up to")
+    group.add_argument('--burst', type=int, help="Requests allowed back to back")
+
+    benzinga = argparse.ArgumentParser(add_help=False)
+    group = benzinga.add_argument_group('benzinga')
+    group.add_argument('--mode', choices=['lean', 'full'], help="Fetch mode (default: $BENZINGA_FETCH_MODE or lean)")
+    group.add_argument('--page-size', type=int, help="Articles per API page")
+    group.add_argument('--max-pages', type=int, help="Pages fetched per run")
+    group.add_argument('--workers', type=int, help="Pages requested concurrently")
+    group.add_argument('--queue-pages', type=int, help="Pages buffered between fetching and writing")
+    group.add_argument('--batch-size', type=int, help="Pages upserted per database write")
+    group.add_argument('--record-dir', help="Keep every raw 'full' page response here")
+
+    parser = argparse.ArgumentParser(prog='llm-scraper', description="Run the news scrapers and loaders.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('benzinga', parents=[sinks, scheduled, limits, benzinga],
+                                  help="Benzinga news API, every two hours")
+    command.add_argument('--date', help="Fetch articles from this date (default: three days ago)")
+    command.set_defaults(handler=run_benzinga, log_file_default=None)
+
+    command = commands.add_parser('backfill', parents=[sinks, limits, benzinga], help="Benzinga history, date by date")
+    command.add_argument('--start-date', default='2010-01-01')
+    command.add_argument('--end-date', help="Default: ten days ago")
+    command.set_defaults(handler=run_backfill, log_file_default=None)
+
+    command = commands.add_parser('reddit', parents=[sinks, scheduled, limits],
+                                  help="New submissions of the finance subreddits")
+    command.add_argument('--limit', type=int, help="Newest submissions requested per shard")
+    command.add_argument('--workers', type=int, help="Subreddit shards fetched concurrently")
+    command.add_argument('--shard-capacity', type=int, help="Expected posts per shard and run before it is split")
+    command.add_argument('--subreddits', help="Comma-separated list replacing the default subreddits")
+    command.add_argument('--interval', type=float, help="Minutes between runs")
+    command.add_argument('--data-dir', help=f"Root of the JSONL output (${DATA_DIR_ENV})")
+    command.set_defaults(handler=run_reddit, log_file_default='reddit_scraper.log')
+
+    command = commands.add_parser('seeking-alpha', parents=[sinks, scheduled, limits],
+                                  help="Seeking Alpha news and articles, every hour")
+    command.add_argument('--news', type=int, help="News items requested per run")
+    command.add_argument('--articles', type=int, help="Articles requested per run")
+    command.add_argument('--workers', type=int, help="Article details requested concurrently")
+    command.set_defaults(handler=run_seeking_alpha, log_file_default=None)
+
+    command = commands.add_parser('nasdaq', parents=[sinks, scheduled], help="Nasdaq articles through Selenium")
+    command.add_argument('--max-pages', type=int, help="Listing pages per section")
+    command.add_argument('--extraction-mode', choices=['script', 'page_source', 'elements'])
+    command.add_argument('--show-browser', action='store_true', help="Run Chrome with a window")
+    command.add_argument('--data-dir', help=f"Root of the JSONL output (${DATA_DIR_ENV})")
+    command.set_defaults(handler=run_nasdaq, log_file_default='nasdaq_scraper.log')
+
+    command = commands.add_parser('upload', help="Bulk load scraped JSONL files into MySQL")
+    command.add_argument('source', choices=['benzinga', 'nasdaq', 'reddit'])
+    command.add_argument('paths', nargs='+', help="JSONL files or glob patterns")
+    command.add_argument('--batch-size', type=int, help="Rows per LOAD DATA round")
+    command.add_argument('--benchmark', action='store_true', help="Compare against the row-by-row uploader")
+    command.set_defaults(handler=run_upload)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    load_environment()
+
+    if 'archive_dir' in args:
+        for flag, name in SINK_ENVS.items():
+            set_env(name, getattr(args, flag))
+        log_file = args.log_file or args.log_file_default
+        configure_logging(log_file, console=log_file is None)
+    return args.handler(args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+
+from scraper.common.instrumentation import count
+
+# requests is imported by the sender thread on its first delivery, so
+# importing this module stays cheap
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Read when a message is delivered, so .env loaded by the entry point applies
+TELEGRAM_BOT_TOKEN_ENV = 'TELEGRAM_BOT_TOKEN'
+TELEGRAM_CHAT_ID_ENV = 'TELEGRAM_CHAT_ID'
+
+# API endpoint (overridable to point at a stub server)
+TELEGRAM_API_URL_ENV = 'TELEGRAM_API_URL'
+TELEGRAM_API_URL = 'https://api.telegram.org'
+
+# Distinct messages waiting for the sender thread; alerts beyond this are
+# dropped rather than making the caller wait
+QUEUE_SIZE = 100
+
+# (connect, read) timeout of one sendMessage request, in seconds
+SEND_TIMEOUT = (3.05, 10)
+
+# Minimum seconds between two deliveries; Telegram throttles a bot that
+# sends more than about one message per second to the same chat
+MIN_INTERVAL = 1.0
+
+# An identical message within this many seconds of the last delivery is
+# counted instead of sent, and the count is reported with its next delivery
+REPEAT_WINDOW = 300
+
+# Longest wait for a Telegram 429 retry_after before the message is given up
+MAX_RETRY_AFTER = 30
+
+# Seconds the process waits at exit for queued alerts to go out
+EXIT_FLUSH_SECONDS = 5
+
+
+# ----------------------------
+# Telegram Delivery
+# ----------------------------
+
+def telegram_send(text, session=None):
+    """
+    Posts one Markdown message to the configured chat. Returns True when it was
+    delivered, False when it was not, or the seconds Telegram asked to wait.
+    """
+    import requests
+
+    token = os.getenv(TELEGRAM_BOT_TOKEN_ENV)
+    chat_id = os.getenv(TELEGRAM_CHAT_ID_ENV)
+    if not token or not chat_id:
+        logging.warning(f"Telegram alert not sent ({TELEGRAM_BOT_TOKEN_ENV}/{TELEGRAM_CHAT_ID_ENV} unset): {text}")
+        return False
+
+    api_url = os.getenv(TELEGRAM_API_URL_ENV, TELEGRAM_API_URL)
+    url = f"{api_url}/bot{token}/sendMessage"
+    payload = {'chat_id': chat_id, 'text': text, 'parse_mode': 'Markdown'}
+    try:
+        response = (session or requests).post(url, data=payload, timeout=SEND_TIMEOUT)
+    except requests.RequestException as e:
+        logging.error(f"Exception occurred while sending Telegram message: {e}")
+        return False
+
+    if response.status_code == 200:
+        logging.info("Telegram message sent successfully.")
+        return True
+    if response.status_code == 429:
+        try:
+            return float(response.json()['parameters']['retry_after'])
+        except (ValueError, KeyError, TypeError):
+            return MIN_INTERVAL
+    logging.error(f"Failed to send Telegram message. Status Code: {response.status_code}, Response: {response.text}")
+    return False
+
+
+# ----------------------------
+# Background Sender
+# ----------------------------
+
+class AlertSender:
+    """
+    Delivers alerts from a background thread so a slow or unreachable
+    Telegram never blocks the scrape loop.
+
+    alert() only enqueues. A message that is already queued, or that was
+    delivered less than repeat_window seconds ago, is coalesced: it is counted
+    and the count goes out with the next delivery of that message. Deliveries
+    are spaced min_interval apart; when the queue is full new alerts are
+    dropped and counted.
+    """
+
+    def __init__(self, send=telegram_send, queue_size=None, min_interval=None, repeat_window=None):
+        self.send = send
+        self.min_interval = MIN_INTERVAL if min_interval is None else min_interval
+        self.repeat_window = REPEAT_WINDOW if repeat_window is None else repeat_window
+        self.queue = queue.Queue(maxsize=queue_size or QUEUE_SIZE)
+        self.lock = threading.Lock()
+        # message -> {'queued': bool, 'repeats': int, 'sent_at': float or None}
+        self.messages = {}
+        self.thread = None
+        self.last_send = 0.0
+
+    def alert(self, message):
+        """Queues message for delivery without waiting; False when it was dropped."""
+        now = time.monotonic()
+        with self.lock:
+            state = self.messages.setdefault(message, {'queued': False, 'repeats': 0, 'sent_at': None})
+            recent = state['sent_at'] is not None and now - state['sent_at'] < self.repeat_window
+            if state['queued'] or recent:
+                state['repeats'] += 1
+                count('alerts_coalesced')
+                return True
+            try:
+                self.queue.put_nowait(message)
+            except queue.Full:
+                count('alerts_dropped')
+                logging.warning(f"Alert queue full; dropped: {message}")
+                return False
+            state['queued'] = True
+            self.start()
+        return True
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name='alert-sender', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        import requests
+
+        session = requests.Session()
+        while True:
+            message = self.queue.get()
+            try:
+                self.deliver(message, session)
+            except Exception as e:
+                logging.error(f"Alert delivery failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def deliver(self, message, session):
+        with self.lock:
+            state = self.messages[message]
+            repeats, state['repeats'] = state['repeats'], 0
+        text = message if not repeats else f"{message}\n_(repeated {repeats} more time{'s' if repeats > 1 else ''})_"
+
+        result = False
+        try:
+            for attempt in range(2):
+                time.sleep(max(0.0, self.last_send + self.min_interval - time.monotonic()))
+                self.last_send = time.monotonic()
+                result = self.send(text, session)
+                if result is True or result is False:
+                    break
+                # Throttled: wait as long as asked and retry once
+                count('alerts_throttled')
+                if attempt == 0:
+                    time.sleep(min(result, MAX_RETRY_AFTER))
+                result = False
+        finally:
+            count('alerts_sent' if result is True else 'alerts_failed')
+            now = time.monotonic()
+            with self.lock:
+                state['queued'] = False
+                state['sent_at'] = now
+                # Forget messages whose repeat window is over and that have nothing to report
+                for stale in [key for key, other in self.messages.items()
+                              if not other['queued'] and not other['repeats']
+                              and (other['sent_at'] is None or now - other['sent_at'] >= self.repeat_window)]:
+                    del self.messages[stale]
+
+    def flush(self, timeout=None):
+        """Waits up to timeout seconds (forever when None) for queued alerts; True when none are left."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if self.thread is None or not self.thread.is_alive():
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def sender():
+    """Returns the process-wide sender shared by every scraper, created on first use."""
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            _sender = AlertSender()
+            atexit.register(_sender.flush, EXIT_FLUSH_SECONDS)
+        return _sender
+
+
+def alert(message):
+    """Sends message to the alert chat in the background; never blocks on the network."""
+    return sender().alert(message)
+
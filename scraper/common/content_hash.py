@@ -0,0 +1,189 @@
+import hashlib
+from collections import OrderedDict
+
+from scraper.common.instrumentation import span, count
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+HASH_COLUMN = 'content_hash'
+
+# Ids looked up per SELECT ... WHERE id IN (...)
+LOOKUP_BATCH = 1000
+
+# Ids remembered per table between batches of a long-running scraper
+CACHE_SIZE = 200000
+
+# Tables written through upsert_changed
+HASHED_TABLES = ['benzinga_db', 'nasdaq_db', 'reddit_submission', 'seeking_alpha_db']
+
+
+# ----------------------------
+# Hashing
+# ----------------------------
+
+def content_hash(values):
+    """SHA-1 hex digest over the column values of one row."""
+    payload = '\x1f'.join('' if value is None else str(value) for value in values)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def with_content_hash(values):
+    """Returns the row values with their content hash appended as the last column."""
+    values = tuple(values)
+    return values + (content_hash(values),)
+
+
+# ----------------------------
+# Schema Migration
+# ----------------------------
+
+def add_content_hash_column(connection, table):
+    """Adds the indexed content_hash column to a table. Safe to re-run."""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s;",
+            (table, HASH_COLUMN)
+        )
+        if cursor.fetchone()[0]:
+            print(f"Table '{table}' already has {HASH_COLUMN}.")
+            return
+        cursor.execute(f"""
+        ALTER TABLE {table}
+        ADD COLUMN {HASH_COLUMN} CHAR(40),
+        ADD INDEX idx_{table}_{HASH_COLUMN} ({HASH_COLUMN});
+        """)
+        connection.commit()
+        print(f"Added {HASH_COLUMN} to '{table}'.")
+    finally:
+        cursor.close()
+
+
+# ----------------------------
+# Skip-unchanged Upserts
+# ----------------------------
+
+class HashCache:
+    """Bounded id -> content hash map, evicting the least recently used ids."""
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self._hashes = OrderedDict()
+
+    def get(self, id_):
+        hash_ = self._hashes.get(id_)
+        if hash_ is not None:
+            self._hashes.move_to_end(id_)
+        return hash_
+
+    def put(self, id_, hash_):
+        self._hashes[id_] = hash_
+        self._hashes.move_to_end(id_)
+        if len(self._hashes) > self.max_size:
+            self._hashes.popitem(last=False)
+
+
+_caches = {}
+
+
+def get_cache(table):
+    """Process-wide hash cache for a table."""
+    if table not in _caches:
+        _caches[table] = HashCache()
+    return _caches[table]
+
+
+def clear_caches():
+    """Forgets every cached hash, e.g. after the tables were emptied."""
+    _caches.clear()
+
+
+def fetch_hashes(cursor, table, ids):
+    """Returns {id: content_hash} for the ids that already exist in the table."""
+    hashes = {}
+    ids = list(ids)
+    for start in range(0, len(ids), LOOKUP_BATCH):
+        chunk = ids[start:start + LOOKUP_BATCH]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"SELECT id, {HASH_COLUMN} FROM {table} WHERE id IN ({placeholders});", chunk)
+        for id_, hash_ in cursor.fetchall():
+            hashes[str(id_)] = hash_
+    return hashes
+
+
+def upsert_changed(connection, table, insert_query, rows, use_cache=True):
+    """
+    Upserts only the rows whose content changed.
+
+    Each row is hashed, compared with the stored content_hash (first from the
+    process cache, then from the table), and only new or changed rows are sent
+    through `insert_query`. The query must take the row values followed by the
+    content_hash, with the id as the first value.
+
+    With use_cache, ids seen earlier in this process skip the lookup. A row
+    rewritten by another process since then is only re-checked once its
+    content changes again.
+
+    Args:
+        connection: MySQL connection.
+        table (str): Target table.
+        insert_query (str): INSERT ... ON DUPLICATE KEY UPDATE statement including content_hash.
+        rows (iterable): Row value tuples without the hash.
+        use_cache (bool, optional): Consult and update the process-wide hash cache.
+
+    Returns:
+        dict: Counts of 'inserted', 'updated' and 'skipped' rows, plus the
+        'written_ids' (as strings) that were inserted or updated.
+    """
+    rows = [with_content_hash(values) for values in rows]
+    cache = get_cache(table) if use_cache else None
+
+    # Last copy of a duplicated id wins, as with sequential upserts
+    latest = {}
+    for row in rows:
+        latest[str(row[0])] = row
+
+    stored = {}
+    unknown = []
+    for id_ in latest:
+        cached = cache.get(id_) if cache else None
+        if cached is None:
+            unknown.append(id_)
+        else:
+            stored[id_] = cached
+
+    cursor = connection.cursor()
+    try:
+        stored.update(fetch_hashes(cursor, table, unknown))
+
+        to_write = []
+        stats = {'inserted': 0, 'updated': 0, 'skipped': len(rows) - len(latest), 'written_ids': set()}
+        for id_, row in latest.items():
+            if id_ not in stored:
+                stats['inserted'] += 1
+            elif stored[id_] != row[-1]:
+                stats['updated'] += 1
+            else:
+                stats['skipped'] += 1
+                continue
+            to_write.append(row)
+            stats['written_ids'].add(id_)
+
+        with span('mysql_write', table=table):
+            if to_write:
+                cursor.executemany(insert_query, to_write)
+            connection.commit()
+    finally:
+        cursor.close()
+
+    if cache:
+        for id_, row in latest.items():
+            cache.put(id_, row[-1])
+
+    for outcome in ('inserted', 'updated', 'skipped'):
+        count('rows', stats[outcome], table=table, outcome=outcome)
+    print(f"{table}: inserted {stats['inserted']}, updated {stats['updated']}, skipped {stats['skipped']} unchanged.")
+    return stats
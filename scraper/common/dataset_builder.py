@@ -0,0 +1,505 @@
+import os
+import re
+import sys
+import json
+import time
+import array
+import hashlib
+import logging
+import argparse
+import importlib
+import unicodedata
+from abc import ABC, abstractmethod
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# zstandard is only needed for the jsonl.zst format, pyarrow for arrow
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+    ipc = None
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+FORMATS = ('jsonl.zst', 'arrow')
+
+MAX_TOKENS = 2048  # Tokens per chunk
+OVERLAP = 0  # Tokens repeated at the start of the next chunk
+MIN_DOC_TOKENS = 16  # Shorter documents are dropped
+SHARD_DOCS = 5000  # Source documents per shard
+ZSTD_LEVEL = 3
+
+MANIFEST = 'manifest.jsonl'
+
+CONTROL_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u200b-\u200f\u2060\ufeff]')
+SPACES_RE = re.compile('[ \t\u00a0]+')
+BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+
+# Top bit marks near-duplicate cluster ids in the seen set; content hashes use the lower 63 bits
+CLUSTER_FLAG = 1 << 63
+
+
+# ----------------------------
+# Cleaning and Deduplication
+# ----------------------------
+
+def clean_text(text):
+    """NFKC-normalized text without control or zero-width characters and with collapsed whitespace."""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text).replace('\r\n', '\n').replace('\r', '\n')
+    text = CONTROL_RE.sub('', text)
+    text = '\n'.join(SPACES_RE.sub(' ', line).strip() for line in text.split('\n'))
+    return BLANK_LINES_RE.sub('\n\n', text).strip()
+
+
+def document_text(record):
+    """Title and body (or summary, when there is no body) of a unified document."""
+    title = clean_text(record.get('title'))
+    body = clean_text(record.get('body')) or clean_text(record.get('summary'))
+    return f"{title}\n\n{body}" if title and body else title or body
+
+
+def dedup_key(record):
+    """
+    63-bit hash of the whitespace-normalized body (or title), so syndicated
+    copies under different headlines count as duplicates. Cheap enough to run
+    in the reading process; full cleaning happens in the workers.
+    """
+    text = record.get('body') or record.get('summary') or record.get('title')
+    if not text or not text.strip():
+        return None
+    digest = hashlib.blake2b(' '.join(text.split()).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') & (CLUSTER_FLAG - 1)
+
+
+# ----------------------------
+# Tokenizers
+# ----------------------------
+
+class Tokenizer(ABC):
+    """
+    Base tokenizer. Subclasses implement encode and decode; chunk splits a
+    text into (chunk_text, token_count) pieces of at most max_tokens tokens.
+    """
+
+    @abstractmethod
+    def encode(self, text):
+        pass
+
+    @abstractmethod
+    def decode(self, ids):
+        pass
+
+    def chunk(self, text, max_tokens=MAX_TOKENS, overlap=OVERLAP):
+        ids = self.encode(text)
+        return [(self.decode(window), len(window)) for window in windows(ids, max_tokens, overlap)]
+
+
+def windows(items, size, overlap):
+    step = max(size - overlap, 1)
+    for start in range(0, len(items), step):
+        yield items[start:start + size]
+        if start + size >= len(items):
+            break
+
+
+class WhitespaceTokenizer(Tokenizer):
+    """Words and punctuation as tokens; chunks are sliced from the original text."""
+
+    TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+    def encode(self, text):
+        return self.TOKEN_RE.findall(text)
+
+    def decode(self, ids):
+        return ' '.join(ids)
+
+    def chunk(self, text, max_tokens=MAX_TOKENS, overlap=OVERLAP):
+        spans = [match.span() for match in self.TOKEN_RE.finditer(text)]
+        return [(text[window[0][0]:window[-1][1]], len(window)) for window in windows(spans, max_tokens, overlap)]
+
+
+class TiktokenTokenizer(Tokenizer):
+    """OpenAI BPE encodings through tiktoken, e.g. 'tiktoken:cl100k_base'."""
+
+    def __init__(self, encoding='cl100k_base'):
+        import tiktoken
+        self.encoding = tiktoken.get_encoding(encoding)
+
+    def encode(self, text):
+        return self.encoding.encode_ordinary(text)
+
+    def decode(self, ids):
+        return self.encoding.decode(ids)
+
+
+class HuggingFaceTokenizer(Tokenizer):
+    """Hugging Face `tokenizers` models, e.g. 'hf:gpt2'; chunks are sliced by token offsets."""
+
+    def __init__(self, name='gpt2'):
+        from tokenizers import Tokenizer as HFTokenizer
+        self.tokenizer = HFTokenizer.from_pretrained(name)
+
+    def encode(self, text):
+        return self.tokenizer.encode(text, add_special_tokens=False).ids
+
+    def decode(self, ids):
+        return self.tokenizer.decode(ids)
+
+    def chunk(self, text, max_tokens=MAX_TOKENS, overlap=OVERLAP):
+        offsets = self.tokenizer.encode(text, add_special_tokens=False).offsets
+        return [(text[window[0][0]:window[-1][1]], len(window)) for window in windows(offsets, max_tokens, overlap)]
+
+
+TOKENIZERS = {
+    'whitespace': WhitespaceTokenizer,
+    'tiktoken': TiktokenTokenizer,
+    'hf': HuggingFaceTokenizer,
+}
+
+
+def load_tokenizer(spec):
+    """
+    Builds a tokenizer from 'name[:argument]', where name is a key of TOKENIZERS,
+    or from 'package.module:ClassName' for a custom Tokenizer subclass.
+    """
+    name, _, argument = spec.partition(':')
+    if name in TOKENIZERS:
+        return TOKENIZERS[name](argument) if argument else TOKENIZERS[name]()
+    module = importlib.import_module(name)
+    return getattr(module, argument)()
+
+
+# ----------------------------
+# Shard Writing (worker processes)
+# ----------------------------
+
+_tokenizer = None
+
+
+def _init_worker(tokenizer_spec):
+    global _tokenizer
+    _tokenizer = load_tokenizer(tokenizer_spec)
+
+
+def shard_name(index, fmt):
+    return f"shard-{index:06d}.{fmt}"
+
+
+def chunk_records(documents, max_tokens, overlap):
+    """Chunk records for unified documents, skipping documents under MIN_DOC_TOKENS."""
+    records = []
+    for record in documents:
+        chunks = _tokenizer.chunk(document_text(record), max_tokens, overlap)
+        if sum(count for _, count in chunks) < MIN_DOC_TOKENS:
+            continue
+        for number, (chunk, count) in enumerate(chunks):
+            records.append({
+                'source_id': record.get('source_id'),
+                'id': record.get('id'),
+                'published': record.get('published'),
+                'chunk': number,
+                'n_chunks': len(chunks),
+                'n_tokens': count,
+                'text': chunk,
+            })
+    return records
+
+
+def write_shard(index, documents, hashes, output_dir, fmt, max_tokens, overlap):
+    """
+    Tokenizes, chunks and writes one shard, plus the `.seen` file with the
+    dedup keys of its documents. Both are written under temporary names and
+    renamed, so a shard on disk is always complete.
+
+    Returns:
+        tuple: (index, chunks, tokens, characters)
+    """
+    records = chunk_records(documents, max_tokens, overlap)
+    path = os.path.join(output_dir, shard_name(index, fmt))
+
+    if fmt == 'arrow':
+        table = pa.Table.from_pylist(records, schema=chunk_schema())
+        with pa.OSFile(path + '.tmp', 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        with open(path + '.tmp', 'wb') as f:
+            with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(f, closefd=False) as compressed:
+                for record in records:
+                    compressed.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+    os.replace(path + '.tmp', path)
+
+    seen_path = os.path.join(output_dir, f"shard-{index:06d}.seen")
+    with open(seen_path + '.tmp', 'wb') as f:
+        array.array('Q', hashes).tofile(f)
+    os.replace(seen_path + '.tmp', seen_path)
+
+    return (index, len(records), sum(record['n_tokens'] for record in records),
+            sum(len(record['text']) for record in records))
+
+
+def chunk_schema():
+    return pa.schema([
+        ('source_id', pa.int32()),
+        ('id', pa.string()),
+        ('published', pa.string()),
+        ('chunk', pa.int32()),
+        ('n_chunks', pa.int32()),
+        ('n_tokens', pa.int32()),
+        ('text', pa.string()),
+    ])
+
+
+# ----------------------------
+# Manifest and Resume
+# ----------------------------
+
+def load_manifest(output_dir):
+    """Returns {shard index: manifest entry} for the shards completed so far."""
+    path = os.path.join(output_dir, MANIFEST)
+    entries = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry['shard']] = entry
+    return entries
+
+
+def resume_point(output_dir, entries):
+    """
+    Returns (next shard index, source position to resume after, seen keys).
+
+    Shards finish out of order, so only the contiguous run of completed shards
+    from 0 counts; later shards are rebuilt. The dedup keys of the counted
+    shards are reloaded from their `.seen` files.
+    """
+    index = 0
+    position = None
+    seen = set()
+    while index in entries:
+        position = entries[index]['last']
+        keys = array.array('Q')
+        with open(os.path.join(output_dir, f"shard-{index:06d}.seen"), 'rb') as f:
+            keys.frombytes(f.read())
+        seen.update(keys)
+        index += 1
+    return index, position, seen
+
+
+# ----------------------------
+# Sources
+# ----------------------------
+
+def mysql_source(tables=None, since=None, until=None, after=None):
+    """Unified documents from MySQL in timestamp order; positions are (published, table, id) watermarks."""
+    from scraper.common.documents import stream_documents, to_record, create_connection
+
+    watermark = tuple(after) if after else None
+    for table, row in stream_documents(create_connection, tables, watermark, since, until):
+        record = to_record(row)
+        if isinstance(record['published'], datetime):
+            record['published'] = record['published'].strftime('%Y-%m-%d %H:%M:%S')
+        yield [record['published'], table, record['id']], record
+
+
+def jsonl_source(path, after=None):
+    """Unified documents from a documents export; positions are line numbers."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f):
+            if after is not None and number <= after:
+                continue
+            if line.strip():
+                yield number, json.loads(line)
+
+
+# ----------------------------
+# Pipeline
+# ----------------------------
+
+def build_dataset(source, output_dir, tokenizer_spec='whitespace', fmt='jsonl.zst', max_tokens=MAX_TOKENS,
+                  overlap=OVERLAP, shard_docs=SHARD_DOCS, workers=None, first_shard=0, seen=None,
+                  near_dup_index=None):
+    """
+    Deduplicates, cleans, chunks and shards documents in parallel.
+
+    The main process reads `source` and drops exact duplicates (and
+    near-duplicates when a NearDupIndex is given). Every `shard_docs` kept
+    documents become one shard, which a worker process cleans, tokenizes,
+    chunks and writes. At most two shards per worker are queued, so
+    memory stays bounded. Each finished shard is appended to the manifest with
+    the source position of its last document.
+
+    Args:
+        source (iterable): (position, unified document dict) pairs in a stable order.
+        output_dir (str): Directory for the shards and manifest.
+        tokenizer_spec (str, optional): See load_tokenizer.
+        fmt (str, optional): 'jsonl.zst' or 'arrow'.
+        max_tokens (int, optional): Tokens per chunk.
+        overlap (int, optional): Tokens shared by consecutive chunks.
+        shard_docs (int, optional): Documents per shard.
+        workers (int, optional): Worker processes; defaults to the CPU count.
+        first_shard (int, optional): Index of the first shard written in this run.
+        seen (set, optional): Dedup keys of documents already written.
+        near_dup_index (NearDupIndex, optional): Keep one document per near-duplicate cluster.
+
+    Returns:
+        dict: Document, duplicate, shard, chunk and token counts, elapsed seconds and tokens/sec.
+    """
+    if fmt == 'jsonl.zst' and zstandard is None:
+        raise ImportError("zstandard is required for the jsonl.zst format")
+    if fmt == 'arrow' and pa is None:
+        raise ImportError("pyarrow is required for the arrow format")
+    load_tokenizer(tokenizer_spec)  # Fail fast on a bad spec before starting workers
+
+    os.makedirs(output_dir, exist_ok=True)
+    seen = set() if seen is None else seen
+    workers = workers or os.cpu_count() or 1
+    stats = {'documents': 0, 'duplicates': 0, 'empty': 0, 'shards': 0, 'chunks': 0, 'tokens': 0}
+    started = time.perf_counter()
+    last_report = started
+
+    manifest = open(os.path.join(output_dir, MANIFEST), 'a', encoding='utf-8')
+    pending = {}
+    shard = first_shard
+
+    def collect(done):
+        nonlocal last_report
+        for future in done:
+            index, chunks, tokens, characters = future.result()
+            manifest.write(json.dumps({'shard': index, 'file': shard_name(index, fmt), 'chunks': chunks,
+                                       'tokens': tokens, 'characters': characters,
+                                       'last': pending.pop(future)}) + '\n')
+            manifest.flush()
+            stats['shards'] += 1
+            stats['chunks'] += chunks
+            stats['tokens'] += tokens
+        now = time.perf_counter()
+        if now - last_report >= 10:
+            last_report = now
+            logging.info(f"{stats['shards']} shards, {stats['tokens']:,} tokens, "
+                         f"{stats['tokens'] / (now - started):,.0f} tokens/sec")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(tokenizer_spec,)) as executor:
+            documents, hashes, position = [], [], None
+
+            def submit():
+                nonlocal shard, documents, hashes
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = executor.submit(write_shard, shard, documents, hashes, output_dir, fmt,
+                                         max_tokens, overlap)
+                pending[future] = position
+                shard += 1
+                documents, hashes = [], []
+
+            for position, record in source:
+                stats['documents'] += 1
+                key = dedup_key(record)
+                if key is None:
+                    stats['empty'] += 1
+                    continue
+
+                keys = [key]
+                if near_dup_index is not None:
+                    cluster_id = near_dup_index.cluster_of(record.get('source_id'), record.get('id'))
+                    if cluster_id is not None:
+                        keys.append(CLUSTER_FLAG | cluster_id)
+                if any(key in seen for key in keys):
+                    stats['duplicates'] += 1
+                    continue
+                seen.update(keys)
+
+                documents.append(record)
+                hashes.extend(keys)
+                if len(documents) >= shard_docs:
+                    submit()
+
+            if documents:
+                submit()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+    finally:
+        manifest.close()
+
+    stats['elapsed'] = time.perf_counter() - started
+    stats['tokens_per_sec'] = stats['tokens'] / stats['elapsed'] if stats['elapsed'] else 0.0
+    return stats
+
+
+# ----------------------------
+# Command Line
+# ----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build tokenized, chunked training shards from the scraped articles.")
+    parser.add_argument('output_dir')
+    parser.add_argument('--input', help="Read a documents export (JSONL) instead of MySQL")
+    parser.add_argument('--table', action='append', help="MySQL table to include; repeatable")
+    parser.add_argument('--since', help="Inclusive start, 'YYYY-MM-DD[ HH:MM:SS]'")
+    parser.add_argument('--until', help="Exclusive end, 'YYYY-MM-DD[ HH:MM:SS]'")
+    parser.add_argument('--tokenizer', default='whitespace',
+                        help="whitespace, tiktoken[:encoding], hf[:model] or package.module:ClassName")
+    parser.add_argument('--format', choices=FORMATS, default='jsonl.zst')
+    parser.add_argument('--max-tokens', type=int, default=MAX_TOKENS)
+    parser.add_argument('--overlap', type=int, default=OVERLAP)
+    parser.add_argument('--shard-docs', type=int, default=SHARD_DOCS)
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--near-dup', action='store_true', help="Keep one document per near-duplicate cluster")
+    parser.add_argument('--resume', action='store_true', help="Continue from the manifest in output_dir")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    first_shard, after, seen = 0, None, set()
+    if args.resume:
+        first_shard, after, seen = resume_point(args.output_dir, load_manifest(args.output_dir))
+        logging.info(f"Resuming at shard {first_shard} after {after} ({len(seen)} dedup keys).")
+
+    if args.input:
+        source = jsonl_source(args.input, after)
+    else:
+        source = mysql_source(args.table, args.since, args.until, after)
+
+    near_dup_index = None
+    if args.near_dup:
+        from scraper.common.near_dup import open_near_dup_index
+        near_dup_index = open_near_dup_index()
+        if near_dup_index is None:
+            logging.warning("--near-dup needs NEAR_DUP_INDEX_PATH and numpy; deduplicating exact copies only.")
+
+    try:
+        stats = build_dataset(
+            source, args.output_dir, args.tokenizer, args.format, args.max_tokens, args.overlap,
+            args.shard_docs, args.workers, first_shard, seen, near_dup_index
+        )
+    finally:
+        if near_dup_index is not None:
+            near_dup_index.close()
+
+    print(f"{stats['documents']:,} documents ({stats['duplicates']:,} duplicates, {stats['empty']:,} empty) -> "
+          f"{stats['shards']:,} shards, {stats['chunks']:,} chunks, {stats['tokens']:,} tokens "
+          f"in {stats['elapsed']:,.1f}s ({stats['tokens_per_sec']:,.0f} tokens/sec)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,413 @@
+import os
+import sys
+import json
+import heapq
+import logging
+import argparse
+from datetime import datetime
+
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+from scraper.common.streaming import stream_rows
+
+# pyarrow is only needed for the Parquet and Arrow formats; load_pyarrow()
+# imports it on first use so importing this module stays cheap
+pa = None
+ipc = None
+pq = None
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Rows pulled from each server-side cursor per round trip
+FETCH_SIZE = 2000
+
+# Documents per Parquet row group / Arrow record batch, and per watermark update
+BATCH_SIZE = 10000
+
+FORMATS = ('jsonl', 'parquet', 'arrow')
+
+# Unified document columns
+COLUMNS = ['source_id', 'id', 'published', 'title', 'summary', 'body', 'url', 'author', 'tickers']
+
+# Per-table column expressions for the unified columns, in merge tie-break order.
+# `published` is the column the merge orders by; each table gets an index on (published, id).
+TABLES = [
+    {
+        'table': 'benzinga_db',
+        'published': 'created',
+        'columns': {'source_id': 'source_id', 'id': 'CAST(id AS CHAR)', 'title': 'title', 'summary': 'teaser',
+                    'body': 'body', 'url': 'url', 'author': 'author', 'tickers': 'stocks'},
+    },
+    {
+        'table': 'nasdaq_db',
+        'published': 'datetime',
+        'columns': {'source_id': 'source_id', 'id': 'id', 'title': 'title', 'summary': 'NULL',
+                    'body': 'body', 'url': 'url', 'author': 'NULL', 'tickers': 'NULL'},
+    },
+    {
+        'table': 'reddit_submission',
+        'published': 'created_utc',
+        'columns': {'source_id': 'source_id', 'id': 'id', 'title': 'title', 'summary': 'NULL',
+                    'body': 'selftext', 'url': 'url', 'author': 'author', 'tickers': 'NULL'},
+    },
+    {
+        'table': 'seeking_alpha_db',
+        'published': 'published_on',
+        'columns': {'source_id': 'source_id', 'id': 'id', 'title': 'title', 'summary': 'summary',
+                    'body': 'content', 'url': 'url', 'author': 'NULL',
+                    'tickers': "CONCAT_WS(',', NULLIF(tickers_primary, ''), NULLIF(tickers_secondary, ''))"},
+    },
+]
+TABLE_NAMES = [spec['table'] for spec in TABLES]
+
+
+# Database connection
+def create_connection():
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv('DB_HOST'),
+            user=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD'),
+            database=os.getenv('DB_DATABASE')
+        )
+        if connection.is_connected():
+            return connection
+    except Error as e:
+        print(f"Error: {e}")
+        return None
+
+
+# ----------------------------
+# Indexes
+# ----------------------------
+
+def create_published_indexes(connection):
+    """Adds the (published, id) index each table is scanned by. Safe to re-run."""
+    cursor = connection.cursor()
+    try:
+        for spec in TABLES:
+            name = f"idx_{spec['table']}_published_id"
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s;",
+                (spec['table'], name)
+            )
+            if cursor.fetchone()[0]:
+                print(f"Table '{spec['table']}' already has {name}.")
+                continue
+            cursor.execute(f"ALTER TABLE {spec['table']} ADD INDEX {name} ({spec['published']}, id);")
+            connection.commit()
+            print(f"Added {name} to '{spec['table']}'.")
+    finally:
+        cursor.close()
+
+
+# ----------------------------
+# Streaming Merge
+# ----------------------------
+
+def select_columns(spec):
+    """SELECT list mapping one table onto the unified COLUMNS."""
+    return ', '.join(
+        f"{spec['published']} AS published" if column == 'published' else f"{spec['columns'][column]} AS {column}"
+        for column in COLUMNS
+    )
+
+
+def table_query(spec, position, watermark=None, since=None, until=None):
+    """
+    SELECT for one table in (published, id) order, starting after the watermark.
+
+    A watermark is (published, table, id) of the last exported document. Tables
+    that sort before the watermark's table in the merge resume after its
+    timestamp, the watermark's table resumes after its id, and later tables
+    resume at the timestamp.
+    """
+    published = spec['published']
+    # Table-qualified, as the SELECT list may alias a cast of it (benzinga's
+    # BIGINT id) as `id`; the scan and the watermark must use the column
+    key = f"{spec['table']}.id"
+    select = select_columns(spec)
+    conditions = [f"{published} IS NOT NULL"]
+    params = []
+    if since is not None:
+        conditions.append(f"{published} >= %s")
+        params.append(since)
+    if until is not None:
+        conditions.append(f"{published} < %s")
+        params.append(until)
+    if watermark is not None:
+        mark_published, mark_table, mark_id = watermark
+        mark_position = TABLE_NAMES.index(mark_table)
+        if position < mark_position:
+            conditions.append(f"{published} > %s")
+            params.append(mark_published)
+        elif position == mark_position:
+            conditions.append(f"({published} > %s OR ({published} = %s AND {key} > %s))")
+            params += [mark_published, mark_published, mark_id]
+        else:
+            conditions.append(f"{published} >= %s")
+            params.append(mark_published)
+    query = (f"SELECT {select} FROM {spec['table']} WHERE {' AND '.join(conditions)} "
+             f"ORDER BY {published}, {key};")
+    return query, params
+
+
+def stream_table(connection, spec, position, watermark=None, since=None, until=None, fetch_size=FETCH_SIZE):
+    """
+    Yields (published, position, table, row) for one table through an unbuffered
+    cursor, so rows are pulled from the server FETCH_SIZE at a time.
+    """
+    query, params = table_query(spec, position, watermark, since, until)
+    for row in stream_rows(connection, query, params, fetch_size):
+        yield row[2], position, spec['table'], row
+
+
+def stream_documents(connect, tables=None, watermark=None, since=None, until=None):
+    """
+    Streams documents from every table in timestamp order.
+
+    Each table is read by its own connection and unbuffered cursor in
+    (published, id) order, and heapq.merge interleaves them, so memory is
+    bounded by FETCH_SIZE rows per table regardless of table size.
+
+    Args:
+        connect (callable): Returns a new MySQL connection; called once per table.
+        tables (list, optional): Table names to include; defaults to all.
+        watermark (tuple, optional): (published, table, id) to resume after.
+        since (datetime or str, optional): Inclusive lower bound on published.
+        until (datetime or str, optional): Exclusive upper bound on published.
+
+    Yields:
+        tuple: (table, row) with row values in COLUMNS order.
+    """
+    connections = []
+    try:
+        streams = []
+        for position, spec in enumerate(TABLES):
+            if tables and spec['table'] not in tables:
+                continue
+            connection = connect()
+            if connection is None:
+                raise RuntimeError(f"Could not connect to MySQL for '{spec['table']}'")
+            connections.append(connection)
+            streams.append(stream_table(connection, spec, position, watermark, since, until))
+
+        # Ties on published are broken by table position; rows within a table keep their id order
+        for _, _, table, row in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+            yield table, row
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+# ----------------------------
+# Output Writers
+# ----------------------------
+
+def load_pyarrow():
+    """Imports pyarrow into `pa`, `ipc` and `pq`. Returns False when it is not installed."""
+    global pa, ipc, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            return False
+        pa, ipc, pq = pyarrow, pyarrow.ipc, pyarrow.parquet
+    return True
+
+
+def document_schema():
+    return pa.schema([
+        ('source_id', pa.int32()),
+        ('id', pa.string()),
+        ('published', pa.timestamp('s')),
+        ('title', pa.string()),
+        ('summary', pa.string()),
+        ('body', pa.string()),
+        ('url', pa.string()),
+        ('author', pa.string()),
+        ('tickers', pa.list_(pa.dictionary(pa.int32(), pa.string()))),
+    ])
+
+
+def to_record(row):
+    record = dict(zip(COLUMNS, row))
+    record['id'] = None if record['id'] is None else str(record['id'])
+    record['tickers'] = [ticker for ticker in (record['tickers'] or '').split(',') if ticker]
+    return record
+
+
+class DocumentWriter:
+    """Writes unified documents as JSONL, Parquet or an Arrow IPC stream."""
+
+    def __init__(self, path, fmt, append=False):
+        if fmt != 'jsonl' and not load_pyarrow():
+            raise ImportError(f"pyarrow is required for the {fmt} format")
+        self.fmt = fmt
+        self.buffer = []
+        if fmt == 'jsonl':
+            self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+        elif fmt == 'parquet':
+            self.writer = pq.ParquetWriter(path, document_schema(), compression='zstd')
+        else:
+            self.sink = pa.OSFile(path, 'wb')
+            # The IPC stream format, since each batch carries its own ticker dictionary
+            self.writer = ipc.new_stream(self.sink, document_schema())
+
+    def write(self, record):
+        if self.fmt == 'jsonl':
+            if isinstance(record['published'], datetime):
+                record['published'] = record['published'].strftime('%Y-%m-%d %H:%M:%S')
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            self.buffer.append(record)
+            if len(self.buffer) >= BATCH_SIZE:
+                self.flush()
+
+    def flush(self):
+        if self.fmt == 'jsonl':
+            self.file.flush()
+        elif self.buffer:
+            table = pa.Table.from_pylist(self.buffer, schema=document_schema())
+            if self.fmt == 'parquet':
+                self.writer.write_table(table)
+            else:
+                self.writer.write_table(table, max_chunksize=BATCH_SIZE)
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        if self.fmt == 'jsonl':
+            self.file.close()
+        else:
+            self.writer.close()
+            if self.fmt == 'arrow':
+                self.sink.close()
+
+
+# ----------------------------
+# Export with Resume
+# ----------------------------
+
+def watermark_path(output):
+    return f"{output}.watermark.json"
+
+
+def load_state(output):
+    """Returns the export state saved next to the output, or None."""
+    path = watermark_path(output)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(output, watermark, count, offset=None):
+    published, table, id_ = watermark
+    if isinstance(published, datetime):
+        published = published.strftime('%Y-%m-%d %H:%M:%S')
+    path = watermark_path(output)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'published': published, 'table': table, 'id': id_, 'count': count, 'offset': offset}, f)
+    os.replace(path + '.tmp', path)
+
+
+def resumed_output_path(output, fmt, count):
+    """Parquet and Arrow files cannot be appended, so a resumed run writes a numbered part."""
+    if fmt == 'jsonl' or not count:
+        return output
+    stem, extension = os.path.splitext(output)
+    return f"{stem}.{count}{extension}"
+
+
+def export_documents(connect, output, fmt='jsonl', tables=None, since=None, until=None, resume=False):
+    """
+    Exports unified documents to `output` and saves a watermark next to it.
+
+    JSONL saves the watermark and byte offset every BATCH_SIZE documents; a
+    resumed run truncates the file to that offset and appends after it.
+    Parquet and Arrow files are only valid once closed, so their watermark is
+    saved when the file is complete and a resumed run writes a new part file.
+
+    Returns:
+        int: Documents exported in this run.
+    """
+    state = load_state(output) if resume else None
+    watermark, count = None, 0
+    if state:
+        watermark, count = (state['published'], state['table'], state['id']), state['count']
+        logging.info(f"Resuming after {watermark} ({count} documents already exported).")
+        if fmt == 'jsonl' and state.get('offset') is not None:
+            with open(output, 'r+b') as f:
+                f.truncate(state['offset'])
+
+    writer = DocumentWriter(resumed_output_path(output, fmt, count), fmt, append=bool(state))
+    exported = 0
+    completed = False
+    try:
+        for table, row in stream_documents(connect, tables, watermark, since, until):
+            record = to_record(row)
+            watermark = (record['published'], table, record['id'])
+            writer.write(record)
+            exported += 1
+            if exported % BATCH_SIZE == 0:
+                writer.flush()
+                if fmt == 'jsonl':
+                    save_state(output, watermark, count + exported, writer.file.tell())
+                logging.info(f"Exported {count + exported} documents (through {watermark[0]}).")
+        completed = True
+    finally:
+        writer.close()
+        if exported and (completed or fmt == 'jsonl'):
+            save_state(output, watermark, count + exported, os.path.getsize(output) if fmt == 'jsonl' else None)
+    return exported
+
+
+# ----------------------------
+# Command Line
+# ----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export all sources as one timestamp-ordered document stream.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export = subparsers.add_parser('export', help="Export documents")
+    export.add_argument('output', help="Output file")
+    export.add_argument('--format', choices=FORMATS, default='jsonl')
+    export.add_argument('--table', action='append', choices=TABLE_NAMES, help="Table to include; repeatable")
+    export.add_argument('--since', help="Inclusive start, 'YYYY-MM-DD[ HH:MM:SS]'")
+    export.add_argument('--until', help="Exclusive end, 'YYYY-MM-DD[ HH:MM:SS]'")
+    export.add_argument('--resume', action='store_true', help="Continue after the saved watermark")
+
+    subparsers.add_parser('create-indexes', help="Add the (published, id) index to every table")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'create-indexes':
+        connection = create_connection()
+        if connection is None:
+            return 1
+        try:
+            create_published_indexes(connection)
+        finally:
+            connection.close()
+        return 0
+
+    exported = export_documents(
+        create_connection, args.output, args.format, args.table, args.since, args.until, args.resume
+    )
+    print(f"Exported {exported} documents to {args.output}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
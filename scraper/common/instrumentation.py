@@ -0,0 +1,319 @@
+import os
+import sys
+import json
+import time
+import logging
+import inspect
+import argparse
+import threading
+import functools
+import contextlib
+from datetime import datetime
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Directory that receives <job>.json and <job>.prom after every run; unset
+# means metrics are collected in memory only.
+METRICS_DIR_ENV = 'METRICS_DIR'
+
+# 'cprofile' or 'pyinstrument' to dump a profile of every run into
+# METRICS_DIR (or the working directory).
+PROFILER_ENV = 'PROFILER'
+
+# Prefix of every exported Prometheus metric
+PROMETHEUS_PREFIX = 'scraper'
+
+
+# ----------------------------
+# Metrics Registry
+# ----------------------------
+
+class Metrics:
+    """
+    Thread-safe counters and span timings of one run.
+
+    Spans keep count, total and max seconds per (name, labels); counters
+    keep a running total per (name, labels), e.g. rows, bytes or retries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.spans = {}
+            self.counters = {}
+            self.started = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            span = self.spans.get(key)
+            if span is None:
+                self.spans[key] = [1, seconds, seconds]
+            else:
+                span[0] += 1
+                span[1] += seconds
+                if seconds > span[2]:
+                    span[2] = seconds
+
+    def count(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self):
+        """Plain dict of the current values, as written to the JSON file."""
+        with self._lock:
+            return {
+                'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                'seconds': round(time.time() - self.started, 3),
+                'spans': [{'name': name, 'labels': dict(labels), 'count': count,
+                           'seconds': round(total, 6), 'max_seconds': round(peak, 6)}
+                          for (name, labels), (count, total, peak) in sorted(self.spans.items())],
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in sorted(self.counters.items())],
+            }
+
+
+metrics = Metrics()
+
+
+def span(name, **labels):
+    """Context manager that records the time spent inside it under `name`."""
+    return _Span(name, labels)
+
+
+class _Span:
+    __slots__ = ('name', 'labels', 'started')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        metrics.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        if exc_type is not None:
+            metrics.count('errors', span=self.name, **self.labels)
+        return False
+
+
+def timed(name=None, **labels):
+    """
+    Decorator that records every call of a function as a span, named after
+    the function unless `name` is given. Generators are timed from the first
+    item to exhaustion.
+    """
+    def decorator(function):
+        span_name = name or function.__name__
+
+        if inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with span(span_name, **labels):
+                    yield from function(*args, **kwargs)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with span(span_name, **labels):
+                    return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1, **labels):
+    """Adds `value` to a counter of the current run."""
+    metrics.count(name, value, **labels)
+
+
+# ----------------------------
+# Export
+# ----------------------------
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+def prometheus_text(job, snapshot=None):
+    """
+    Prometheus text exposition of a run, e.g. for the node_exporter textfile
+    collector. Spans become <prefix>_span_seconds_total / _span_calls_total /
+    _span_max_seconds and counters <prefix>_<name>_total.
+    """
+    snapshot = snapshot or metrics.snapshot()
+    prefix = PROMETHEUS_PREFIX
+    lines = [f"# TYPE {prefix}_run_seconds gauge",
+             f"{prefix}_run_seconds{_label_text({'job': job})} {snapshot['seconds']}"]
+
+    families = {
+        f"{prefix}_span_calls_total": ('counter', 'count'),
+        f"{prefix}_span_seconds_total": ('counter', 'seconds'),
+        f"{prefix}_span_max_seconds": ('gauge', 'max_seconds'),
+    }
+    for metric, (kind, field) in families.items():
+        lines.append(f"# TYPE {metric} {kind}")
+        for entry in snapshot['spans']:
+            labels = {'job': job, 'span': entry['name'], **entry['labels']}
+            lines.append(f"{metric}{_label_text(labels)} {entry[field]}")
+
+    declared = set()
+    for entry in snapshot['counters']:
+        metric = f"{prefix}_{entry['name']}_total"
+        if metric not in declared:
+            lines.append(f"# TYPE {metric} counter")
+            declared.add(metric)
+        lines.append(f"{metric}{_label_text({'job': job, **entry['labels']})} {entry['value']}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics(job, directory):
+    """Writes <job>.json and <job>.prom into `directory`, replacing the previous run's files."""
+    os.makedirs(directory, exist_ok=True)
+    snapshot = metrics.snapshot()
+    snapshot['job'] = job
+    for name, text in ((f"{job}.json", json.dumps(snapshot, indent=2)),
+                       (f"{job}.prom", prometheus_text(job, snapshot))):
+        path = os.path.join(directory, name)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(path + '.tmp', path)
+
+
+# ----------------------------
+# Runs and Profiling
+# ----------------------------
+
+@contextlib.contextmanager
+def profiled(job, profiler, directory):
+    """
+    Profiles the enclosed block with cProfile (.prof, for pstats/snakeviz) or
+    pyinstrument (.html). Only the calling thread is profiled.
+    """
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(directory, f"{job}-{stamp}")
+    if profiler:
+        os.makedirs(directory, exist_ok=True)
+    pyinstrument = None
+    if profiler == 'pyinstrument':
+        # Only needed when PROFILER=pyinstrument
+        try:
+            import pyinstrument
+        except ImportError:
+            pass
+    if profiler == 'cprofile':
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(path + '.prof')
+            logging.info(f"Wrote profile {path}.prof")
+    elif profiler == 'pyinstrument' and pyinstrument is not None:
+        profile = pyinstrument.Profiler()
+        profile.start()
+        try:
+            yield
+        finally:
+            profile.stop()
+            with open(path + '.html', 'w', encoding='utf-8') as f:
+                f.write(profile.output_html())
+            logging.info(f"Wrote profile {path}.html")
+    else:
+        if profiler:
+            logging.warning(f"{PROFILER_ENV}={profiler} is not available; running without a profiler.")
+        yield
+
+
+@contextlib.contextmanager
+def run(job):
+    """
+    One scraper run: resets the metrics, times the whole run, optionally
+    profiles it and writes the metrics files when METRICS_DIR is set.
+    Metrics are written even when the run fails.
+    """
+    directory = os.getenv(METRICS_DIR_ENV)
+    profiler = (os.getenv(PROFILER_ENV) or '').lower()
+    metrics.reset()
+    try:
+        with profiled(job, profiler, directory or '.'), span('run'):
+            yield metrics
+    finally:
+        if directory:
+            try:
+                write_metrics(job, directory)
+            except OSError as e:
+                logging.warning(f"Could not write metrics for {job}: {e}")
+
+
+def instrumented_run(job):
+    """
+    Decorator form of run() for a scraper's main function. A run that raises
+    also sends an alert (in the background) before the error propagates.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            try:
+                with run(job):
+                    return function(*args, **kwargs)
+            except Exception as e:
+                # alerts imports this module
+                from scraper.common.alerts import alert
+
+                alert(f"*Error:* {job} run failed.\n`{type(e).__name__}: {e}`")
+                raise
+        return wrapper
+    return decorator
+
+
+# ----------------------------
+# Command Line
+# ----------------------------
+
+def summary(snapshot):
+    """Human-readable table of a metrics snapshot, slowest spans first."""
+    lines = [f"{'span':<48} {'calls':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10}"]
+    for entry in sorted(snapshot['spans'], key=lambda entry: -entry['seconds']):
+        label = entry['name'] + (_label_text(entry['labels']) if entry['labels'] else '')
+        lines.append(f"{label:<48} {entry['count']:>8} {entry['seconds']:>10.3f} "
+                     f"{entry['seconds'] / entry['count'] * 1000:>10.3f} {entry['max_seconds'] * 1000:>10.3f}")
+    if snapshot['counters']:
+        lines.append('')
+        for entry in snapshot['counters']:
+            label = entry['name'] + (_label_text(entry['labels']) if entry['labels'] else '')
+            lines.append(f"{label:<48} {entry['value']:>12}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the metrics of the last scraper runs.")
+    parser.add_argument('files', nargs='+', help="<job>.json files written to METRICS_DIR")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        print(f"{snapshot.get('job', path)} - started {snapshot['started']}, {snapshot['seconds']:.1f}s")
+        print(summary(snapshot))
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
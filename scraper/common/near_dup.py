@@ -0,0 +1,289 @@
+import os
+import re
+import sys
+import zlib
+import sqlite3
+import hashlib
+import logging
+import argparse
+
+# numpy is only needed when the index is enabled; load_numpy() imports it on
+# first use so importing this module stays cheap
+np = None
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Path of the SQLite index file. The index is disabled when this is unset.
+INDEX_PATH_ENV = 'NEAR_DUP_INDEX_PATH'
+
+SHINGLE_SIZE = 5  # Words per shingle
+NUM_PERM = 128  # MinHash permutations
+BANDS = 16  # LSH bands of NUM_PERM // BANDS rows each; Jaccard threshold ~ (1/BANDS) ** (BANDS/NUM_PERM) ~ 0.71
+SEED = 1
+
+BUCKET_BITS = 56  # Bucket hash bits packed under the band number into one INTEGER key
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+# ----------------------------
+# MinHash Signatures
+# ----------------------------
+
+def normalize_text(text):
+    """Lowercase word tokens with punctuation, markup leftovers and spacing removed."""
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def shingle_hashes(tokens, size=SHINGLE_SIZE):
+    """32-bit hashes of the word shingles of a document."""
+    if len(tokens) < size:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))} if tokens else set()
+    shingles = zip(*(tokens[offset:] for offset in range(size)))
+    return {zlib.crc32(' '.join(shingle).encode('utf-8')) for shingle in shingles}
+
+
+def load_numpy():
+    """Imports numpy into `np`. Returns False when it is not installed."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+class MinHasher:
+    """
+    Computes NUM_PERM-value MinHash signatures with fixed, seeded permutations.
+
+    Each permutation is x -> a * x + b over uint32 with an odd multiplier, which
+    is a bijection on 32-bit hashes and avoids a 64-bit modulo per value.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, seed=SEED):
+        if not load_numpy():
+            raise ImportError("numpy is required for the near-duplicate index")
+        generator = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = (generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64) | 1).astype(np.uint32)
+        self.b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64).astype(np.uint32)
+
+    def signature(self, text):
+        """Returns the signature as a uint32 array, or None for empty text."""
+        hashes = shingle_hashes(normalize_text(text))
+        if not hashes:
+            return None
+        values = np.fromiter(hashes, dtype=np.uint32, count=len(hashes))
+        return (values[:, None] * self.a + self.b).min(axis=0)
+
+
+def band_keys(signature, bands=BANDS):
+    """One INTEGER key per band: the band number in the top bits, the band hash below."""
+    rows = len(signature) // bands
+    mask = (1 << BUCKET_BITS) - 1
+    keys = []
+    for band in range(bands):
+        digest = hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest()
+        keys.append((band << BUCKET_BITS) | (int.from_bytes(digest, 'little') & mask))
+    return keys
+
+
+# ----------------------------
+# LSH Index
+# ----------------------------
+
+class NearDupIndex:
+    """
+    MinHash/LSH index over article bodies from every source, stored in SQLite.
+
+    Each band of a signature is packed into one INTEGER primary key that maps to
+    the cluster id of the first document that produced it, so the index costs
+    about BANDS small rows per distinct document and no signatures are kept.
+    A lookup is one IN (...) query over BANDS primary keys.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.hasher = MinHasher()
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL;")
+        self.connection.execute("PRAGMA synchronous=NORMAL;")
+        self.connection.executescript("""
+        CREATE TABLE IF NOT EXISTS lsh_bucket (
+            band_key INTEGER PRIMARY KEY,
+            cluster_id INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS document (
+            source_id INTEGER NOT NULL,
+            doc_id TEXT NOT NULL,
+            cluster_id INTEGER NOT NULL,
+            PRIMARY KEY (source_id, doc_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS counter (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO counter (name, value) VALUES ('next_cluster_id', 1);
+        """)
+        self.connection.commit()
+
+    def find_cluster(self, text=None, signature=None):
+        """Returns the cluster id of a near-duplicate already in the index, or None."""
+        if signature is None:
+            signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        keys = band_keys(signature)
+        placeholders = ', '.join(['?'] * len(keys))
+        row = self.connection.execute(
+            f"SELECT cluster_id FROM lsh_bucket WHERE band_key IN ({placeholders}) ORDER BY cluster_id LIMIT 1;", keys
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_near_duplicate(self, text):
+        return self.find_cluster(text) is not None
+
+    def assign(self, source_id, doc_id, text):
+        """
+        Adds a document and returns its cluster id. A document that is already
+        indexed keeps its cluster; a near-duplicate joins the matching cluster.
+        """
+        return self.assign_many([(source_id, doc_id, text)])[0]
+
+    def assign_many(self, documents):
+        """
+        Adds (source_id, doc_id, text) documents in one transaction.
+
+        Returns:
+            list: Cluster id per document (None for documents without text).
+        """
+        cluster_ids = []
+        with self.connection:
+            for source_id, doc_id, text in documents:
+                doc_id = str(doc_id)
+                row = self.connection.execute(
+                    "SELECT cluster_id FROM document WHERE source_id = ? AND doc_id = ?;", (source_id, doc_id)
+                ).fetchone()
+                if row:
+                    cluster_ids.append(row[0])
+                    continue
+
+                signature = self.hasher.signature(text)
+                if signature is None:
+                    cluster_ids.append(None)
+                    continue
+
+                cluster_id = self.find_cluster(signature=signature)
+                if cluster_id is None:
+                    cluster_id = self._next_cluster_id()
+
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO lsh_bucket (band_key, cluster_id) VALUES (?, ?);",
+                    [(key, cluster_id) for key in band_keys(signature)]
+                )
+                self.connection.execute(
+                    "INSERT INTO document (source_id, doc_id, cluster_id) VALUES (?, ?, ?);",
+                    (source_id, doc_id, cluster_id)
+                )
+                cluster_ids.append(cluster_id)
+        return cluster_ids
+
+    def cluster_of(self, source_id, doc_id):
+        row = self.connection.execute(
+            "SELECT cluster_id FROM document WHERE source_id = ? AND doc_id = ?;", (source_id, str(doc_id))
+        ).fetchone()
+        return row[0] if row else None
+
+    def stats(self):
+        documents, clusters = self.connection.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT cluster_id) FROM document;"
+        ).fetchone()
+        return {
+            'documents': documents,
+            'clusters': clusters,
+            'duplicates': documents - clusters,
+            'size_mb': sum(
+                os.path.getsize(path) for path in (self.path, self.path + '-wal') if os.path.exists(path)
+            ) / (1024 * 1024),
+        }
+
+    def close(self):
+        self.connection.close()
+
+    def _next_cluster_id(self):
+        cluster_id = self.connection.execute(
+            "SELECT value FROM counter WHERE name = 'next_cluster_id';"
+        ).fetchone()[0]
+        self.connection.execute(
+            "UPDATE counter SET value = value + 1 WHERE name = 'next_cluster_id';"
+        )
+        return cluster_id
+
+
+def open_near_dup_index():
+    """
+    Returns a NearDupIndex when NEAR_DUP_INDEX_PATH is set, otherwise None.
+    Writers call this at run time so the index stays optional.
+    """
+    path = os.getenv(INDEX_PATH_ENV)
+    if not path:
+        return None
+    if not load_numpy():
+        logging.warning(f"{INDEX_PATH_ENV} is set but numpy is not installed; skipping near-duplicate index.")
+        return None
+    return NearDupIndex(path)
+
+
+def index_documents(documents):
+    """
+    Assigns cluster ids to (source_id, doc_id, text) documents when the index is
+    enabled. Failures are logged so they never block the database write.
+    """
+    index = open_near_dup_index()
+    if index is None:
+        return None
+    try:
+        cluster_ids = index.assign_many(documents)
+        logging.info(f"Near-duplicate index: assigned clusters to {len(cluster_ids)} documents.")
+        return cluster_ids
+    except sqlite3.Error as e:
+        logging.error(f"Near-duplicate index update failed: {e}")
+        return None
+    finally:
+        index.close()
+
+
+# ----------------------------
+# Command Line
+# ----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the cross-source near-duplicate index.")
+    parser.add_argument('--index', default=os.getenv(INDEX_PATH_ENV, 'near_dup.sqlite'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help="Document and cluster counts")
+    query = subparsers.add_parser('query', help="Check whether a text file is a near-duplicate")
+    query.add_argument('path')
+    args = parser.parse_args(argv)
+
+    index = NearDupIndex(args.index)
+    try:
+        if args.command == 'stats':
+            for name, value in index.stats().items():
+                print(f"{name}: {value:,.2f}" if isinstance(value, float) else f"{name}: {value:,}")
+        else:
+            with open(args.path, 'r', encoding='utf-8') as f:
+                cluster_id = index.find_cluster(f.read())
+            print(f"Near-duplicate of cluster {cluster_id}" if cluster_id else "No near-duplicate found")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
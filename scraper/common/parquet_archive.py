@@ -0,0 +1,380 @@
+import os
+import re
+import sys
+import json
+import glob
+import logging
+import argparse
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# pyarrow is only needed when the archive is enabled; load_pyarrow() imports
+# it on first use so importing this module stays cheap
+pa = None
+pq = None
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Root directory of the archive. The archive is disabled when this is unset.
+ARCHIVE_DIR_ENV = 'PARQUET_ARCHIVE_DIR'
+
+# Buffered rows per partition before a row group is written
+FLUSH_ROWS = 1000
+
+COMPRESSION = 'zstd'
+
+# Scrape time in the name of a Nasdaq JSONL file, e.g.
+# nasdaq_articles_2024-10-06-20-40-31.jsonl or articles_2024-10-06.jsonl
+FILENAME_TIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2})(?:-(\d{2})-(\d{2})-(\d{2}))?\.jsonl$')
+
+
+# ----------------------------
+# Per-source Schemas
+# ----------------------------
+
+def load_pyarrow():
+    """Imports pyarrow into `pa` and `pq`. Returns False when it is not installed."""
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            return False
+        pa, pq = pyarrow, pyarrow.parquet
+    return True
+
+
+def _dictionary():
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def build_schemas():
+    """
+    Returns the stable Arrow schema of each source. Ticker and subreddit
+    columns are dictionary-encoded; free text columns are plain strings.
+    """
+    utc = pa.timestamp('s', tz='UTC')
+    return {
+        'benzinga': pa.schema([
+            ('id', pa.int64()),
+            ('author', pa.string()),
+            ('created', utc),
+            ('updated', utc),
+            ('title', pa.string()),
+            ('teaser', pa.string()),
+            ('body', pa.string()),
+            ('url', pa.string()),
+            ('stocks', pa.list_(_dictionary())),
+            ('channels', pa.list_(_dictionary())),
+        ]),
+        'nasdaq': pa.schema([
+            ('url', pa.string()),
+            ('title', pa.string()),
+            ('date', pa.string()),  # As displayed on the page, e.g. "October 04, 2024 — 10:50 am EDT"
+            ('body', pa.string()),
+            ('scraped_at', utc),
+        ]),
+        'reddit': pa.schema([
+            ('id', pa.string()),
+            ('subreddit', _dictionary()),
+            ('created_utc', utc),
+            ('title', pa.string()),
+            ('selftext', pa.string()),
+            ('url', pa.string()),
+            ('score', pa.int64()),
+            ('num_comments', pa.int64()),
+            ('ups', pa.int64()),
+            ('author', pa.string()),
+        ]),
+        'seeking_alpha': pa.schema([
+            ('id', pa.string()),
+            ('source_id', pa.int32()),
+            ('title', pa.string()),
+            ('published_on', pa.timestamp('s')),  # Naive, as returned by parse_datetime
+            ('last_modified', pa.timestamp('s')),
+            ('summary', pa.string()),
+            ('content', pa.string()),
+            ('url', pa.string()),
+            ('tickers_primary', pa.list_(_dictionary())),
+            ('tickers_secondary', pa.list_(_dictionary())),
+        ]),
+    }
+
+
+# Columns written with Parquet dictionary encoding, per source
+DICTIONARY_COLUMNS = {
+    'benzinga': ['author', 'stocks.list.element', 'channels.list.element'],
+    'nasdaq': [],
+    'reddit': ['subreddit', 'author'],
+    'seeking_alpha': ['tickers_primary.list.element', 'tickers_secondary.list.element'],
+}
+
+
+# ----------------------------
+# Row Normalization
+# ----------------------------
+
+def _rfc2822(value):
+    return parsedate_to_datetime(value).astimezone(timezone.utc) if value else None
+
+
+def _iso_utc(value):
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc) if value else None
+
+
+def _sql_datetime(value):
+    return datetime.strptime(value, '%Y-%m-%d %H:%M:%S') if value else None
+
+
+def normalize_benzinga(row):
+    created = _rfc2822(row.get('created'))
+    return created, {
+        'id': row.get('id'),
+        'author': row.get('author'),
+        'created': created,
+        'updated': _rfc2822(row.get('updated')),
+        'title': row.get('title'),
+        'teaser': row.get('teaser'),
+        'body': row.get('body'),
+        'url': row.get('url'),
+        'stocks': [stock['name'] for stock in row.get('stocks', [])],
+        'channels': [channel['name'] for channel in row.get('channels', [])],
+    }
+
+
+def normalize_nasdaq(row):
+    # The page date format varies between layouts, so partition by scrape time;
+    # convert_jsonl() sets it from the file name, live writes use the current time
+    scraped_at = row.get('scraped_at') or datetime.now(timezone.utc)
+    return scraped_at, {
+        'url': row.get('url'),
+        'title': row.get('title'),
+        'date': row.get('date'),
+        'body': row.get('body'),
+        'scraped_at': scraped_at,
+    }
+
+
+def normalize_reddit(row):
+    created = _iso_utc(row.get('created_utc'))
+    return created, {
+        'id': row.get('id'),
+        'subreddit': row.get('subreddit'),
+        'created_utc': created,
+        'title': row.get('title'),
+        'selftext': row.get('selftext'),
+        'url': row.get('url'),
+        'score': row.get('score'),
+        'num_comments': row.get('num_comments'),
+        'ups': row.get('ups'),
+        'author': row.get('author'),
+    }
+
+
+def normalize_seeking_alpha(row):
+    published = _sql_datetime(row.get('published_on'))
+    return published, {
+        'id': row.get('id'),
+        'source_id': row.get('source_id'),
+        'title': row.get('title'),
+        'published_on': published,
+        'last_modified': _sql_datetime(row.get('last_modified')),
+        'summary': row.get('summary'),
+        'content': row.get('content'),
+        'url': row.get('url'),
+        'tickers_primary': row.get('tickers_primary', []),
+        'tickers_secondary': row.get('tickers_secondary', []),
+    }
+
+
+NORMALIZERS = {
+    'benzinga': normalize_benzinga,
+    'nasdaq': normalize_nasdaq,
+    'reddit': normalize_reddit,
+    'seeking_alpha': normalize_seeking_alpha,
+}
+
+
+# ----------------------------
+# Archive Writer
+# ----------------------------
+
+class ArchiveWriter:
+    """
+    Writes scraped rows into a Parquet dataset partitioned as
+    <root>/source=<source>/date=<YYYY-MM-DD>/part-<run>.parquet.
+
+    Rows are buffered per date partition and appended to that partition's
+    file as a row group every `flush_rows` rows, so a run can stream rows in
+    as they are scraped. Files are finalized on close().
+    """
+
+    def __init__(self, root, source, flush_rows=FLUSH_ROWS):
+        if not load_pyarrow():
+            raise ImportError("pyarrow is required for the Parquet archive")
+        if source not in NORMALIZERS:
+            raise ValueError(f"Unknown source: {source}")
+
+        self.root = root
+        self.source = source
+        self.flush_rows = flush_rows
+        self.schema = build_schemas()[source]
+        self.rows_written = 0
+        self._normalize = NORMALIZERS[source]
+        self._run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self._buffers = {}
+        self._writers = {}
+
+    def write(self, rows):
+        """Normalize and buffer rows, flushing any partition that is full."""
+        for row in rows:
+            if row is None:
+                continue
+            try:
+                partition_time, record = self._normalize(row)
+            except (ValueError, TypeError) as e:
+                logging.warning(f"Skipping {self.source} row that could not be archived: {e}")
+                continue
+            partition = (partition_time or datetime.now(timezone.utc)).strftime('%Y-%m-%d')
+            buffer = self._buffers.setdefault(partition, [])
+            buffer.append(record)
+            if len(buffer) >= self.flush_rows:
+                self._flush_partition(partition)
+
+    def flush(self):
+        """Write every buffered partition as a row group."""
+        for partition in list(self._buffers):
+            self._flush_partition(partition)
+
+    def close(self):
+        """Flush remaining rows and finalize all open Parquet files."""
+        self.flush()
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+        logging.info(f"Archived {self.rows_written} {self.source} rows under {self.root}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _flush_partition(self, partition):
+        records = self._buffers.pop(partition, [])
+        if not records:
+            return
+
+        writer = self._writers.get(partition)
+        if writer is None:
+            directory = os.path.join(self.root, f'source={self.source}', f'date={partition}')
+            os.makedirs(directory, exist_ok=True)
+            writer = pq.ParquetWriter(
+                os.path.join(directory, f'part-{self._run_id}.parquet'),
+                self.schema,
+                compression=COMPRESSION,
+                use_dictionary=DICTIONARY_COLUMNS[self.source],
+            )
+            self._writers[partition] = writer
+
+        writer.write_table(pa.Table.from_pylist(records, schema=self.schema))
+        self.rows_written += len(records)
+
+
+def open_archive(source):
+    """
+    Returns an ArchiveWriter when PARQUET_ARCHIVE_DIR is set, otherwise None.
+    Scrapers call this at run time so the archive stays optional.
+    """
+    root = os.getenv(ARCHIVE_DIR_ENV)
+    if not root:
+        return None
+    if not load_pyarrow():
+        logging.warning(f"{ARCHIVE_DIR_ENV} is set but pyarrow is not installed; skipping Parquet archive.")
+        return None
+    return ArchiveWriter(root, source)
+
+
+# ----------------------------
+# JSONL Backlog Conversion
+# ----------------------------
+
+def file_scrape_time(path):
+    """
+    UTC time a JSONL file was scraped: the local timestamp in its name, or
+    its modification time when the name has none.
+    """
+    match = FILENAME_TIME_RE.search(os.path.basename(path))
+    if match:
+        day, hour, minute, second = match.groups()
+        local = datetime.strptime(f"{day} {hour or '00'}:{minute or '00'}:{second or '00'}", '%Y-%m-%d %H:%M:%S')
+        # The scrapers name files after datetime.now(), i.e. local time
+        return local.astimezone(timezone.utc)
+    return datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+
+
+def convert_jsonl(source, paths, root, flush_rows=FLUSH_ROWS, source_id=None):
+    """
+    Converts existing JSONL files of one source into the Parquet archive.
+
+    Args:
+        source (str): 'benzinga', 'nasdaq', 'reddit' or 'seeking_alpha'.
+        paths (list): JSONL file paths.
+        root (str): Archive root directory.
+        flush_rows (int, optional): Rows buffered per partition before writing.
+        source_id (int, optional): Seeking Alpha source_id (4 news, 5 articles) when rows lack it.
+
+    Nasdaq rows carry no scrape time, so they take the one of their file
+    (see file_scrape_time) and land in the partition of the day they were scraped.
+
+    Returns:
+        int: Number of rows archived.
+    """
+    with ArchiveWriter(root, source, flush_rows=flush_rows) as archive:
+        for path in paths:
+            scraped_at = file_scrape_time(path) if source == 'nasdaq' else None
+            with open(path, 'r', encoding='utf-8') as f:
+                batch = []
+                for line in f:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        continue
+                    if scraped_at is not None and not row.get('scraped_at'):
+                        row['scraped_at'] = scraped_at
+                    if source_id is not None:
+                        row.setdefault('source_id', source_id)
+                    batch.append(row)
+                    if len(batch) >= flush_rows:
+                        archive.write(batch)
+                        batch = []
+                archive.write(batch)
+            print(f"Archived {path}")
+    return archive.rows_written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert scraped JSONL files into the partitioned Parquet archive.")
+    parser.add_argument('source', choices=sorted(NORMALIZERS))
+    parser.add_argument('paths', nargs='+', help="JSONL files or glob patterns")
+    parser.add_argument('--root', default=os.getenv(ARCHIVE_DIR_ENV, '../data/parquet'))
+    parser.add_argument('--flush-rows', type=int, default=FLUSH_ROWS)
+    parser.add_argument('--source-id', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    paths = sorted(path for pattern in args.paths for path in glob.glob(pattern))
+    if not paths:
+        print("No JSONL files matched.")
+        return 1
+
+    count = convert_jsonl(args.source, paths, args.root, args.flush_rows, args.source_id)
+    print(f"Archived {count} rows from {len(paths)} files into {args.root}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,262 @@
+import time
+import logging
+import threading
+import email.utils
+
+from scraper.common.instrumentation import span, count
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Starting and maximum request rates (requests/second) per API. The limiter
+# starts at `rate`, ramps up by `increase` after every successful response and
+# never goes above `max_rate` or the rate the API's own headers allow.
+RATE_LIMITS = {
+    'benzinga': {'rate': 1.0, 'max_rate': 10.0, 'burst': 2},
+    'seeking_alpha': {'rate': 1.0, 'max_rate': 5.0, 'burst': 1},
+    # Reddit allows 100 queries per minute per OAuth client id
+    'reddit': {'rate': 1.0, 'max_rate': 1.6, 'burst': 4},
+}
+DEFAULT_LIMITS = {'rate': 1.0, 'max_rate': 5.0, 'burst': 1}
+
+# Statuses that mean "slow down" rather than "this request is wrong"
+THROTTLED_STATUSES = (429, 503)
+
+# Attempts per request before the throttled response is returned to the caller
+MAX_ATTEMPTS = 6
+
+# (limit, remaining, reset) header names per family, most specific first;
+# requests' header mapping is case-insensitive. RapidAPI's 'requests-' family
+# usually counts the monthly plan quota rather than a short window.
+RATE_HEADER_FAMILIES = (
+    ('x-ratelimit-requests-limit', 'x-ratelimit-requests-remaining', 'x-ratelimit-requests-reset'),
+    ('x-ratelimit-limit', 'x-ratelimit-remaining', 'x-ratelimit-reset'),
+    ('ratelimit-limit', 'ratelimit-remaining', 'ratelimit-reset'),
+)
+
+# Only windows resetting within this many seconds pace requests. A longer one
+# is a plan quota: spreading it would crawl, and waiting for it would stall the
+# process for days, so an exhausted quota fails the run instead.
+MAX_WINDOW_SECONDS = 300
+
+# A reset value above this is an epoch timestamp rather than seconds to wait
+EPOCH_THRESHOLD = 10 ** 9
+
+
+# ----------------------------
+# Header Parsing
+# ----------------------------
+
+def _number(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(str(value).split(',')[0].strip())
+    except ValueError:
+        return None
+
+
+def retry_after(headers, now=None):
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date), or None."""
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - (time.time() if now is None else now))
+
+
+def parse_rate_headers(headers, now=None):
+    """
+    Reads the rate limit headers of a response.
+
+    Returns:
+        dict: 'limit', 'remaining' and 'reset' (seconds until the window
+        resets) of the first header family whose window resets within
+        MAX_WINDOW_SECONDS, each None when there is none; and 'quota_reset',
+        the seconds until a longer window that has nothing left resets, or
+        None when no quota is exhausted.
+    """
+    limits = {'limit': None, 'remaining': None, 'reset': None, 'quota_reset': None}
+    for limit_name, remaining_name, reset_name in RATE_HEADER_FAMILIES:
+        remaining = _number(headers, remaining_name)
+        reset = _number(headers, reset_name)
+        if reset is not None and reset > EPOCH_THRESHOLD:
+            reset = max(0.0, reset - (time.time() if now is None else now))
+        if reset is None:
+            continue
+        if reset <= MAX_WINDOW_SECONDS:
+            if limits['reset'] is None:
+                limits.update(limit=_number(headers, limit_name), remaining=remaining, reset=reset)
+        elif remaining is not None and remaining < 1 and limits['quota_reset'] is None:
+            limits['quota_reset'] = reset
+    return limits
+
+
+# ----------------------------
+# Rate Limiter
+# ----------------------------
+
+class QuotaExhausted(Exception):
+    """Raised instead of waiting when the API's plan quota is used up until a distant reset."""
+
+class RateLimiter:
+    """
+    Token bucket whose refill rate is adjusted AIMD-style.
+
+    Every successful response raises the rate by `increase` requests/second
+    up to `max_rate`; a throttled response halves it (times `decrease`) down
+    to `min_rate` and pauses the bucket for the Retry-After time. When the
+    API reports how many requests are left in its window, the rate is also
+    capped to spread them over the time until the reset, and a window with
+    nothing left pauses the bucket until it resets. Safe to share between
+    threads.
+    """
+
+    def __init__(self, rate=1.0, max_rate=10.0, min_rate=0.1, burst=1, increase=0.5, decrease=0.5,
+                 clock=time.monotonic, sleep=time.sleep, name='http'):
+        self.name = name
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.paused_until = 0.0
+        self.quota_until = 0.0
+        self.stats = {'requests': 0, 'throttled': 0, 'waited': 0.0}
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+
+        Raises:
+            QuotaExhausted: While the API's quota is used up.
+        """
+        while True:
+            with self._lock:
+                now = self.clock()
+                if now < self.quota_until:
+                    raise QuotaExhausted(f"{self.name} request quota exhausted; "
+                                         f"resets in {(self.quota_until - now) / 3600:.1f} h")
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.stats['requests'] += 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+                self.stats['waited'] += wait
+            self.sleep(wait)
+
+    def pause(self, seconds):
+        """Sends nothing for `seconds` and empties the bucket."""
+        with self._lock:
+            now = self.clock()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = max(self.updated, self.paused_until)
+
+    def exhaust(self, seconds):
+        """Fails every acquire() for `seconds`, the time until the API's quota resets."""
+        with self._lock:
+            first = self.clock() >= self.quota_until
+            self.quota_until = max(self.quota_until, self.clock() + seconds)
+        if first:
+            logging.error(f"{self.name} request quota exhausted; resets in {seconds / 3600:.1f} h. "
+                          f"Further requests fail until then.")
+
+    def update(self, response):
+        """
+        Adjusts the rate from a response.
+
+        Returns:
+            float: Seconds to wait before retrying when the response was
+            throttled, otherwise None (also when the wait would exceed
+            MAX_WINDOW_SECONDS; the next acquire() then raises QuotaExhausted).
+        """
+        headers = response.headers
+        limits = parse_rate_headers(headers)
+        if limits['quota_reset'] is not None:
+            self.exhaust(limits['quota_reset'])
+
+        with self._lock:
+            if response.status_code in THROTTLED_STATUSES:
+                self.stats['throttled'] += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            if limits['remaining'] is not None and limits['remaining'] >= 1 and limits['reset']:
+                # Spread what is left of the window over the time until it resets
+                self.rate = max(self.min_rate, min(self.rate, limits['remaining'] / limits['reset']))
+
+        if response.status_code in THROTTLED_STATUSES:
+            wait = retry_after(headers)
+            if wait is None:
+                wait = limits['reset'] if limits['reset'] is not None else 1 / self.rate
+            if wait > MAX_WINDOW_SECONDS:
+                self.exhaust(wait)
+                return None
+            self.pause(wait)
+            return wait
+        if limits['remaining'] is not None and limits['remaining'] < 1 and limits['reset']:
+            self.pause(limits['reset'])
+        return None
+
+    def request(self, method, url, session=None, max_attempts=MAX_ATTEMPTS, **kwargs):
+        """
+        Sends a request through the limiter, retrying throttled responses.
+
+        The last response is returned as is (including a final 429), so the
+        caller's raise_for_status handling is unchanged.
+        """
+        sender = session
+        if sender is None:
+            import requests
+            sender = requests
+        for attempt in range(1, max_attempts + 1):
+            with span('rate_limit_wait', api=self.name):
+                self.acquire()
+            with span('http_request', api=self.name):
+                response = sender.request(method, url, **kwargs)
+            count('http_requests', api=self.name, status=response.status_code)
+            count('http_bytes', len(response.content), api=self.name)
+            wait = self.update(response)
+            if wait is None or attempt == max_attempts:
+                return response
+            count('http_retries', api=self.name)
+            print(f"Rate limited by {url} (HTTP {response.status_code}); retrying in {wait:.1f}s "
+                  f"at {self.rate:.2f} req/s.")
+        return response
+
+    def get(self, url, session=None, **kwargs):
+        return self.request('GET', url, session=session, **kwargs)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(name):
+    """Returns the process-wide limiter for an API, so every client of it shares one bucket."""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name=name, **RATE_LIMITS.get(name, DEFAULT_LIMITS))
+        return _limiters[name]
@@ -0,0 +1,88 @@
+import os
+import time
+import logging
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Format shared by every scraper log file
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Root of the scrapers' JSONL output, independent of the working directory
+# (llm-scraper --data-dir overrides it per run)
+DATA_DIR_ENV = 'SCRAPER_DATA_DIR'
+DATA_DIR = os.getenv(DATA_DIR_ENV) or os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+
+_environment_loaded = False
+
+
+# ----------------------------
+# Process Setup
+# ----------------------------
+
+# The scrapers call these from their entry points rather than at import time,
+# so importing a scraper module never reads .env, touches the root logger or
+# registers schedule jobs.
+
+def load_environment():
+    """Loads .env into os.environ once per process; a no-op without python-dotenv."""
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    _environment_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def configure_logging(log_file=None, console=False, level=logging.INFO):
+    """
+    Configures the root logger for a scraper process: a file handler when
+    log_file is given and/or a console handler. Like logging.basicConfig, the
+    first call wins.
+    """
+    handlers = []
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, mode='a'))
+    if console:
+        handlers.append(logging.StreamHandler())
+    if not handlers:
+        handlers.append(logging.StreamHandler())
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
+
+
+# ----------------------------
+# Scheduling
+# ----------------------------
+
+def register_daily(job, times):
+    """Registers job with schedule at every 'HH:MM' in times."""
+    import schedule
+
+    for time_str in times:
+        schedule.every().day.at(time_str).do(job)
+
+
+def run_daily(job, times, run_now=False, poll_seconds=1):
+    """
+    Runs job at every 'HH:MM' in times, forever. With run_now the job also
+    runs once before the first scheduled time.
+    """
+    import schedule
+
+    register_daily(job, times)
+    if run_now:
+        job()
+    while True:
+        schedule.run_pending()
+        time.sleep(poll_seconds)
+
+
+def run_periodically(job, seconds):
+    """Runs job, then again `seconds` after each run finishes, forever."""
+    while True:
+        job()
+        time.sleep(seconds)
@@ -0,0 +1,385 @@
+import os
+import sys
+import time
+import random
+import itertools
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Path of the SQLite search index file. The index is disabled when this is unset.
+INDEX_PATH_ENV = 'SEARCH_INDEX_PATH'
+
+# Source ids by name, as in the `sources` table
+SOURCE_IDS = {
+    'benzinga': 1,
+    'nasdaq': 2,
+    'reddit': 3,
+    'seeking_alpha_news': 4,
+    'seeking_alpha_article': 5,
+}
+
+# Rows per executemany when indexing a batch
+WRITE_BATCH = 5000
+
+SNIPPET_TOKENS = 16
+
+# BM25 weights for the title, body and tickers columns
+RANK_WEIGHTS = (4.0, 1.0, 2.0)
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+
+def normalize_published(value):
+    """'YYYY-MM-DD HH:MM:SS' text for a datetime or a SQL/ISO timestamp string, so ranges compare as text."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)[:19].replace('T', ' ')
+
+
+def source_id_of(value):
+    """Accepts a source id or a name from SOURCE_IDS."""
+    if isinstance(value, int) or str(value).isdigit():
+        return int(value)
+    if value not in SOURCE_IDS:
+        raise ValueError(f"Unknown source '{value}'; expected one of {', '.join(SOURCE_IDS)} or a source id")
+    return SOURCE_IDS[value]
+
+
+def quote_term(term):
+    """Quotes a term as an FTS5 string so symbols like BRK.B are matched literally."""
+    return '"' + str(term).replace('"', '""') + '"'
+
+
+# ----------------------------
+# Search Index
+# ----------------------------
+
+class SearchIndex:
+    """
+    Full-text index over article titles, bodies and tickers, stored in SQLite FTS5.
+
+    `article` holds the filterable metadata under an INTEGER rowid shared with
+    the `article_fts` virtual table, so a query is one FTS5 MATCH joined to
+    the metadata row by rowid. Tickers are indexed as their own FTS column,
+    which keeps ticker filters inside the inverted index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL;")
+        self.connection.execute("PRAGMA synchronous=NORMAL;")
+        self.connection.executescript("""
+        CREATE TABLE IF NOT EXISTS article (
+            rowid INTEGER PRIMARY KEY,
+            source_id INTEGER NOT NULL,
+            doc_id TEXT NOT NULL,
+            published TEXT,
+            UNIQUE (source_id, doc_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_article_published ON article (published);
+        CREATE INDEX IF NOT EXISTS idx_article_source_published ON article (source_id, published);
+        CREATE VIRTUAL TABLE IF NOT EXISTS article_fts USING fts5(
+            title, body, tickers,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+        """)
+        self.connection.commit()
+
+    def add_many(self, documents):
+        """
+        Indexes (source_id, doc_id, published, title, body, tickers) documents
+        in one transaction. A document that is already indexed is replaced.
+
+        Returns:
+            int: Number of documents written.
+        """
+        count = 0
+        with self.connection:
+            for source_id, doc_id, published, title, body, tickers in documents:
+                doc_id = str(doc_id)
+                published = normalize_published(published)
+                row = self.connection.execute(
+                    "SELECT rowid FROM article WHERE source_id = ? AND doc_id = ?;", (source_id, doc_id)
+                ).fetchone()
+                if row:
+                    rowid = row[0]
+                    self.connection.execute("DELETE FROM article_fts WHERE rowid = ?;", (rowid,))
+                    self.connection.execute("UPDATE article SET published = ? WHERE rowid = ?;", (published, rowid))
+                else:
+                    rowid = self.connection.execute(
+                        "INSERT INTO article (source_id, doc_id, published) VALUES (?, ?, ?);",
+                        (source_id, doc_id, published)
+                    ).lastrowid
+                self.connection.execute(
+                    "INSERT INTO article_fts (rowid, title, body, tickers) VALUES (?, ?, ?, ?);",
+                    (rowid, title or '', body or '', ' '.join(tickers or []))
+                )
+                count += 1
+        return count
+
+    def search(self, query=None, sources=None, start=None, end=None, tickers=None, limit=20, order='rank'):
+        """
+        Returns matching articles as (source_id, doc_id, published, title, snippet) rows.
+
+        Args:
+            query (str, optional): FTS5 query, e.g. 'earnings AND guidance' or '"rate cut"'.
+            sources (list, optional): Source ids or names from SOURCE_IDS.
+            start (datetime or str, optional): Inclusive lower bound on published.
+            end (datetime or str, optional): Exclusive upper bound on published.
+            tickers (list, optional): Only articles tagged with any of these tickers.
+            limit (int, optional): Maximum rows returned.
+            order (str, optional): 'rank' for BM25 relevance or 'newest'.
+        """
+        expressions = []
+        if query:
+            expressions.append(f"({query})")
+        if tickers:
+            expressions.append(f"tickers:({' OR '.join(quote_term(ticker) for ticker in tickers)})")
+        if not expressions:
+            raise ValueError("A query or at least one ticker is required")
+
+        sql = (
+            "SELECT a.source_id, a.doc_id, a.published, article_fts.title, "
+            f"snippet(article_fts, 1, '[', ']', '...', {SNIPPET_TOKENS}) "
+            "FROM article_fts JOIN article a ON a.rowid = article_fts.rowid "
+            "WHERE article_fts MATCH ?"
+        )
+        params = [' AND '.join(expressions)]
+        if sources:
+            source_ids = [source_id_of(source) for source in sources]
+            sql += f" AND a.source_id IN ({', '.join(['?'] * len(source_ids))})"
+            params.extend(source_ids)
+        if start is not None:
+            sql += " AND a.published >= ?"
+            params.append(normalize_published(start))
+        if end is not None:
+            sql += " AND a.published < ?"
+            params.append(normalize_published(end))
+        if order == 'newest':
+            sql += " ORDER BY a.published DESC"
+        else:
+            sql += f" ORDER BY bm25(article_fts, {', '.join(str(weight) for weight in RANK_WEIGHTS)})"
+        sql += " LIMIT ?;"
+        params.append(limit)
+        return self.connection.execute(sql, params).fetchall()
+
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM article;").fetchone()[0]
+
+    def optimize(self):
+        """Merges the FTS5 b-trees into one; worth running after a large backfill."""
+        with self.connection:
+            self.connection.execute("INSERT INTO article_fts (article_fts) VALUES ('optimize');")
+
+    def stats(self):
+        return {
+            'documents': self.count(),
+            'size_mb': sum(
+                os.path.getsize(path) for path in (self.path, self.path + '-wal') if os.path.exists(path)
+            ) / (1024 * 1024),
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+def open_search_index():
+    """
+    Returns a SearchIndex when SEARCH_INDEX_PATH is set, otherwise None.
+    Writers call this at run time so the index stays optional.
+    """
+    path = os.getenv(INDEX_PATH_ENV)
+    if not path:
+        return None
+    return SearchIndex(path)
+
+
+def index_articles(documents):
+    """
+    Indexes (source_id, doc_id, published, title, body, tickers) documents when
+    the index is enabled. Failures are logged so they never block the database write.
+    """
+    documents = list(documents)
+    if not documents:
+        return 0
+    index = open_search_index()
+    if index is None:
+        return 0
+    try:
+        count = 0
+        for start in range(0, len(documents), WRITE_BATCH):
+            count += index.add_many(documents[start:start + WRITE_BATCH])
+        logging.info(f"Search index: indexed {count} documents.")
+        return count
+    except sqlite3.Error as e:
+        logging.error(f"Search index update failed: {e}")
+        return 0
+    finally:
+        index.close()
+
+
+def tickers_by_article(rows, exclude_roles=('channel',)):
+    """Groups article_ticker rows into {article_id: [ticker, ...]}, leaving out non-symbol roles."""
+    grouped = {}
+    for _, article_id, ticker, role, _ in rows:
+        if role not in exclude_roles:
+            grouped.setdefault(str(article_id), []).append(ticker)
+    return grouped
+
+
+# ----------------------------
+# Latency Benchmark
+# ----------------------------
+
+BENCHMARK_WORDS = 20000
+BENCHMARK_SENTENCES = 50000
+
+# Synthetic documents are indexed under SOURCE_IDS shifted by this offset, so
+# they can never replace or be mistaken for scraped articles
+BENCHMARK_SOURCE_OFFSET = 1000
+
+
+def synthetic_articles(count, first_id=0, seed=0):
+    """
+    Yields synthetic articles with a Zipf-like vocabulary. Bodies are built
+    from a pool of pre-generated sentences so generation keeps up with FTS5.
+    """
+    generator = random.Random(seed)
+    vocabulary = [f"w{rank}" for rank in range(BENCHMARK_WORDS)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(BENCHMARK_WORDS)))
+    sentences = [' '.join(generator.choices(vocabulary, cum_weights=cum_weights, k=12))
+                 for _ in range(BENCHMARK_SENTENCES)]
+    symbols = [f"T{rank}" for rank in range(5000)]
+    source_ids = [BENCHMARK_SOURCE_OFFSET + source_id for source_id in SOURCE_IDS.values()]
+
+    generator.seed(seed + first_id)
+    for doc_id in range(first_id, first_id + count):
+        published = datetime.fromtimestamp(1420070400 + generator.randrange(10 * 365 * 86400))
+        yield (
+            generator.choice(source_ids),
+            doc_id,
+            published,
+            generator.choice(sentences),
+            ' '.join(generator.choice(sentences) for _ in range(8)),
+            generator.sample(symbols, generator.randint(0, 3)),
+        )
+
+
+def benchmark(index, docs, repeat=20):
+    """
+    Grows the index to `docs` documents, then returns p50/p95 latency in
+    milliseconds for a set of representative queries. Refuses an index that
+    holds anything but synthetic documents.
+    """
+    scraped = index.connection.execute(
+        "SELECT COUNT(*) FROM article WHERE source_id < ?;", (BENCHMARK_SOURCE_OFFSET,)
+    ).fetchone()[0]
+    if scraped:
+        raise ValueError(f"{scraped:,} scraped articles in the index; run the benchmark against its own index file")
+    existing = index.count()
+    if existing < docs:
+        started = time.perf_counter()
+        batch = []
+        for document in synthetic_articles(docs - existing, first_id=existing):
+            batch.append(document)
+            if len(batch) >= WRITE_BATCH * 10:
+                index.add_many(batch)
+                batch = []
+        if batch:
+            index.add_many(batch)
+        index.optimize()
+        elapsed = time.perf_counter() - started
+        print(f"Indexed {docs - existing:,} documents in {elapsed:,.1f}s ({(docs - existing) / elapsed:,.0f} docs/sec)")
+
+    queries = {
+        'stopword-like term': dict(query='w1'),
+        'rare term': dict(query='w15000'),
+        'two terms': dict(query='w50 AND w900'),
+        'phrase': dict(query='"w3 w4"'),
+        'term + ticker': dict(query='w10', tickers=['T42']),
+        'ticker only, newest': dict(tickers=['T42'], order='newest'),
+        'term + source + 30 days': dict(query='w200', sources=[BENCHMARK_SOURCE_OFFSET + SOURCE_IDS['reddit']], start='2020-01-01', end='2020-01-31'),
+    }
+    results = {}
+    for name, kwargs in queries.items():
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            index.search(**kwargs)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[name] = (timings[len(timings) // 2], timings[int(len(timings) * 0.95) - 1])
+    return results
+
+
+# ----------------------------
+# Command Line
+# ----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the full-text search index over scraped articles.")
+    parser.add_argument('--index', help=f"Index file (default: ${INDEX_PATH_ENV} or search_index.sqlite)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    query = subparsers.add_parser('query', help="Search articles")
+    query.add_argument('query', nargs='?', help="FTS5 query, e.g. 'earnings AND guidance'")
+    query.add_argument('--source', action='append', help="Source name or id; repeatable")
+    query.add_argument('--since', help="Inclusive start, 'YYYY-MM-DD[ HH:MM:SS]'")
+    query.add_argument('--until', help="Exclusive end, 'YYYY-MM-DD[ HH:MM:SS]'")
+    query.add_argument('--ticker', action='append', help="Ticker symbol; repeatable")
+    query.add_argument('--limit', type=int, default=20)
+    query.add_argument('--newest', action='store_true', help="Order by publication time instead of relevance")
+
+    subparsers.add_parser('stats', help="Document count and index size")
+    subparsers.add_parser('optimize', help="Merge the FTS5 segments")
+
+    bench = subparsers.add_parser('benchmark', help="Query latency on a synthetic index (needs --index)")
+    bench.add_argument('--docs', type=int, default=10000000, help="Documents in the benchmark index")
+    bench.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+    if args.command == 'benchmark' and not args.index:
+        # Never fall back to the live index: the benchmark fills it with synthetic documents
+        parser.error("benchmark writes synthetic documents; pass --index with a file of its own")
+
+    index = SearchIndex(args.index or os.getenv(INDEX_PATH_ENV, 'search_index.sqlite'))
+    try:
+        if args.command == 'query':
+            rows = index.search(
+                args.query, sources=args.source, start=args.since, end=args.until, tickers=args.ticker,
+                limit=args.limit, order='newest' if args.newest else 'rank'
+            )
+            for source_id, doc_id, published, title, snippet in rows:
+                print(f"[{source_id}] {doc_id} {published or ''}  {title}\n    {snippet}")
+            print(f"{len(rows)} results")
+        elif args.command == 'stats':
+            for name, value in index.stats().items():
+                print(f"{name}: {value:,.2f}" if isinstance(value, float) else f"{name}: {value:,}")
+        elif args.command == 'optimize':
+            index.optimize()
+        else:
+            try:
+                results = benchmark(index, args.docs, args.repeat)
+            except ValueError as e:
+                print(f"Benchmark refused: {e}", file=sys.stderr)
+                return 1
+            print(f"{index.count():,} documents, {index.stats()['size_mb']:,.0f} MB")
+            for name, (p50, p95) in results.items():
+                print(f"{name:<28} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
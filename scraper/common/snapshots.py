@@ -0,0 +1,293 @@
+import os
+import sys
+import json
+import logging
+import argparse
+
+from scraper.common import documents
+from scraper.common.documents import TABLES, TABLE_NAMES, COLUMNS, select_columns, document_schema, to_record
+from scraper.common.streaming import stream_rows
+
+# pyarrow is only needed when snapshots are written or compacted;
+# load_pyarrow() imports it on first use so importing this module stays cheap
+pa = None
+pc = None
+pq = None
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Rows changed within this many seconds of a snapshot are left for the next
+# one, so writes still in flight when the snapshot starts are not skipped.
+SAFETY_LAG_SECONDS = 60
+
+# Rows per Parquet row group
+BATCH_SIZE = 10000
+
+STATE_FILE = 'state.json'
+
+# ingested_at is set once on insert. updated_at moves on every UPDATE that
+# changes a value. upsert_changed skips unchanged rows and the bulk loader
+# keeps their values, so updated_at only moves when the content changes.
+CHANGE_COLUMNS = {
+    'ingested_at': "DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)",
+    'updated_at': "DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)",
+}
+
+
+# ----------------------------
+# Schema Migration
+# ----------------------------
+
+def add_change_tracking_columns(connection, table):
+    """Adds ingested_at/updated_at and the (updated_at, id) index to a table. Safe to re-run."""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND column_name IN (%s, %s);",
+            (table, *CHANGE_COLUMNS)
+        )
+        existing = {column for (column,) in cursor.fetchall()}
+        changes = [f"ADD COLUMN {column} {definition}" for column, definition in CHANGE_COLUMNS.items()
+                   if column not in existing]
+        if not changes:
+            print(f"Table '{table}' already has change tracking columns.")
+            return
+        if 'updated_at' not in existing:
+            changes.append(f"ADD INDEX idx_{table}_updated_at (updated_at, id)")
+        cursor.execute(f"ALTER TABLE {table} {', '.join(changes)};")
+        connection.commit()
+        print(f"Added change tracking columns to '{table}'.")
+    finally:
+        cursor.close()
+
+
+# ----------------------------
+# Snapshot State
+# ----------------------------
+
+def load_pyarrow():
+    """Imports pyarrow into `pa`, `pc` and `pq`. Returns False when it is not installed."""
+    global pa, pc, pq
+    if pa is None:
+        if not documents.load_pyarrow():
+            return False
+        import pyarrow.compute
+        pa, pc, pq = documents.pa, pyarrow.compute, documents.pq
+    return True
+
+
+def snapshot_schema():
+    return document_schema().append(pa.field('ingested_at', pa.timestamp('us'))) \
+                            .append(pa.field('updated_at', pa.timestamp('us')))
+
+
+def load_state(snapshot_dir):
+    """
+    Returns the snapshot state: the next sequence number, the (updated_at, id)
+    watermark per table, the current base file and the deltas since it.
+    """
+    path = os.path.join(snapshot_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {'sequence': 0, 'watermarks': {}, 'base': None, 'deltas': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(snapshot_dir, state):
+    path = os.path.join(snapshot_dir, STATE_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+# ----------------------------
+# Delta Snapshots
+# ----------------------------
+
+def delta_query(spec, watermark, upper):
+    """Rows of one table changed after the (updated_at, id) watermark and before `upper`."""
+    query = f"SELECT {select_columns(spec)}, ingested_at, updated_at FROM {spec['table']} WHERE updated_at < %s"
+    params = [upper]
+    if watermark:
+        # The table's own id, not the CHAR alias select_columns gives benzinga's
+        query += f" AND (updated_at > %s OR (updated_at = %s AND {spec['table']}.id > %s))"
+        params += [watermark[0], watermark[0], watermark[1]]
+    return query + f" ORDER BY updated_at, {spec['table']}.id;", params
+
+
+def write_delta(connection, snapshot_dir, tables=None):
+    """
+    Exports the rows changed since the last snapshot as one Parquet delta.
+
+    Each table is read along its (updated_at, id) index from its watermark,
+    so the cost is proportional to the changed rows rather than the corpus.
+    Rows changed in the last SAFETY_LAG_SECONDS are left for the next run.
+    The state (watermarks and delta list) is saved only after the file is
+    complete, so an interrupted run is simply repeated.
+
+    Returns:
+        tuple: (delta file name or None, rows written)
+    """
+    if not load_pyarrow():
+        raise ImportError("pyarrow is required for snapshots")
+    os.makedirs(snapshot_dir, exist_ok=True)
+    state = load_state(snapshot_dir)
+
+    cursor = connection.cursor()
+    cursor.execute("SELECT NOW(6) - INTERVAL %s SECOND;", (SAFETY_LAG_SECONDS,))
+    upper = cursor.fetchone()[0]
+    cursor.close()
+
+    name = f"delta-{state['sequence']:06d}.parquet"
+    path = os.path.join(snapshot_dir, name)
+    schema = snapshot_schema()
+    writer = pq.ParquetWriter(path + '.tmp', schema, compression='zstd')
+    written = 0
+    try:
+        for spec in TABLES:
+            if tables and spec['table'] not in tables:
+                continue
+            watermark = state['watermarks'].get(spec['table'])
+            query, params = delta_query(spec, watermark, upper)
+            batch = []
+            for row in stream_rows(connection, query, params):
+                record = to_record(row[:len(COLUMNS)])
+                record['ingested_at'], record['updated_at'] = row[len(COLUMNS)], row[len(COLUMNS) + 1]
+                batch.append(record)
+                watermark = [record['updated_at'].strftime('%Y-%m-%d %H:%M:%S.%f'), record['id']]
+                if len(batch) >= BATCH_SIZE:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    written += len(batch)
+                    batch = []
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                written += len(batch)
+            if watermark:
+                state['watermarks'][spec['table']] = watermark
+            logging.info(f"{spec['table']}: changed rows through {watermark[0] if watermark else 'none'}.")
+    finally:
+        writer.close()
+
+    if not written:
+        os.remove(path + '.tmp')
+        return None, 0
+
+    os.replace(path + '.tmp', path)
+    state['deltas'].append(name)
+    state['sequence'] += 1
+    save_state(snapshot_dir, state)
+    return name, written
+
+
+# ----------------------------
+# Compaction
+# ----------------------------
+
+def record_keys(table):
+    """'source_id:id' key per row of an Arrow table."""
+    return pc.binary_join_element_wise(pc.cast(table['source_id'], pa.string()), table['id'], ':')
+
+
+def compact(snapshot_dir, keep=False):
+    """
+    Folds the deltas into a new base file.
+
+    The latest version of each changed document is taken from the deltas
+    (held in memory, so the cost follows the number of changes). The old base
+    is streamed row group by row group with those documents filtered out, and
+    the latest versions are appended. The old files are removed once the new
+    state is saved, unless `keep` is set.
+
+    Returns:
+        tuple: (new base file name, rows in it), or (None, 0) when there are no deltas.
+    """
+    state = load_state(snapshot_dir)
+    if not state['deltas']:
+        return None, 0
+    if not load_pyarrow():
+        raise ImportError("pyarrow is required for snapshots")
+
+    schema = snapshot_schema()
+    latest = {}
+    for name in state['deltas']:
+        table = pq.read_table(os.path.join(snapshot_dir, name), schema=schema)
+        for key, record in zip(record_keys(table).to_pylist(), table.to_pylist()):
+            latest[key] = record
+    changed = pa.array(list(latest), pa.string())
+
+    name = f"base-{state['sequence']:06d}.parquet"
+    path = os.path.join(snapshot_dir, name)
+    writer = pq.ParquetWriter(path + '.tmp', schema, compression='zstd')
+    rows = 0
+    try:
+        if state['base']:
+            base = pq.ParquetFile(os.path.join(snapshot_dir, state['base']))
+            for batch in base.iter_batches(batch_size=BATCH_SIZE):
+                table = pa.Table.from_batches([batch]).cast(schema)
+                table = table.filter(pc.invert(pc.is_in(record_keys(table), value_set=changed)))
+                writer.write_table(table)
+                rows += table.num_rows
+        records = list(latest.values())
+        for start in range(0, len(records), BATCH_SIZE):
+            writer.write_table(pa.Table.from_pylist(records[start:start + BATCH_SIZE], schema=schema))
+        rows += len(records)
+    finally:
+        writer.close()
+    os.replace(path + '.tmp', path)
+
+    obsolete = ([state['base']] if state['base'] else []) + state['deltas']
+    state['base'] = name
+    state['deltas'] = []
+    state['sequence'] += 1
+    save_state(snapshot_dir, state)
+
+    if not keep:
+        for old in obsolete:
+            os.remove(os.path.join(snapshot_dir, old))
+    return name, rows
+
+
+# ----------------------------
+# Command Line
+# ----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental snapshots of the scraped documents.")
+    parser.add_argument('snapshot_dir')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    delta = subparsers.add_parser('delta', help="Export rows changed since the last snapshot")
+    delta.add_argument('--table', action='append', choices=TABLE_NAMES, help="Table to include; repeatable")
+    compact_parser = subparsers.add_parser('compact', help="Fold the deltas into a new base")
+    compact_parser.add_argument('--keep', action='store_true', help="Keep the old base and delta files")
+    subparsers.add_parser('status', help="Show the base, deltas and watermarks")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from scraper.common.documents import create_connection
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'delta':
+        connection = create_connection()
+        if connection is None:
+            return 1
+        try:
+            name, rows = write_delta(connection, args.snapshot_dir, args.table)
+        finally:
+            connection.close()
+        print(f"Wrote {rows} changed rows to {name}." if name else "No changes since the last snapshot.")
+    elif args.command == 'compact':
+        name, rows = compact(args.snapshot_dir, args.keep)
+        print(f"Compacted into {name} ({rows} rows)." if name else "No deltas to compact.")
+    else:
+        print(json.dumps(load_state(args.snapshot_dir), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import sys
+import time
+import argparse
+import tracemalloc
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Rows pulled from the server per fetchmany round trip
+FETCH_SIZE = 2000
+
+
+# ----------------------------
+# Streaming Reads
+# ----------------------------
+
+def iter_batches(cursor, batch_size=FETCH_SIZE):
+    """Yields lists of tuple rows from an executed cursor, batch_size at a time."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+
+def iter_rows(cursor, batch_size=FETCH_SIZE):
+    """Yields tuple rows from an executed cursor, fetching batch_size at a time."""
+    for rows in iter_batches(cursor, batch_size):
+        yield from rows
+
+
+def release_cursor(connection, cursor):
+    """
+    Closes an unbuffered cursor. Rows left unread by a reader that stopped early
+    are drained first, otherwise the connection refuses the next query.
+    """
+    if getattr(connection, 'unread_result', False):
+        connection.consume_results()
+    cursor.close()
+
+
+def stream_rows(connection, query, params=None, batch_size=FETCH_SIZE):
+    """
+    Yields the rows of a query as tuples through an unbuffered cursor.
+
+    Rows are pulled from the server batch_size at a time, so memory stays at
+    one batch however large the result set is. The connection cannot run other
+    queries until the generator is exhausted or closed; use a second connection
+    to write while reading.
+
+    Args:
+        connection: MySQL connection.
+        query (str): SELECT statement.
+        params (tuple or list, optional): Query parameters.
+        batch_size (int, optional): Rows per fetchmany.
+    """
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute(query, params or ())
+        yield from iter_rows(cursor, batch_size)
+    finally:
+        release_cursor(connection, cursor)
+
+
+def stream_column(connection, query, params=None, batch_size=FETCH_SIZE):
+    """Yields the first column of each row of a query."""
+    for row in stream_rows(connection, query, params, batch_size):
+        yield row[0]
+
+
+# ----------------------------
+# Memory Benchmark
+# ----------------------------
+
+# 1..n with a URL-shaped string per row, without touching any table
+SYNTHETIC_QUERY = """
+WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+SELECT CONCAT('https://www.nasdaq.com/articles/', n, '-', MD5(n)) AS url FROM seq;
+"""
+
+
+def measure(read):
+    """Returns (rows, peak MB of Python allocations, seconds) for one read strategy."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = read()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, peak / (1024 * 1024), elapsed
+
+
+def benchmark(connection, rows, table=None):
+    """
+    Compares a dictionary cursor with fetchall against stream_rows when counting
+    the rows of a query, on `table`'s url column or on synthetic rows.
+    """
+    if table:
+        query, params = f"SELECT url FROM {table} LIMIT %s;", (rows,)
+    else:
+        cursor = connection.cursor()
+        cursor.execute("SET SESSION cte_max_recursion_depth = %s;", (rows + 1,))
+        cursor.close()
+        query, params = SYNTHETIC_QUERY, (rows,)
+
+    def fetchall_dicts():
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            return len([row['url'] for row in cursor.fetchall()])
+        finally:
+            cursor.close()
+
+    def streamed_tuples():
+        return sum(1 for _ in stream_rows(connection, query, params))
+
+    return {
+        'fetchall, dictionary rows': measure(fetchall_dicts),
+        'stream_rows, tuple rows': measure(streamed_tuples),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare fetchall and streaming reads on peak memory.")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--table', help="Read the url column of this table instead of synthetic rows")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from scraper.common.documents import create_connection
+
+    load_dotenv()
+    connection = create_connection()
+    if connection is None:
+        return 1
+    try:
+        for name, (rows, peak_mb, seconds) in benchmark(connection, args.rows, args.table).items():
+            print(f"{name:<28} {rows:>10,} rows   peak {peak_mb:9.1f} MB   {seconds:6.2f}s")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
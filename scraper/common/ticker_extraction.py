@@ -0,0 +1,171 @@
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+
+from scraper.common.tickers import ROLE_STOCK, ROLE_PRIMARY, ROLE_SECONDARY
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+ROLE_CASHTAG = 'cashtag'  # Written as $TSLA
+ROLE_MENTION = 'mention'  # Bare symbol from the known-ticker universe
+
+# Seconds before the known-ticker universe is reloaded from article_ticker
+UNIVERSE_TTL = 6 * 60 * 60
+
+# Symbols that are also everyday words or finance jargon. They only count as
+# cashtags, never as bare mentions.
+AMBIGUOUS_SYMBOLS = frozenset([
+    'A', 'I', 'AI', 'ALL', 'AM', 'AN', 'ANY', 'ARE', 'AT', 'BE', 'BIG', 'BY', 'CAN', 'CEO', 'CFO', 'DD',
+    'EOD', 'EPS', 'ETF', 'EV', 'FOR', 'FUN', 'GDP', 'GO', 'GOOD', 'HAS', 'HE', 'IPO', 'IRS', 'IT', 'LOW',
+    'MAN', 'NEW', 'NOW', 'ON', 'ONE', 'OR', 'OUT', 'PM', 'REAL', 'RH', 'SEC', 'SO', 'TV', 'UK', 'US',
+    'USA', 'USD', 'WELL', 'YOLO', 'YOU',
+])
+
+# $TSLA, $BRK.B; upper case only, so prices and slang like $money or $Tsla are not symbols
+CASHTAG_RE = re.compile(r'(?<![\w$])\$([A-Z]{1,6}(?:\.[A-Z]{1,2})?)\b')
+# Upper-case tokens that could be symbols: TSLA, BRK.B
+SYMBOL_RE = re.compile(r'(?<![\w$.])([A-Z]{1,5}(?:\.[A-Z]{1,2})?)\b')
+
+
+# ----------------------------
+# Matcher
+# ----------------------------
+
+class TickerMatcher:
+    """
+    Single-pass symbol matcher over free text.
+
+    Two precompiled regular expressions pull cashtags and upper-case tokens out
+    of the text; both are kept only when they are in the known-ticker universe
+    (one frozenset intersection each), bare tokens only when they are not
+    ambiguous. An empty universe keeps every cashtag. Scanning runs in the regex
+    engine, so the cost depends on the text length, not on the universe size.
+    """
+
+    def __init__(self, universe, ambiguous=AMBIGUOUS_SYMBOLS):
+        self.universe = frozenset(symbol.upper() for symbol in universe)
+        self.mentionable = self.universe - ambiguous
+
+    def extract(self, text):
+        """
+        Returns [(ticker, role), ...] with one entry per ticker. A ticker written
+        as a cashtag anywhere in the text is a cashtag.
+        """
+        if not text:
+            return []
+
+        cashtags = set(CASHTAG_RE.findall(text))
+        if self.universe:
+            cashtags &= self.universe
+        mentions = self.mentionable.intersection(SYMBOL_RE.findall(text)) - cashtags
+        return [(ticker, ROLE_CASHTAG) for ticker in sorted(cashtags)] + \
+               [(ticker, ROLE_MENTION) for ticker in sorted(mentions)]
+
+
+def load_universe(connection):
+    """Known tickers from the Benzinga stocks and Seeking Alpha ticker tags."""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT DISTINCT ticker FROM article_ticker WHERE role IN (%s, %s, %s);",
+            (ROLE_STOCK, ROLE_PRIMARY, ROLE_SECONDARY)
+        )
+        return {ticker for (ticker,) in cursor.fetchall() if ticker}
+    finally:
+        cursor.close()
+
+
+_matcher = None
+_matcher_loaded_at = 0.0
+
+
+def get_matcher(connection):
+    """Process-wide matcher, rebuilt from article_ticker every UNIVERSE_TTL seconds."""
+    global _matcher, _matcher_loaded_at
+    if _matcher is None or time.monotonic() - _matcher_loaded_at > UNIVERSE_TTL:
+        universe = load_universe(connection)
+        _matcher = TickerMatcher(universe)
+        _matcher_loaded_at = time.monotonic()
+        logging.info(f"Loaded ticker universe of {len(universe)} symbols.")
+    return _matcher
+
+
+def extract_ticker_rows(connection, source_id, documents):
+    """
+    Builds article_ticker rows for (article_id, published, text) documents.
+
+    Returns:
+        list: (source_id, article_id, ticker, role, published) tuples.
+    """
+    matcher = get_matcher(connection)
+    rows = []
+    for article_id, published, text in documents:
+        for ticker, role in matcher.extract(text):
+            rows.append((source_id, str(article_id), ticker, role, published))
+    return rows
+
+
+# ----------------------------
+# Throughput Benchmark
+# ----------------------------
+
+def synthetic_documents(universe, count, words_per_doc=120, seed=0):
+    """Reddit-style posts with a few cashtags and bare symbols mixed into filler words."""
+    generator = random.Random(seed)
+    filler = ['the', 'stock', 'calls', 'puts', 'earnings', 'moon', 'I', 'think', 'A', 'CEO', 'bought',
+              'sold', 'market', 'is', 'going', 'to', 'rip', 'DD', 'on', 'this', 'week', 'YOLO', 'IT']
+    symbols = sorted(universe)
+    documents = []
+    for _ in range(count):
+        words = [generator.choice(filler) for _ in range(words_per_doc)]
+        for _ in range(generator.randint(0, 4)):
+            symbol = generator.choice(symbols)
+            words[generator.randrange(words_per_doc)] = f"${symbol}" if generator.random() < 0.5 else symbol
+        documents.append(' '.join(words))
+    return documents
+
+
+def benchmark(matcher, documents, repeat=3):
+    """Returns the best docs/sec over `repeat` passes."""
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for document in documents:
+            matcher.extract(document)
+        best = max(best, len(documents) / (time.perf_counter() - started))
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ticker extraction throughput.")
+    parser.add_argument('--docs', type=int, default=100000, help="Synthetic documents to generate")
+    parser.add_argument('--universe-size', type=int, default=8000, help="Synthetic universe size")
+    parser.add_argument('--jsonl', help="Benchmark on a Reddit/Nasdaq JSONL file instead of synthetic posts")
+    args = parser.parse_args(argv)
+
+    generator = random.Random(1)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    universe = {''.join(generator.choice(letters) for _ in range(generator.randint(1, 5)))
+                for _ in range(args.universe_size)}
+
+    if args.jsonl:
+        with open(args.jsonl, 'r', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        documents = [f"{row.get('title') or ''}\n{row.get('selftext') or row.get('body') or ''}" for row in rows]
+    else:
+        documents = synthetic_documents(universe, args.docs)
+
+    matcher = TickerMatcher(universe)
+    docs_per_sec = benchmark(matcher, documents)
+    print(f"{len(documents)} documents, {len(universe)} symbols: {docs_per_sec:,.0f} docs/sec")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
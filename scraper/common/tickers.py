@@ -0,0 +1,153 @@
+from datetime import datetime
+
+from scraper.common.instrumentation import timed
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Rows per executemany when writing article_ticker
+WRITE_BATCH = 5000
+
+# Ticker roles by source
+ROLE_STOCK = 'stock'  # Benzinga stocks
+ROLE_CHANNEL = 'channel'  # Benzinga channels
+ROLE_PRIMARY = 'primary'  # Seeking Alpha primary tickers
+ROLE_SECONDARY = 'secondary'  # Seeking Alpha secondary tickers
+
+# `published` is copied from the article so per-ticker time-range queries are
+# served entirely from the (ticker, published) index.
+CREATE_ARTICLE_TICKER_TABLE = """
+CREATE TABLE IF NOT EXISTS article_ticker (
+    source_id INT NOT NULL,
+    article_id VARCHAR(32) NOT NULL,
+    ticker VARCHAR(64) NOT NULL,
+    role VARCHAR(16) NOT NULL,
+    published DATETIME,
+    PRIMARY KEY (source_id, article_id, role, ticker),
+    INDEX idx_article_ticker_published (ticker, published),
+    INDEX idx_article_ticker_source_published (ticker, source_id, published),
+    FOREIGN KEY (source_id) REFERENCES sources (source_id)
+);
+"""
+
+
+# ----------------------------
+# Table Creation
+# ----------------------------
+
+def create_article_ticker_table(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(CREATE_ARTICLE_TICKER_TABLE)
+        connection.commit()
+        print("Table 'article_ticker' created or already exists.")
+    finally:
+        cursor.close()
+
+
+# ----------------------------
+# Writing
+# ----------------------------
+
+def ticker_rows(source_id, article_id, published, tickers, role):
+    """Builds article_ticker rows for one article, skipping blanks and repeats."""
+    rows = []
+    seen = set()
+    for ticker in tickers or []:
+        ticker = (ticker or '').strip()
+        if ticker and ticker not in seen:
+            seen.add(ticker)
+            rows.append((source_id, str(article_id), ticker, role, published))
+    return rows
+
+
+@timed()
+def replace_article_tickers(connection, source_id, article_ids, rows):
+    """
+    Replaces the ticker rows of the given articles in bulk.
+
+    Existing rows for `article_ids` are deleted first so tickers dropped from an
+    updated article do not linger, then `rows` are inserted with executemany.
+
+    Args:
+        connection: MySQL connection.
+        source_id (int): Source of every article in the batch.
+        article_ids (iterable): Ids of the articles being (re)written.
+        rows (list): (source_id, article_id, ticker, role, published) tuples.
+    """
+    article_ids = [str(article_id) for article_id in article_ids]
+    if not article_ids:
+        return 0
+
+    cursor = connection.cursor()
+    try:
+        for start in range(0, len(article_ids), WRITE_BATCH):
+            chunk = article_ids[start:start + WRITE_BATCH]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f"DELETE FROM article_ticker WHERE source_id = %s AND article_id IN ({placeholders});",
+                [source_id] + chunk
+            )
+        insert_article_tickers(cursor, rows)
+        connection.commit()
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+@timed()
+def insert_article_tickers(cursor, rows):
+    """Inserts article_ticker rows in batches, ignoring rows that already exist."""
+    insert_query = """
+    INSERT IGNORE INTO article_ticker (source_id, article_id, ticker, role, published)
+    VALUES (%s, %s, %s, %s, %s);
+    """
+    for start in range(0, len(rows), WRITE_BATCH):
+        cursor.executemany(insert_query, rows[start:start + WRITE_BATCH])
+
+
+def split_joined(value):
+    """Splits the legacy comma-joined ticker strings."""
+    return [part for part in (value or '').split(',') if part]
+
+
+# ----------------------------
+# Queries
+# ----------------------------
+
+def articles_for_ticker(connection, ticker, start=None, end=None, source_ids=None, roles=None):
+    """
+    Returns (source_id, article_id, role, published) rows mentioning a ticker,
+    newest first, using the (ticker, published) index instead of a LIKE scan.
+
+    Args:
+        connection: MySQL connection.
+        ticker (str): Ticker symbol, e.g. 'AAPL'.
+        start (datetime or str, optional): Inclusive lower bound on published.
+        end (datetime or str, optional): Exclusive upper bound on published.
+        source_ids (list, optional): Restrict to these sources.
+        roles (list, optional): Restrict to these roles.
+    """
+    query = "SELECT source_id, article_id, role, published FROM article_ticker WHERE ticker = %s"
+    params = [ticker]
+    if start is not None:
+        query += " AND published >= %s"
+        params.append(start.strftime('%Y-%m-%d %H:%M:%S') if isinstance(start, datetime) else start)
+    if end is not None:
+        query += " AND published < %s"
+        params.append(end.strftime('%Y-%m-%d %H:%M:%S') if isinstance(end, datetime) else end)
+    if source_ids:
+        query += f" AND source_id IN ({', '.join(['%s'] * len(source_ids))})"
+        params.extend(source_ids)
+    if roles:
+        query += f" AND role IN ({', '.join(['%s'] * len(roles))})"
+        params.extend(roles)
+    query += " ORDER BY published DESC;"
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
@@ -0,0 +1,102 @@
+import logging
+
+# Selenium is imported where its exceptions are caught, so importing this
+# module does not load it
+
+from scraper.nasdaq.nasdaq_news_getter_for_scraping import setup_driver, HEADLESS
+
+# psutil is only needed for the memory cap; without it the page cap still applies
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ========================== Configuration ========================== #
+
+MAX_PAGES_PER_DRIVER = 300  # Restart Chrome after this many page loads
+MAX_DRIVER_RSS_MB = 1500  # Restart Chrome once chromedriver + browser exceed this
+
+# ========================== Browser Manager ========================== #
+
+class BrowserManager:
+    """
+    Keeps a warm Chrome session alive between scheduled runs.
+
+    The URL-listing and article phases share the same driver. Before handing it
+    out, the manager checks that the session still responds and restarts it once
+    it has served too many pages or grown past the memory cap.
+    """
+
+    def __init__(self, headless=HEADLESS, max_pages=MAX_PAGES_PER_DRIVER, max_rss_mb=MAX_DRIVER_RSS_MB):
+        self.headless = headless
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.driver = None
+        self.pages_served = 0
+
+    def get_driver(self):
+        """Return a healthy driver, starting or restarting Chrome if needed."""
+        if self.driver is not None:
+            reason = self._restart_reason()
+            if reason:
+                logging.info(f"Restarting WebDriver: {reason}.")
+                self.quit()
+
+        if self.driver is None:
+            self.driver = setup_driver(headless=self.headless)
+            self.pages_served = 0
+
+        return self.driver
+
+    def record_page(self, count=1):
+        """Count page loads towards the restart threshold."""
+        self.pages_served += count
+
+    def rss_mb(self):
+        """Resident memory of chromedriver and its browser processes, or None if unknown."""
+        if psutil is None or self.driver is None:
+            return None
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / (1024 * 1024)
+        except (AttributeError, psutil.Error):
+            return None
+
+    def quit(self):
+        """Close the browser. The next get_driver call starts a fresh one."""
+        from selenium.common.exceptions import WebDriverException
+
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+            logging.info("WebDriver has been closed.")
+        except WebDriverException as e:
+            logging.warning(f"Error while closing WebDriver: {e}")
+        finally:
+            self.driver = None
+            self.pages_served = 0
+
+    def _restart_reason(self):
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            self.driver.execute_script("return 1")
+        except WebDriverException as e:
+            return f"session unresponsive ({e.__class__.__name__})"
+
+        if self.pages_served >= self.max_pages:
+            return f"served {self.pages_served} pages"
+
+        rss = self.rss_mb()
+        if rss is not None and rss >= self.max_rss_mb:
+            return f"using {rss:.0f} MB"
+
+        return None
@@ -19,6 +19,10 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scraper.common.runtime import configure_logging
+
 # ========================== Configuration ========================== #
 
 URL_DIR = 'nasdaq_data'
@@ -47,21 +51,6 @@ USER_AGENTS = [
     # Add more User-Agent strings as needed
 ]
 
-# ========================== Logging Configuration ========================== #
-
-logging.basicConfig(
-    filename='article_scraper.log',
-    filemode='a',
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
-
-console = logging.StreamHandler()
-console.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console.setFormatter(formatter)
-logging.getLogger('').addHandler(console)
-
 # ========================== Helper Functions ========================== #
 
 def save_to_jsonl(article_data, directory, filename):
@@ -253,4 +242,5 @@ def main():
         logging.info("WebDriver has been closed.")
 
 if __name__ == "__main__":
+    configure_logging('article_scraper.log', console=True)
     main()
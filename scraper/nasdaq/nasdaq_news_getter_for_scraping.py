@@ -4,26 +4,52 @@ import time
 import random
 import logging
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import (
-    NoSuchElementException,
-    ElementClickInterceptedException,
-    TimeoutException,
-    WebDriverException,
-    StaleElementReferenceException
-)
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+
+# Selenium, webdriver_manager and BeautifulSoup are imported by the functions
+# that use them, so importing this module stays cheap
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scraper.common.parquet_archive import open_archive
+from scraper.common.instrumentation import timed, count
+from scraper.common.runtime import DATA_DIR
 
 # ========================== Configuration ========================== #
 
-NASDAQ_DATA_DIR = '../../data/nasdaq_data/articles'
+NASDAQ_DATA_DIR = os.path.join(DATA_DIR, 'nasdaq_data', 'articles')
 HEADLESS = True  # Set to True to run in headless mode
 
+PAGE_LOAD_TIMEOUT = 15  # Seconds to wait for the article title/body to appear
+
+# Adaptive politeness between article loads (seconds)
+INITIAL_DELAY = 3.0
+MIN_DELAY = 0.5
+MAX_DELAY = 60.0
+
+# Selectors per site layout. Each field falls back through the layouts in order.
+SITE_LAYOUTS = {
+    'jupiter22': {
+        'title': '.jupiter22-c-hero-article__ > h1',
+        'date': 'div.jupiter22-c-author-byline > p.jupiter22-c-author-byline__timestamp',
+        'body': '.body__content',
+    },
+    'legacy': {
+        'title': 'h1 > span',
+        'date': 'div.article-header__metadata > div.timestamp > time',
+        'body': '.body__content',
+    },
+}
+
+# How article fields are pulled from the page:
+#   'script'      - one execute_script call returns title, date and body together
+#   'page_source' - one page_source transfer, parsed locally with BeautifulSoup
+#   'elements'    - one find_element round trip per selector (slowest)
+EXTRACTION_MODE = 'script'
+
+# Page text that indicates we are being throttled or challenged
+THROTTLE_MARKERS = ['429', 'too many requests', 'rate limit']
+CAPTCHA_MARKERS = ['captcha', 'access denied', 'are you a robot', 'pardon our interruption']
+
 # List of realistic User-Agent strings for rotation
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
@@ -44,16 +70,45 @@ USER_AGENTS = [
     # Add more User-Agent strings as needed
 ]
 
-# ========================== Logging Configuration ========================== #
+# ========================== Helper Functions ========================== #
 
-logging.basicConfig(
-    filename='nasdaq_scraper.log',
-    filemode='a',
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+def build_selector_fallbacks(layouts=SITE_LAYOUTS):
+    """Flatten the layout table into {field: [selector, ...]} in fallback order."""
+    fallbacks = {}
+    for layout in layouts.values():
+        for field, selector in layout.items():
+            selectors = fallbacks.setdefault(field, [])
+            if selector not in selectors:
+                selectors.append(selector)
+    return fallbacks
 
-# ========================== Helper Functions ========================== #
+SELECTOR_FALLBACKS = build_selector_fallbacks()
+
+# Selectors that signal an article page is ready to be read. The title renders
+# before the body, so only a body with text counts.
+READY_SELECTORS = SELECTOR_FALLBACKS['body']
+
+# True once any of the selectors (joined into one list) matches an element with text
+BODY_READY_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).some(element => element.textContent.trim().length > 0);
+"""
+
+# Returns the text of the first matching selector for every field in one round trip
+EXTRACT_FIELDS_SCRIPT = """
+const fallbacks = arguments[0];
+const result = {};
+for (const [field, selectors] of Object.entries(fallbacks)) {
+    result[field] = null;
+    for (const selector of selectors) {
+        const element = document.querySelector(selector);
+        if (element) {
+            result[field] = element.innerText.trim();
+            break;
+        }
+    }
+}
+return result;
+"""
 
 def save_to_jsonl(articles, directory):
     """Append a single article's data to a JSONL file immediately."""
@@ -70,6 +125,12 @@ def save_to_jsonl(articles, directory):
 
 def setup_driver(headless=True):
     """Initialize and return a Selenium WebDriver with realistic settings."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import WebDriverException
+    from webdriver_manager.chrome import ChromeDriverManager
+
     options = Options()
     user_agent = random.choice(USER_AGENTS)
     options.add_argument(f'user-agent={user_agent}')
@@ -102,101 +163,243 @@ def setup_driver(headless=True):
     logging.info("WebDriver initialized successfully.")
     return driver
 
-def human_like_delay(a=2, b=5):
-    """Introduce a random delay to mimic human behavior."""
-    delay = random.uniform(a, b)
-    time.sleep(delay)
+# ========================== Rate Control ========================== #
+
+class AdaptiveRateController:
+    """
+    Paces article loads based on how the site has been responding.
+
+    Healthy pages shrink the delay a step at a time; throttling, captchas and
+    empty bodies multiply it. Time already spent loading and parsing a page
+    counts towards the delay, so a slow page is not followed by a full sleep.
+    """
+
+    def __init__(self, initial_delay=INITIAL_DELAY, min_delay=MIN_DELAY, max_delay=MAX_DELAY,
+                 decrease_step=0.5, backoff_factor=2.0, jitter=0.3):
+        self.delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.decrease_step = decrease_step
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self._last_request = None
+
+    def wait(self):
+        """Sleep until the current delay has elapsed since the previous page load."""
+        if self._last_request is not None:
+            target = self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            remaining = target - (time.monotonic() - self._last_request)
+            if remaining > 0:
+                time.sleep(remaining)
+        self._last_request = time.monotonic()
+
+    def record(self, outcome):
+        """
+        Adjust the delay after a page load.
+
+        Args:
+            outcome (str): 'ok', 'throttled', 'captcha', 'empty' or 'error'.
+        """
+        if outcome == 'ok':
+            self.delay = max(self.min_delay, self.delay - self.decrease_step)
+        else:
+            self.delay = min(self.max_delay, self.delay * self.backoff_factor)
+            logging.warning(f"Page outcome '{outcome}', backing off to {self.delay:.2f}s between articles.")
+
+@timed()
+def wait_for_article(driver, timeout=PAGE_LOAD_TIMEOUT):
+    """Block until an article body with text is present. Returns False on timeout."""
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+
+    selectors = ', '.join(READY_SELECTORS)
+    try:
+        WebDriverWait(driver, timeout).until(lambda d: d.execute_script(BODY_READY_SCRIPT, selectors))
+        return True
+    except TimeoutException:
+        logging.warning(f"Timed out after {timeout}s waiting for article content.")
+        return False
+
+def classify_page(driver, article_data):
+    """Classify a loaded article page as 'ok', 'throttled', 'captcha' or 'empty'."""
+    from selenium.common.exceptions import WebDriverException
+
+    # Article headlines end up in the page title, so only look for block
+    # markers when the page did not render an article body.
+    if article_data.get('body'):
+        return 'ok'
+
+    try:
+        page_title = (driver.title or '').lower()
+    except WebDriverException:
+        page_title = ''
 
-def fetch_article_data(driver, url):
+    if any(marker in page_title for marker in THROTTLE_MARKERS):
+        return 'throttled'
+    if any(marker in page_title for marker in CAPTCHA_MARKERS):
+        return 'captcha'
+    return 'empty'
+
+@timed()
+def extract_article_fields(driver, mode=None, fallbacks=None):
+    """
+    Extract title, date and body from the loaded page.
+
+    Args:
+        driver: Selenium WebDriver with the article loaded.
+        mode (str, optional): 'script', 'page_source' or 'elements'. Defaults to EXTRACTION_MODE.
+        fallbacks (dict, optional): {field: [selector, ...]}. Defaults to SELECTOR_FALLBACKS.
+
+    Returns:
+        dict: Field name to stripped text, or None when no selector matched.
+    """
+    mode = mode or EXTRACTION_MODE
+    fallbacks = fallbacks or SELECTOR_FALLBACKS
+
+    if mode == 'script':
+        return driver.execute_script(EXTRACT_FIELDS_SCRIPT, fallbacks)
+
+    fields = {}
+    if mode == 'page_source':
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        for field, selectors in fallbacks.items():
+            fields[field] = None
+            for selector in selectors:
+                element = soup.select_one(selector)
+                if element is not None:
+                    fields[field] = element.get_text(separator='\n', strip=True)
+                    break
+        return fields
+
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import NoSuchElementException
+    for field, selectors in fallbacks.items():
+        fields[field] = None
+        for selector in selectors:
+            try:
+                fields[field] = driver.find_element(By.CSS_SELECTOR, selector).text.strip()
+                break
+            except NoSuchElementException:
+                continue
+    return fields
+
+@timed()
+def fetch_article_data(driver, url, rate_controller=None, latencies=None):
     """Fetch the title, date, and body of an article given its URL."""
+    from selenium.common.exceptions import WebDriverException
+
     article_data = {}
+    if rate_controller is not None:
+        rate_controller.wait()
+
     try:
         driver.get(url)
         logging.info(f"Navigated to URL: {url}")
     except Exception as e:
         logging.error(f"Failed to load URL {url}: {e}")
+        if rate_controller is not None:
+            rate_controller.record('error')
         return None
 
-    human_like_delay(2, 4)  # Wait for the page to load
+    wait_for_article(driver)  # Wait for the page to load
 
-    # Extract title
-    try:
-        try:
-            title_element = driver.find_element(By.CSS_SELECTOR, '.jupiter22-c-hero-article__ > h1')
-            title = title_element.text.strip()
-            article_data['title'] = title
-            logging.info(f"Extracted title: {title}")
-        except:
-            try:
-                title_element = driver.find_element(By.CSS_SELECTOR, 'h1 > span')
-                title = title_element.text.strip()
-                article_data['title'] = title
-                logging.info(f"Extracted title: {title}")
-            except:
-                pass
-    except (NoSuchElementException, TimeoutException):
-        logging.warning(f"Title not found for URL: {url}")
-        article_data['title'] = None
-
-    # Extract date
-    try:
-        try:
-            date_element = driver.find_element(By.CSS_SELECTOR, 'div.jupiter22-c-author-byline > p.jupiter22-c-author-byline__timestamp')
-            date_text = date_element.text.strip()
-            article_data['date'] = date_text
-            logging.info(f"Extracted date: {date_text}")
-        except:
-            try:
-                date_element = driver.find_element(By.CSS_SELECTOR, 'div.article-header__metadata > div.timestamp > time')
-                date_text = date_element.text.strip()
-                article_data['date'] = date_text
-                logging.info(f"Extracted date: {date_text}")
-            except:
-                pass
-    except NoSuchElementException:
-        logging.warning(f"Date not found for URL: {url}")
-        article_data['date'] = None
-
-    # Extract body
+    started = time.perf_counter()
     try:
-        body_element = driver.find_element(By.CSS_SELECTOR, '.body__content')
-        body_text = body_element.text.strip()
-        article_data['body'] = body_text
-        logging.info(f"Extracted body for URL: {url}")
-    except NoSuchElementException:
+        fields = extract_article_fields(driver)
+    except WebDriverException as e:
+        logging.error(f"Failed to extract fields from URL {url}: {e}")
+        fields = {}
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if latencies is not None:
+        latencies.append(elapsed_ms)
+    logging.info(f"Extracted fields in {elapsed_ms:.1f} ms ({EXTRACTION_MODE}) for URL: {url}")
+
+    for field in ('title', 'date'):
+        if fields.get(field) is not None:
+            article_data[field] = fields[field]
+        else:
+            logging.warning(f"{field.capitalize()} not found for URL: {url}")
+
+    article_data['body'] = fields.get('body')
+    if article_data['body'] is None:
         logging.warning(f"Body content not found for URL: {url}")
-        article_data['body'] = None
 
     article_data['url'] = url  # Include the URL in the data
+
+    outcome = classify_page(driver, article_data)
+    count('articles', outcome=outcome, source='nasdaq')
+    if rate_controller is not None:
+        rate_controller.record(outcome)
+    if outcome in ('throttled', 'captcha'):
+        # Leave the URL out of the results so the next run retries it
+        logging.warning(f"Blocked ({outcome}) on URL: {url}")
+        return None
+
     return article_data
 
 # ========================== Main Scraping Logic ========================== #
 
-def scrape_nasdaq_articles(urls):
+@timed()
+def scrape_nasdaq_articles(urls, browser=None):
+    """
+    Scrape each article URL. When a BrowserManager is given its warm driver is
+    reused (and left open); otherwise a driver is started and closed here.
+
+    The articles scraped before an error (including a failed driver restart)
+    are still saved and returned, so a run never loses its results.
+    """
+    from selenium.common.exceptions import WebDriverException
+
     # Initialize Selenium WebDriver
     try:
-        driver = setup_driver(headless=HEADLESS)
+        driver = browser.get_driver() if browser else setup_driver(headless=HEADLESS)
     except WebDriverException:
         logging.critical("Failed to initialize WebDriver. Exiting script.")
-        return
+        return []
+
+    rate_controller = AdaptiveRateController()
+    latencies = []
+    archive = open_archive('nasdaq')
 
+    articles = []
     try:
-        articles = []
         for idx, url in enumerate(urls, start=1):
             logging.info(f"Processing URL {idx}/{len(urls)}: {url}")
             print(f"Processing URL {idx}/{len(urls)}: {url}")
-            article = fetch_article_data(driver, url)
-            articles.append(article)
-
-            # Introduce a short delay between processing URLs
-            human_like_delay(3, 8)
-
-        save_to_jsonl(articles, NASDAQ_DATA_DIR)
-
-        return articles
+            if browser:
+                try:
+                    # May restart Chrome at the page or memory cap
+                    driver = browser.get_driver()
+                except Exception as e:
+                    logging.critical(f"Failed to restart WebDriver; stopping after {idx - 1} URLs: {e}")
+                    break
+            article = fetch_article_data(driver, url, rate_controller, latencies)
+            # Blocked pages return None and are retried on the next run
+            if article is not None:
+                articles.append(article)
+                if archive is not None:
+                    archive.write([article])
+            if browser:
+                browser.record_page()
     except Exception as e:
         logging.critical(f"An unexpected error occurred during scraping: {e}")
     finally:
-        driver.quit()
-        logging.info("WebDriver has been closed.")
+        if archive is not None:
+            archive.close()
+        if not browser:
+            driver.quit()
+            logging.info("WebDriver has been closed.")
+
+    if latencies:
+        latencies.sort()
+        logging.info(
+            f"Extraction latency over {len(latencies)} articles: "
+            f"mean {sum(latencies) / len(latencies):.1f} ms, "
+            f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:.1f} ms, "
+            f"max {latencies[-1]:.1f} ms"
+        )
+
+    save_to_jsonl(articles, NASDAQ_DATA_DIR)
+    return articles
 
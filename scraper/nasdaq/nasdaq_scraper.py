@@ -4,59 +4,44 @@ import time
 import random
 import logging
 import hashlib
+import sys
 from datetime import datetime
-import pytz
-import schedule
-
-# MySQL Connector and Error Handling
-import mysql.connector
-from mysql.connector import Error
-
-# Environment variable management
-from dotenv import load_dotenv
-
-# Web scraping with Selenium
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import (
-    NoSuchElementException,
-    ElementClickInterceptedException,
-    TimeoutException,
-    WebDriverException,
-    StaleElementReferenceException
-)
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-
-# ChromeDriver management
-from webdriver_manager.chrome import ChromeDriverManager
-
-# BeautifulSoup for HTML parsing
-from bs4 import BeautifulSoup
+
+# pytz, mysql.connector and Selenium are imported by the functions that use
+# them, so importing this module stays cheap and side-effect free
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 # Custom modules for Nasdaq scraping
-from nasdaq_url_getter_for_scraping import *
-from nasdaq_news_getter_for_scraping import *
+from scraper.nasdaq.nasdaq_url_getter_for_scraping import *
+from scraper.nasdaq.nasdaq_news_getter_for_scraping import *
+from scraper.nasdaq.nasdaq_browser_manager import BrowserManager
+from scraper.common.content_hash import upsert_changed
+from scraper.common.tickers import replace_article_tickers
+from scraper.common.ticker_extraction import extract_ticker_rows
+from scraper.common.near_dup import index_documents
+from scraper.common.search_index import index_articles, tickers_by_article
+from scraper.common.streaming import stream_column
+from scraper.common.instrumentation import timed, span, instrumented_run
+from scraper.common.runtime import load_environment, configure_logging, run_daily
 
 
 table_name = 'nasdaq_db'
 
+# Warm Chrome session shared by the URL and article phases across scheduled runs
+browser = None
 
-load_dotenv()
+LOG_FILE = 'nasdaq_scraper.log'
 
-# Configure logging
-logging.basicConfig(
-    filename='nasdaq_scraper.log',
-    filemode='a',
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+# Daily run times, every two hours at :40
+SCHEDULE = [f"{hour:02d}:40" for hour in range(0, 24, 2)]
 
 
 # Database connection
 def create_connection():
+    import mysql.connector
+    from mysql.connector import Error
+
     try:
         connection = mysql.connector.connect(
             host=os.getenv('DB_HOST'),
@@ -71,27 +56,29 @@ def create_connection():
         print(f"Error: {e}")
         return None
 
-# Function to check if data exists in the table
+# Set of the URLs already stored, streamed from the server in batches
+@timed()
 def get_urls(connection):
-    check_query = f"SELECT url FROM {table_name};"  # Modify the query as needed
-    cursor = connection.cursor(dictionary=True)  # dictionary=True to return rows as dicts
+    from mysql.connector import Error
 
-    try:
-        cursor.execute(check_query)
-        results = cursor.fetchall()
+    check_query = f"SELECT url FROM {table_name};"
 
-        if results:
-            print(f"Data found in '{table_name}':")
-            urls = [x['url'] for x in results]
-            return urls
+    try:
+        urls = set(stream_column(connection, check_query))
+        if urls:
+            print(f"Found {len(urls)} URLs in '{table_name}'.")
         else:
             print(f"No data found in '{table_name}'.")
-            return None
+        return urls
     except Error as e:
         print(f"Error while checking data: {e}")
+        return set()
 
 # Function to convert date string to EDT datetime
+@timed()
 def convert_to_edt_datetime(date_str):
+    import pytz
+
     # Define possible date formats
     formats = [
         '%B %d, %Y — %I:%M %p %Z',  # "October 04, 2024 — 10:50 am EDT"
@@ -140,49 +127,76 @@ def generate_id_from_url(url):
     return unique_id
 
 
+# Column values for one scraped article, in nasdaq_db column order
+def nasdaq_row_values(row):
+    return (
+        generate_id_from_url(row.get('url','')),
+        row.get('title'),
+        convert_to_edt_datetime(row.get('date','')),
+        row.get('body'),
+        row.get('url'),
+        2  # source_id for Nasdaq is 2
+    )
+
+
 # Insert Nasdaq data into the table
+@timed()
 def insert_data(connection, data):
+    from mysql.connector import Error
+
     insert_query = """
-    INSERT INTO nasdaq_db (id, title, datetime, body, url, source_id)
-    VALUES (%s, %s, %s, %s, %s, %s)
+    INSERT INTO nasdaq_db (id, title, datetime, body, url, source_id, content_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
     ON DUPLICATE KEY UPDATE
         title=VALUES(title), datetime=VALUES(datetime), body=VALUES(body),
-        url=VALUES(url), source_id=VALUES(source_id);
+        url=VALUES(url), source_id=VALUES(source_id), content_hash=VALUES(content_hash);
     """
-    cursor = connection.cursor()
-
-    # Insert the data with source_id = 2 for Nasdaq
-    for row in data:
-        if row is None:
-            continue
-        cursor.execute(insert_query, (
-            generate_id_from_url(row.get('url','')),
-            row.get('title'),
-            convert_to_edt_datetime(row.get('date','')),
-            row.get('body'),
-            row.get('url'),
-            2  # source_id for Nasdaq is 2
-        ))
-    connection.commit()
+    rows = [nasdaq_row_values(row) for row in data if row is not None]
+
+    # Rows whose content hash is unchanged are skipped
+    stats = upsert_changed(connection, 'nasdaq_db', insert_query, rows)
+
+    # Tickers extracted from the title and text of the rows that were written
+    written = [row for row in rows if str(row[0]) in stats['written_ids']]
+    tickers = []
+    try:
+        tickers = extract_ticker_rows(connection, 2, [(row[0], row[2], f"{row[1] or ''}\n{row[3] or ''}") for row in written])
+        replace_article_tickers(connection, 2, [row[0] for row in written], tickers)
+    except Error as e:
+        print(f"Error writing article_ticker rows: {e}")
+
+    # Full-text index of the written articles (title, body, tickers)
+    symbols = tickers_by_article(tickers)
+    index_articles([(2, row[0], row[2], row[1], row[3], symbols.get(str(row[0]))) for row in written])
+
+    # Cluster ids in the cross-source near-duplicate index (id, body)
+    index_documents([(2, row[0], row[3]) for row in rows])
+    return stats
 
 
 # Main function to run the process
+@instrumented_run('nasdaq')
 def main():
+    global browser
+    if browser is None:
+        browser = BrowserManager(headless=HEADLESS)
+
     # Get URL from db
     connection = create_connection()
 
-    urls = []
+    urls = set()
     if connection:
         urls = get_urls(connection)
         connection.close()
         print("MySQL connection closed.")
 
     # Get URL from nasdaq
-    scraped_urls = scrape_nasdaq_urls()
+    with span('scrape_nasdaq_urls'):
+        scraped_urls = scrape_nasdaq_urls(browser)
     new_urls = [url for url in scraped_urls if url not in urls]
 
     # Scrape new urls
-    articles = scrape_nasdaq_articles(new_urls)
+    articles = scrape_nasdaq_articles(new_urls, browser)
 
     # Upload data to db
     connection = create_connection()
@@ -193,18 +207,12 @@ def main():
         connection.close()
         print("MySQL connection closed.")
 
-# Schedule the function to run at specific times
-for hour in range(0, 24, 2):
-    time_str = f"{hour:02d}:40"
-    schedule.every().day.at(time_str).do(main)
-
 
 if __name__ == '__main__':
-    main()
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
-
-
-
-
+    load_environment()
+    configure_logging(LOG_FILE)
+    try:
+        run_daily(main, SCHEDULE, run_now=True)
+    finally:
+        if browser is not None:
+            browser.quit()
@@ -18,6 +18,10 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 import logging
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scraper.common.runtime import configure_logging
 
 # ========================== Configuration ========================== #
 
@@ -53,16 +57,6 @@ USER_AGENTS = [
     # Add more User-Agent strings as needed
 ]
 
-# ========================== Logging Configuration ========================== #
-
-# Configure logging
-logging.basicConfig(
-    filename='nasdaq_scraper.log',
-    filemode='a',
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
-
 # ========================== Helper Functions ========================== #
 
 def get_json_files(directory):
@@ -407,4 +401,5 @@ def main():
         print("No new URLs found.")
 
 if __name__ == "__main__":
+    configure_logging('nasdaq_scraper.log')
     main()
@@ -3,21 +3,14 @@ import json
 import time
 import random
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import (
-    NoSuchElementException,
-    ElementClickInterceptedException,
-    TimeoutException,
-    WebDriverException,
-    StaleElementReferenceException
-)
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import logging
+import sys
+
+# Selenium and webdriver_manager are imported by the functions that use them,
+# so importing this module stays cheap
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scraper.common.runtime import DATA_DIR
 
 # ========================== Configuration ========================== #
 
@@ -29,7 +22,7 @@ BASE_MAIN_LINKS = [
 
 MAX_PAGES = 5  # Maximum number of pages to iterate through per main link
 
-NASDAQ_DATA_DIR = '../../data/nasdaq_data/urls'
+NASDAQ_DATA_DIR = os.path.join(DATA_DIR, 'nasdaq_data', 'urls')
 HEADLESS = True  # Set to True to run in headless mode
 
 # List of realistic User-Agent strings for rotation
@@ -52,16 +45,6 @@ USER_AGENTS = [
     # Add more User-Agent strings as needed
 ]
 
-# ========================== Logging Configuration ========================== #
-
-# Configure logging
-logging.basicConfig(
-    filename='nasdaq_scraper.log',
-    filemode='a',
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
-
 # ========================== Helper Functions ========================== #
 
 def save_urls(new_urls, directory):
@@ -77,6 +60,12 @@ def save_urls(new_urls, directory):
 
 def setup_driver(headless=True):
     """Initialize and return a Selenium WebDriver with realistic settings."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import WebDriverException
+    from webdriver_manager.chrome import ChromeDriverManager
+
     options = Options()
 
     # Randomly select a User-Agent
@@ -120,6 +109,9 @@ def human_like_delay(a=2, b=5):
 
 def scroll_to_pagination(driver):
     """Scroll the page in small increments to mimic human scrolling."""
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import NoSuchElementException
+
     scroll_height = driver.execute_script("return document.body.scrollHeight")
     current_position = 0
     scroll_increment = 300  # Pixels to scroll each time
@@ -153,6 +145,8 @@ def scroll_to_pagination(driver):
 
 def close_popups(driver):
     """Close any pop-up dialogs if present."""
+    from selenium.webdriver.common.by import By
+
     try:
         # Example: Close cookie consent pop-up
         consent_buttons = driver.find_elements(By.XPATH,
@@ -167,6 +161,9 @@ def close_popups(driver):
 
 def fetch_urls_from_page(driver):
     """Extract URLs from the current page."""
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import TimeoutException
+
     urls = set()
     try:
         # Wait until the article links are present
@@ -196,6 +193,11 @@ def select_rows_per_page(driver):
     """
     Interact with the pagination dropdown to select 100 articles per page.
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
     try:
         # Wait for the dropdown to be present
         dropdown = WebDriverWait(driver, 10).until(
@@ -266,6 +268,15 @@ def click_next_page(page, driver):
     Click the 'Next' button to navigate to the next page.
     Returns True if navigation was successful, False otherwise.
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import (
+        NoSuchElementException,
+        ElementClickInterceptedException,
+        TimeoutException
+    )
+
     try:
         # Scroll to the dropdown again to confirm
         try:
@@ -303,7 +314,14 @@ def click_next_page(page, driver):
 
 # ========================== Main Scraping Logic ========================== #
 
-def scrape_nasdaq_urls():
+def scrape_nasdaq_urls(browser=None):
+    """
+    Collect article URLs from the Nasdaq listing pages. When a BrowserManager is
+    given its warm driver is reused (and left open); otherwise a driver is
+    started and closed here.
+    """
+    from selenium.common.exceptions import WebDriverException
+
     # Ensure the data directory exists
     os.makedirs(NASDAQ_DATA_DIR, exist_ok=True)
 
@@ -316,7 +334,7 @@ def scrape_nasdaq_urls():
 
     # Setup Selenium WebDriver
     try:
-        driver = setup_driver(headless=HEADLESS)
+        driver = browser.get_driver() if browser else setup_driver(headless=HEADLESS)
     except WebDriverException:
         logging.critical("Failed to initialize WebDriver. Exiting script.")
         return
@@ -326,6 +344,10 @@ def scrape_nasdaq_urls():
             # print(f"\nProcessing main link: {base_main_link}")
             logging.info(f"Processing main link: {base_main_link}")
 
+            # Health-check (and possibly recycle) the shared driver between listings
+            if browser:
+                driver = browser.get_driver()
+
             try:
                 # Load the main link
                 driver.get(base_main_link)
@@ -361,6 +383,8 @@ def scrape_nasdaq_urls():
             urls = fetch_urls_from_page(driver)
             logging.info(f"Found {len(urls)} URLs on page 1 of {base_main_link}.")
             new_urls.update(url for url in urls)
+            if browser:
+                browser.record_page()
 
             # Iterate through the next pages (2 to MAX_PAGES)
             for current_page in range(2, MAX_PAGES + 1):
@@ -376,15 +400,18 @@ def scrape_nasdaq_urls():
                 urls = fetch_urls_from_page(driver)
                 logging.info(f"Found {len(urls)} URLs on page {current_page} of {base_main_link}.")
                 new_urls.update(url for url in urls)
+                if browser:
+                    browser.record_page()
 
     except Exception as e:
         logging.critical(f"An unexpected error occurred: {e}")
         print(f"An unexpected error occurred: {e}")
 
     finally:
-        driver.quit()
-        logging.info("WebDriver has been closed.")
-        print("WebDriver has been closed.")
+        if not browser:
+            driver.quit()
+            logging.info("WebDriver has been closed.")
+            print("WebDriver has been closed.")
 
     # Save the new URLs if any were found
     if new_urls:
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from scraper.common.rate_limiter import limiter_for
+from scraper.common.instrumentation import span, count, metrics
+
+# ----------------------------
+# Configuration and Parameters
+# ----------------------------
+
+# Reddit serves at most this many items of any listing, however far back it is paged
+LISTING_CAP = 1000
+
+# Shards fetched at once, each through its own PRAW instance (PRAW is not
+# thread-safe); every instance shares the 'reddit' rate limiter, which keeps
+# the whole process inside the OAuth budget of its client id.
+FETCH_WORKERS = 4
+
+# Posts a shard may expect per run before a subreddit is moved to another
+# shard; half the listing cap leaves room for bursts between runs.
+SHARD_CAPACITY = LISTING_CAP // 2
+
+# Posts younger than this are fetched again on the next run, so their score
+# and comment counts keep updating; older ones are behind the shard's cursor.
+OVERLAP_SECONDS = 6 * 3600
+
+# Weight of the latest run in the smoothed posts/hour of a subreddit
+RATE_SMOOTHING = 0.5
+
+# Shortest window a rate is computed over, so a handful of posts seconds
+# apart does not read as a flood
+MIN_RATE_WINDOW = 600
+
+
+# ----------------------------
+# Shard State
+# ----------------------------
+
+def shard_key(subreddits):
+    return '+'.join(sorted(subreddits, key=str.lower))
+
+
+def load_state(path):
+    """
+    Returns the fetch state: smoothed posts/hour and newest post time per
+    subreddit, and the cursor (newest post time) per shard.
+    """
+    if not path or not os.path.exists(path):
+        return {'subreddits': {}, 'shards': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def plan_shards(subreddits, state, interval_seconds, capacity=None):
+    """
+    Groups subreddits so each group's expected posts per run (its smoothed
+    rate over the run interval plus the overlap) fits in `capacity`, busiest
+    first (first-fit decreasing). A subreddit without an observed rate, or one
+    that alone exceeds the capacity, gets a shard of its own.
+    """
+    capacity = capacity or SHARD_CAPACITY
+    hours = (interval_seconds + OVERLAP_SECONDS) / 3600
+    known = state['subreddits']
+
+    shards = []
+    unknown = [name for name in subreddits if known.get(name, {}).get('rate') is None]
+    expected = sorted(((known[name]['rate'] * hours, name) for name in subreddits if name not in unknown),
+                      reverse=True)
+    loads = []
+    for posts, name in expected:
+        for index, load in enumerate(loads):
+            if load + posts <= capacity:
+                shards[index].append(name)
+                loads[index] += posts
+                break
+        else:
+            shards.append([name])
+            loads.append(posts)
+    return shards + [[name] for name in unknown]
+
+
+def shard_cursor(shard, state):
+    """Newest post time the shard has seen; a regrouped shard falls back to its least advanced member."""
+    cursor = state['shards'].get(shard_key(shard), {}).get('cursor')
+    if cursor is not None:
+        return cursor
+    newest = [state['subreddits'].get(name, {}).get('newest') for name in shard]
+    return None if None in newest else min(newest)
+
+
+# ----------------------------
+# Rate-Limited PRAW Session
+# ----------------------------
+
+def limited_session(api='reddit'):
+    """
+    requests.Session that sends every request through the API's shared
+    limiter. PRAW keeps its own retry and token handling.
+    """
+    import requests
+
+    limiter = limiter_for(api)
+
+    class LimitedSession(requests.Session):
+        def request(self, method, url, *args, **kwargs):
+            with span('rate_limit_wait', api=api):
+                limiter.acquire()
+            with span('http_request', api=api):
+                response = super().request(method, url, *args, **kwargs)
+            count('http_requests', api=api, status=response.status_code)
+            limiter.update(response)
+            return response
+
+    return LimitedSession()
+
+
+# ----------------------------
+# Sharded Fetch
+# ----------------------------
+
+def fetch_shard(reddit, shard, limit, cursor):
+    """
+    Newest submissions of one shard, stopping OVERLAP_SECONDS before its
+    cursor or at `limit`.
+
+    Returns:
+        tuple: (submissions, complete, seconds) where complete means the
+        listing reached the cursor or its end rather than the limit.
+    """
+    stop = cursor - OVERLAP_SECONDS if cursor is not None else None
+    limit = min(limit or LISTING_CAP, LISTING_CAP)
+    started = time.perf_counter()
+
+    submissions = []
+    complete = True
+    with span('reddit_shard', shard=shard_key(shard)):
+        for submission in reddit.subreddit('+'.join(shard)).new(limit=limit):
+            if stop is not None and submission.created_utc < stop:
+                break
+            submissions.append(submission)
+        else:
+            # Stopped by the limit (or the end of the listing) before the cursor
+            complete = len(submissions) < limit
+    return submissions, complete, time.perf_counter() - started
+
+
+def update_subreddit(state, name, created, window_start, now):
+    """Folds one run's posts of a subreddit into its smoothed rate and newest post time."""
+    entry = state['subreddits'].setdefault(name, {'rate': None, 'newest': None})
+    window = max(now - window_start, MIN_RATE_WINDOW)
+    rate = len(created) * 3600 / window
+    entry['rate'] = rate if entry['rate'] is None else RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * entry['rate']
+    if created:
+        entry['newest'] = max(max(created), entry['newest'] or 0)
+
+
+def report_subreddit(name, created, complete, seconds, seen, oldest, now):
+    """
+    Per-subreddit coverage and latency metrics of one run; `seen` is the
+    newest post time of the subreddit before this run.
+    """
+    count('reddit_submissions', len(created), subreddit=name)
+    metrics.observe('reddit_fetch_latency', seconds, subreddit=name)
+    if seen is None:
+        return
+    fresh = [value for value in created if value > seen]
+    count('reddit_new_submissions', len(fresh), subreddit=name)
+    for value in fresh:
+        # Time from posting to being scraped
+        metrics.observe('reddit_ingest_lag', max(0.0, now - value), subreddit=name)
+    gap = oldest - seen
+    if not complete and gap > 0:
+        count('reddit_coverage_gaps', subreddit=name)
+        count('reddit_coverage_gap_seconds', gap, subreddit=name)
+        logging.warning(f"r/{name}: listing cap reached {gap / 60:.0f} min short of the last run; "
+                        f"posts in between were missed.")
+
+
+def fetch_sharded(connect, subreddits, limit=None, state_path=None, interval_seconds=0, workers=None):
+    """
+    Fetches the newest submissions of every subreddit, grouped into shards
+    by observed post rate so busy subreddits cannot crowd quiet ones out of
+    the listing cap. Shards run `workers` (default FETCH_WORKERS) at a time,
+    each worker with its own Reddit instance from connect(session).
+
+    The state at `state_path` is only read. The caller saves the returned
+    state with save_state() once the submissions are stored, so posts that
+    were fetched but never written are fetched again on the next run.
+
+    Returns:
+        tuple: (submissions, state) with the PRAW submissions, newest first
+        within each shard, and the fetch state advanced past them.
+    """
+    state = load_state(state_path)
+    shards = plan_shards(subreddits, state, interval_seconds)
+    workers = max(1, min(workers or FETCH_WORKERS, len(shards)))
+    logging.info(f"Fetching {len(subreddits)} subreddits in {len(shards)} shards, {workers} at a time.")
+
+    local = threading.local()
+
+    def fetch(shard):
+        cursor = shard_cursor(shard, state)
+        try:
+            if not hasattr(local, 'reddit'):
+                local.reddit = connect(limited_session())
+            return shard, cursor, fetch_shard(local.reddit, shard, limit, cursor)
+        except Exception as e:
+            # The other shards still finish; this one resumes from its cursor next run
+            logging.error(f"Failed to fetch r/{'+'.join(shard)}: {e}")
+            count('reddit_shard_errors', shard=shard_key(shard))
+            return shard, cursor, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(fetch, shards))
+
+    now = time.time()
+    submissions = []
+    shard_state = {}
+    for shard, cursor, result in results:
+        if result is None:
+            shard_state[shard_key(shard)] = {'subreddits': shard, 'cursor': cursor}
+            continue
+        fetched, complete, seconds = result
+        submissions.extend(fetched)
+        oldest = fetched[-1].created_utc if fetched else now
+        # The listing covered everything back to the overlap before the
+        # cursor, or back to its oldest post when it stopped short
+        window_start = cursor - OVERLAP_SECONDS if complete and cursor is not None else oldest
+        # Listings name subreddits in their canonical case
+        by_name = {}
+        for submission in fetched:
+            by_name.setdefault(str(submission.subreddit).lower(), []).append(submission.created_utc)
+        for name in shard:
+            created = by_name.get(name.lower(), [])
+            seen = state['subreddits'].get(name, {}).get('newest')
+            update_subreddit(state, name, created, window_start, now)
+            report_subreddit(name, created, complete, seconds, seen, oldest, now)
+        newest = max((submission.created_utc for submission in fetched), default=cursor)
+        shard_state[shard_key(shard)] = {'subreddits': shard, 'cursor': newest}
+
+    state['shards'] = shard_state
+    return submissions, state
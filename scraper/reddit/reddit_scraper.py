@@ -1,35 +1,37 @@
-import praw
 import json
 import time
 import logging
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-import pytz
-import dropbox
-from dropbox.exceptions import AuthError, ApiError
-from apscheduler.schedulers.background import BackgroundScheduler
-import requests
-from dotenv import load_dotenv
-import mysql.connector
-from mysql.connector import Error
-import schedule
+import sys
 
+# praw, pytz and mysql.connector are imported by the functions that
+# use them, so importing this module stays cheap and side-effect free
 
-# ----------------------------
-# Load Environment Variables
-# ----------------------------
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scraper.common.parquet_archive import open_archive
+from scraper.common.content_hash import upsert_changed
+from scraper.common.tickers import replace_article_tickers
+from scraper.common.ticker_extraction import extract_ticker_rows
+from scraper.common.search_index import index_articles, tickers_by_article
+from scraper.common.instrumentation import timed, count, instrumented_run
+from scraper.common.alerts import alert
+from scraper.reddit.reddit_fetch import fetch_sharded, save_state
+from scraper.common.runtime import load_environment, configure_logging, run_periodically, DATA_DIR
 
-load_dotenv()  # Loads variables from .env
 
-REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
-REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
-REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT')
+# ----------------------------
+# Environment Variables
+# ----------------------------
 
-DROPBOX_ACCESS_TOKEN = os.getenv('DROPBOX_ACCESS_TOKEN')
+# Read when they are used, so .env loaded by the entry point applies
+REDDIT_CLIENT_ID_ENV = 'REDDIT_CLIENT_ID'
+REDDIT_CLIENT_SECRET_ENV = 'REDDIT_CLIENT_SECRET'
+REDDIT_USER_AGENT_ENV = 'REDDIT_USER_AGENT'
 
-TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
-TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+# API endpoints (overridable to point at a stub server)
+REDDIT_URL_ENVS = {'oauth_url': 'REDDIT_OAUTH_URL', 'reddit_url': 'REDDIT_URL'}
 
 # ----------------------------
 # Configuration and Parameters
@@ -58,70 +60,51 @@ SUBREDDITS = [
     'Bogleheads'
 ]
 
-# Output directory (ensure this directory exists or will be created)
-OUTPUT_DIR = '../../data/reddit_data'
-
-
-# Logging configuration
-LOG_FILE = 'reddit_scraper.log'
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
+# Newest submissions requested per shard and run (listings stop at 1000)
+SUBMISSION_LIMIT = 1000
 
-# ----------------------------
-# Telegram Notification Function
-# ----------------------------
+# Minutes between runs
+RUN_INTERVAL_MINUTES = 35
 
-def send_telegram_message(message):
-    """
-    Sends a message to the specified Telegram chat using the bot.
-    """
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        'chat_id': TELEGRAM_CHAT_ID,
-        'text': message,
-        'parse_mode': 'Markdown'
-    }
-    try:
-        response = requests.post(url, data=payload)
-        if response.status_code == 200:
-            logging.info("Telegram message sent successfully.")
-        else:
-            logging.error(
-                f"Failed to send Telegram message. Status Code: {response.status_code}, Response: {response.text}")
-    except Exception as e:
-        logging.error(f"Exception occurred while sending Telegram message: {e}")
+# Output directory (ensure this directory exists or will be created)
+OUTPUT_DIR = os.path.join(DATA_DIR, 'reddit_data')
 
+# Post rates and cursors of the subreddit shards, kept in OUTPUT_DIR
+SHARD_STATE_FILE = 'reddit_shards.json'
 
+# Log file, configured by the entry point
+LOG_FILE = 'reddit_scraper.log'
 
 
 # ----------------------------
 # Initialize Reddit Instance
 # ----------------------------
 
-def initialize_reddit(client_id, client_secret, user_agent):
+def initialize_reddit(client_id, client_secret, user_agent, session=None):
     """
-    Initializes and returns a Reddit instance using PRAW.
+    Initializes and returns a Reddit instance using PRAW, sending its requests
+    through `session` when given.
     Sends Telegram message upon authentication failure.
     """
+    import praw
+
+    urls = {name: os.getenv(env) for name, env in REDDIT_URL_ENVS.items() if os.getenv(env)}
     try:
         reddit = praw.Reddit(
             client_id=client_id,
             client_secret=client_secret,
-            user_agent=user_agent
+            user_agent=user_agent,
+            requestor_kwargs={'session': session} if session is not None else None,
+            **urls
         )
         # Test the connection
         reddit.user.me()
         logging.info("Successfully authenticated with Reddit.")
-        # send_telegram_message("*Info:* Successfully authenticated with Reddit.")
+        # alert("*Info:* Successfully authenticated with Reddit.")
         return reddit
     except Exception as e:
         logging.error(f"Failed to initialize Reddit instance: {e}")
-        send_telegram_message(f"*Error:* Failed to authenticate with Reddit.\n`{e}`")
+        alert(f"*Error:* Failed to authenticate with Reddit.\n`{e}`")
         raise
 
 
@@ -160,30 +143,35 @@ def process_submission(submission):
 # Fetch Historical Submissions
 # ----------------------------
 
-def fetch_historical_submissions(reddit, subreddits, limit=1000):
+@timed()
+def fetch_historical_submissions(connect, subreddits, limit=1000, state_path=None):
     """
-    Fetches historical submissions from the list of subreddits and saves new ones.
+    Fetches the newest submissions of the subreddits, grouped into shards by
+    post rate (see reddit_fetch), with connect(session) creating the Reddit
+    instance of each fetch worker.
+
+    Returns:
+        tuple: (submissions, state), where state is the shard state to save
+        once the submissions are stored, or None when the fetch failed.
     """
     try:
-        # Combine subreddit names into a single string separated by '+'
-        subreddit_str = '+'.join(subreddits)
-        subreddit = reddit.subreddit(subreddit_str)
-        logging.info(f"Fetching up to {limit} historical submissions from r/{subreddit_str}.")
-        # send_telegram_message(f"*Info:* Fetching up to {limit} historical submissions from r/{subreddit_str}.")
+        logging.info(f"Fetching up to {limit} submissions per shard from r/{'+'.join(subreddits)}.")
+        # alert(f"*Info:* Fetching up to {limit} historical submissions.")
 
-        submissions = []
-        for submission in subreddit.new(limit=limit):
-            submissions.append(process_submission(submission))
+        fetched, state = fetch_sharded(connect, subreddits, limit, state_path=state_path,
+                                       interval_seconds=RUN_INTERVAL_MINUTES * 60)
+        submissions = [process_submission(submission) for submission in fetched]
+        count('submissions', len(submissions), source='reddit')
 
-        logging.info("Finished fetching historical submissions.")
-        print(f"Finished fetching historical submissions. Total length: {len(submissions)}")
-        # send_telegram_message("*Info:* Finished fetching historical submissions.")
+        logging.info(f"Finished fetching historical submissions. Total length: {len(submissions)}")
+        # alert("*Info:* Finished fetching historical submissions.")
 
-        return submissions
+        return submissions, state
 
     except Exception as e:
         logging.error(f"An error occurred while fetching historical submissions: {e}")
-        # send_telegram_message(f"*Error:* An error occurred while fetching historical submissions.\n`{e}`")
+        alert(f"*Error:* An error occurred while fetching historical submissions.\n`{e}`")
+        return [], None
 
 # ----------------------------
 # SQL Upload
@@ -191,9 +179,13 @@ def fetch_historical_submissions(reddit, subreddits, limit=1000):
 
 # Database connection
 def create_connection():
+    import mysql.connector
+    from mysql.connector import Error
+
     try:
         connection = mysql.connector.connect(
             host=os.getenv('DB_HOST'),
+            port=int(os.getenv('DB_PORT', 3306)),
             user=os.getenv('DB_USER'),
             password=os.getenv('DB_PASSWORD'),
             database=os.getenv('DB_DATABASE')
@@ -206,7 +198,10 @@ def create_connection():
         return None
 
 # Convert the 'created_utc' field to Eastern Time DATETIME format for SQL
+@timed()
 def convert_to_eastern_datetime(utc_string):
+    import pytz
+
     # Convert from the format '2019-07-01T20:54:49Z' to a Python datetime object
     utc_datetime = datetime.strptime(utc_string, '%Y-%m-%dT%H:%M:%SZ')
 
@@ -219,52 +214,85 @@ def convert_to_eastern_datetime(utc_string):
     # Return as a string in SQL DATETIME format
     return eastern_datetime.strftime('%Y-%m-%d %H:%M:%S')
 
+# Column values for one submission, in reddit_submission column order
+def reddit_row_values(row):
+    return (
+        row['id'],
+        row['subreddit'],
+        convert_to_eastern_datetime(row['created_utc']),
+        row['title'],
+        row['selftext'],
+        row['url'],
+        row['score'],
+        row['num_comments'],
+        row['ups'],
+        row['author'],
+        3  # Reddit submission is source_id 3
+    )
+
 # Insert reddit post data into the SQL table
+@timed()
 def insert_reddit_data(connection, data):
+    from mysql.connector import Error
+
     insert_query = """
-    INSERT INTO reddit_submission (id, subreddit, created_utc, title, selftext, url, score, num_comments, ups, author, source_id)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    INSERT INTO reddit_submission (id, subreddit, created_utc, title, selftext, url, score, num_comments, ups, author, source_id, content_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     ON DUPLICATE KEY UPDATE
         subreddit=VALUES(subreddit), created_utc=VALUES(created_utc), 
         title=VALUES(title), selftext=VALUES(selftext), url=VALUES(url), 
-        score=VALUES(score), num_comments=VALUES(num_comments), ups=VALUES(ups), author=VALUES(author);
+        score=VALUES(score), num_comments=VALUES(num_comments), ups=VALUES(ups), author=VALUES(author),
+        content_hash=VALUES(content_hash);
     """
-    cursor = connection.cursor()
-
-    # Loop through each post and insert it into the database
-    for row in data:
-        cursor.execute(insert_query, (
-            row['id'],
-            row['subreddit'],
-            convert_to_eastern_datetime(row['created_utc']),
-            row['title'],
-            row['selftext'],
-            row['url'],
-            row['score'],
-            row['num_comments'],
-            row['ups'],
-            row['author'],
-            3  # Reddit submission is source_id 3
-        ))
-    connection.commit()
+    rows = [reddit_row_values(row) for row in data]
+
+    # Rows whose content hash is unchanged are skipped
+    stats = upsert_changed(connection, 'reddit_submission', insert_query, rows)
+
+    # Tickers extracted from the title and selftext of the rows that were written
+    written = [row for row in rows if str(row[0]) in stats['written_ids']]
+    tickers = []
+    try:
+        tickers = extract_ticker_rows(connection, 3, [(row[0], row[2], f"{row[3] or ''}\n{row[4] or ''}") for row in written])
+        replace_article_tickers(connection, 3, [row[0] for row in written], tickers)
+    except Error as e:
+        print(f"Error writing article_ticker rows: {e}")
+
+    # Full-text index of the written posts (title, selftext, tickers)
+    symbols = tickers_by_article(tickers)
+    index_articles([(3, row[0], row[2], row[3], row[4], symbols.get(str(row[0]))) for row in written])
+    return stats
 
 
 # ----------------------------
 # Main Execution Flow
 # ----------------------------
 
+@instrumented_run('reddit')
 def main():
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
     # Initialize Reddit
+    credentials = (os.getenv(REDDIT_CLIENT_ID_ENV), os.getenv(REDDIT_CLIENT_SECRET_ENV), os.getenv(REDDIT_USER_AGENT_ENV))
     try:
-        reddit = initialize_reddit(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT)
+        initialize_reddit(*credentials)
     except Exception as e:
         logging.critical(f"Exiting due to Reddit authentication failure: {e}")
-        send_telegram_message("*Critical Error:* Exiting scraper due to Reddit authentication failure.")
+        alert("*Critical Error:* Exiting scraper due to Reddit authentication failure.")
         return
 
     try:
         # Fetch historical submissions
-        submissions = fetch_historical_submissions(reddit, SUBREDDITS, limit=3000) # Set limit=None for all available
+        state_path = os.path.join(OUTPUT_DIR, SHARD_STATE_FILE)
+        submissions, state = fetch_historical_submissions(
+            lambda session: initialize_reddit(*credentials, session=session), SUBREDDITS,
+            limit=SUBMISSION_LIMIT, state_path=state_path
+        )
+
+        archive = open_archive('reddit')
+        if archive is not None and submissions:
+            with archive:
+                archive.write(submissions)
 
         connection = create_connection()
         if connection:
@@ -272,19 +300,26 @@ def main():
 
             # Close the connection
             connection.close()
+
+            # Shard cursors only advance once the posts are stored; after a
+            # failed write the next run fetches them again
+            if state is not None:
+                save_state(state_path, state)
             print(f"Updated Reddit database. {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             # logging.info(f"Updated Reddit database. {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            # send_telegram_message("*Info:* Updated Reddit database.")
+            # alert("*Info:* Updated Reddit database.")
+        else:
+            logging.error("No database connection; shard cursors kept for the next run.")
 
     except KeyboardInterrupt:
         logging.info("Script interrupted by user. Shutting down.")
-        # send_telegram_message("*Info:* Scraper interrupted by user. Shutting down.")
+        # alert("*Info:* Scraper interrupted by user. Shutting down.")
     except Exception as e:
         logging.critical(f"Unexpected error: {e}")
-        # send_telegram_message(f"*Critical Error:* An unexpected error occurred.\n`{e}`")
+        alert(f"*Critical Error:* An unexpected error occurred.\n`{e}`")
 
 
 if __name__ == "__main__":
-    while True:
-        main()
-        time.sleep(35 * 60)
+    load_environment()
+    configure_logging(LOG_FILE)
+    run_periodically(main, RUN_INTERVAL_MINUTES * 60)
@@ -1,20 +1,18 @@
 import json
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 import os
-from seeking_alpha_utils import *
-
-
-load_dotenv()  # Loads variables from .env
-
+from scraper.seeking_alpha.seeking_alpha_utils import *
+from scraper.common.rate_limiter import limiter_for
+from scraper.common.instrumentation import timed
 
+# Concurrent get-details requests; they all share the seeking_alpha rate limiter
+DETAIL_WORKERS = 1
 
 
 # Get article list
 def get_article_list(n=20):
-    url = "https://seeking-alpha.p.rapidapi.com/articles/v2/list"
+    url = seeking_alpha_url("/articles/v2/list")
 
     querystring = {"size": f"{n}", "number": "1", "category": "latest-articles"}
 
@@ -23,16 +21,14 @@ def get_article_list(n=20):
         "x-rapidapi-host": "seeking-alpha.p.rapidapi.com"
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = limiter_for('seeking_alpha').get(url, headers=headers, params=querystring)
 
     return response.json()
 
 
 # Get article body
 def get_article_details(article_id):
-    import requests
-
-    url = "https://seeking-alpha.p.rapidapi.com/articles/get-details"
+    url = seeking_alpha_url("/articles/get-details")
 
     querystring = {"id": f"{article_id}"}
 
@@ -41,7 +37,7 @@ def get_article_details(article_id):
         "x-rapidapi-host": "seeking-alpha.p.rapidapi.com"
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = limiter_for('seeking_alpha').get(url, headers=headers, params=querystring)
 
     return response.json()
 
@@ -74,6 +70,7 @@ def extract_id(data):
 
 
 # Extract article detail
+@timed()
 def extract_article_detail(api_response):
     # Initialize containers for extracted data
     tickers_primary = []
@@ -161,15 +158,23 @@ def extract_article_detail(api_response):
 
 
 # Fetch all articles
-def fetch_all_articles(n=20):
+@timed()
+def fetch_all_articles(n=20, workers=None):
     # Get list
     articles_json = get_article_list(n)
     articles = extract_id(articles_json)
 
+    # Get bodies, `workers` (default DETAIL_WORKERS) requests at a time
+    ids = [article['id'] for article in articles]
+    workers = workers or DETAIL_WORKERS
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            details = list(executor.map(get_article_details, ids))
+    else:
+        details = [get_article_details(article_id) for article_id in ids]
+
     all_articles = []
-    # Get body
-    for article in articles:
-        article_json = get_article_details(article['id'])
+    for article_json in details:
         article_data = extract_article_detail(article_json)
         if article_data['id'] is None:
             continue
@@ -1,15 +1,12 @@
 import os
 import json
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-from dotenv import load_dotenv
-from seeking_alpha_utils import *
-
-load_dotenv()  # Loads variables from .env
+from scraper.seeking_alpha.seeking_alpha_utils import *
+from scraper.common.rate_limiter import limiter_for
+from scraper.common.instrumentation import timed
 
 def get_news(n=20):
-    url = "https://seeking-alpha.p.rapidapi.com/news/v2/list"
+    url = seeking_alpha_url("/news/v2/list")
 
     querystring = {"size": f"{n}", "category": "market-news::all", "number": "1"}
 
@@ -18,12 +15,13 @@ def get_news(n=20):
         "x-rapidapi-host": "seeking-alpha.p.rapidapi.com"
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = limiter_for('seeking_alpha').get(url, headers=headers, params=querystring)
 
     return response.json()
 
 
 
+@timed()
 def extract_news(news_json):
     """
     Extracts useful information from the provided news JSON.
@@ -84,6 +82,7 @@ def extract_news(news_json):
 
 
 # Fetch all articles
+@timed()
 def fetch_all_news(n=20):
     # Get news
     news_json = get_news(n)
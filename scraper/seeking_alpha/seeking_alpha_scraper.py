@@ -1,20 +1,37 @@
-from seeking_alpha_article_fetcher import *
-from seeking_alpha_news_fecther import *
 import time
-import schedule
-from apscheduler.schedulers.blocking import BlockingScheduler
 from datetime import datetime, timedelta
 import random
+import os
+import sys
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scraper.seeking_alpha.seeking_alpha_article_fetcher import *
+from scraper.seeking_alpha.seeking_alpha_news_fecther import *
+from scraper.common.parquet_archive import open_archive
+from scraper.common.instrumentation import instrumented_run
+from scraper.common.runtime import load_environment, run_daily
+
+# Daily run times, every hour at :40
+SCHEDULE = [f"{hour:02d}:40" for hour in range(24)]
+
+# Items requested per run from each list endpoint
+NEWS_COUNT = 30
+ARTICLE_COUNT = 30
+
+@instrumented_run('seeking_alpha')
 def main():
-    news = fetch_all_news(30)
-    articles = fetch_all_articles(30)
+    news = fetch_all_news(NEWS_COUNT)
+    articles = fetch_all_articles(ARTICLE_COUNT)
+
+    archive = open_archive('seeking_alpha')
+    if archive is not None:
+        with archive:
+            archive.write([dict(news_item, source_id=4) for news_item in news])
+            archive.write([dict(article, source_id=5) for article in articles])
 
     connection = create_connection()
-    for news_item in news:
-        insert_seeking_alpha_data(connection, news_item, 4)
-    for article in articles:
-        insert_seeking_alpha_data(connection, article, 5)
+    insert_seeking_alpha_batch(connection, news, 4)
+    insert_seeking_alpha_batch(connection, articles, 5)
 
     connection.close()
     print("MySQL connection closed.")
@@ -24,14 +41,6 @@ def main():
     formatted_time = datetime.now().strftime('%Y-%m-%d %I:%M %p')
     print(f"Uploaded {cnt} articles in seeking alpha db at {formatted_time}. ")
 
-# Schedule the function to run at specific times
-for hour in range(24):
-    time_str = f"{hour:02d}:40"
-    schedule.every().day.at(time_str).do(main)
-
 if __name__ == '__main__':
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
-
-
+    load_environment()
+    run_daily(main, SCHEDULE)
@@ -1,15 +1,29 @@
 import json
-import requests
 import os
-from bs4 import BeautifulSoup
 from datetime import datetime
-from dotenv import load_dotenv
-import mysql.connector
-from mysql.connector import Error
+import sys
 
-load_dotenv()  # Loads variables from .env
+# BeautifulSoup and mysql.connector are imported by the functions that use
+# them, so importing this module stays cheap and side-effect free
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from scraper.common.content_hash import upsert_changed
+from scraper.common.near_dup import index_documents
+from scraper.common.search_index import index_articles, tickers_by_article
+from scraper.common.tickers import ticker_rows, split_joined, replace_article_tickers, ROLE_PRIMARY, ROLE_SECONDARY
+from scraper.common.instrumentation import timed
+
+# RapidAPI endpoint (overridable to point at a stub server)
+SEEKING_ALPHA_BASE_URL_ENV = 'SEEKING_ALPHA_BASE_URL'
+SEEKING_ALPHA_BASE_URL = "https://seeking-alpha.p.rapidapi.com"
+
+
+# Full URL of an API path; the base is read per call so .env loaded by the entry point applies
+def seeking_alpha_url(path):
+    return f"{os.getenv(SEEKING_ALPHA_BASE_URL_ENV, SEEKING_ALPHA_BASE_URL)}{path}"
 
 # Parse datetime
+@timed()
 def parse_datetime(datetime_str):
     if isinstance(datetime_str, str):
         # Parse the ISO 8601 string to a datetime object
@@ -24,6 +38,8 @@ def parse_datetime(datetime_str):
 # Extract text from html source
 def get_text_from_html(element):
     if isinstance(element, str):
+        from bs4 import BeautifulSoup
+
         # Parse the element source using BeautifulSoup
         soup = BeautifulSoup(element, 'html.parser')
 
@@ -37,14 +53,6 @@ def get_text_from_html(element):
     else:
         return element
 
-# ----------------------------
-# Load Environment Variables
-# ----------------------------
-DB_HOST = os.getenv('DB_HOST')
-DB_USER = os.getenv('DB_USER')
-DB_PASSWORD = os.getenv('DB_PASSWORD')
-DB_DATABASE = os.getenv('DB_DATABASE')
-
 # ----------------------------
 # Database Connection
 # ----------------------------
@@ -56,12 +64,16 @@ def create_connection():
     Returns:
         connection (mysql.connector.connection_cext.CMySQLConnection): MySQL connection object
     """
+    import mysql.connector
+    from mysql.connector import Error
+
     try:
         connection = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_DATABASE
+            host=os.getenv('DB_HOST'),
+            port=int(os.getenv('DB_PORT', 3306)),
+            user=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD'),
+            database=os.getenv('DB_DATABASE')
         )
         if connection.is_connected():
             print("Connected to MySQL database")
@@ -82,6 +94,8 @@ def create_table(connection):
     Args:
         connection (mysql.connector.connection_cext.CMySQLConnection): MySQL connection object
     """
+    from mysql.connector import Error
+
 
     create_seeking_alpha_db_table = """
     CREATE TABLE IF NOT EXISTS seeking_alpha_db (
@@ -114,6 +128,7 @@ def create_table(connection):
 # Insert Source Records
 # ----------------------------
 
+@timed()
 def insert_sources(connection):
     """
     Inserts source records into the 'source' table.
@@ -121,6 +136,8 @@ def insert_sources(connection):
     Args:
         connection (mysql.connector.connection_cext.CMySQLConnection): MySQL connection object
     """
+    from mysql.connector import Error
+
     insert_source_query = """
     INSERT INTO sources (source_id, source_name, source_type)
     VALUES (%s, %s, %s)
@@ -145,22 +162,45 @@ def insert_sources(connection):
 
 
 # ----------------------------
-# Insert Seeking Alpha Data
+# Insert Seeking Alpha Batch
 # ----------------------------
 
-def insert_seeking_alpha_data(connection, data, source_id):
+# Column values for one news or article record, in seeking_alpha_db column order
+def seeking_alpha_row_values(item, source_id):
+    return (
+        item.get('id'),
+        item.get('title'),
+        item.get('published_on'),
+        item.get('last_modified'),
+        item.get('summary', None),  # Can be None for news
+        item.get('content'),
+        item.get('url', None),
+        ','.join(item.get('tickers_primary', [])),
+        ','.join(item.get('tickers_secondary', [])),
+        source_id
+    )
+
+
+@timed()
+def insert_seeking_alpha_batch(connection, data, source_id):
     """
-    Inserts a single news or article record into the 'seeking_alpha_db' table.
+    Upserts a batch of news or article records into the 'seeking_alpha_db' table,
+    skipping records whose content hash has not changed.
 
     Args:
         connection (mysql.connector.connection_cext.CMySQLConnection): MySQL connection object
-        data (dict): The news or article data as a dictionary.
+        data (list): The news or article data as dictionaries.
         source_id (int): The source_id linking to the 'source' table.
+
+    Returns:
+        dict: Counts of 'inserted', 'updated' and 'skipped' rows.
     """
+    from mysql.connector import Error
+
     insert_query = """
     INSERT INTO seeking_alpha_db 
-    (id, title, published_on, last_modified, summary, content, url, tickers_primary, tickers_secondary, source_id)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    (id, title, published_on, last_modified, summary, content, url, tickers_primary, tickers_secondary, source_id, content_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     ON DUPLICATE KEY UPDATE
         title=VALUES(title),
         published_on=VALUES(published_on),
@@ -170,38 +210,47 @@ def insert_seeking_alpha_data(connection, data, source_id):
         url=VALUES(url),
         tickers_primary=VALUES(tickers_primary),
         tickers_secondary=VALUES(tickers_secondary),
-        source_id=VALUES(source_id);
+        source_id=VALUES(source_id),
+        content_hash=VALUES(content_hash);
     """
 
-    # Prepare the data for insertion
+    rows = [seeking_alpha_row_values(item, source_id) for item in data if item.get('id') is not None]
+
     try:
-        id_ = data.get('id')
-        title = data.get('title')
-        published_on = data.get('published_on')
-        last_modified = data.get('last_modified')
-        summary = data.get('summary', None)  # Can be None for news
-        content = data.get('content')
-        url = data.get('url', None)
-        tickers_primary = ','.join(data.get('tickers_primary', []))
-        tickers_secondary = ','.join(data.get('tickers_secondary', []))
-
-        cursor = connection.cursor()
-        cursor.execute(insert_query, (
-            id_,
-            title,
-            published_on,
-            last_modified,
-            summary,
-            content,
-            url,
-            tickers_primary,
-            tickers_secondary,
-            source_id
-        ))
-        connection.commit()
+        stats = upsert_changed(connection, 'seeking_alpha_db', insert_query, rows)
     except Error as e:
-        print(f"Error inserting record ID {data.get('id')}: {e}")
-    except Exception as e:
-        print(f"Unexpected error for record ID {data.get('id')}: {e}")
-    finally:
-        cursor.close()
\ No newline at end of file
+        # One bad record fails the whole batch; retry the rows one at a time
+        print(f"Error inserting Seeking Alpha batch (source_id {source_id}): {e}; retrying row by row")
+        connection.rollback()
+        stats = {'inserted': 0, 'updated': 0, 'skipped': 0, 'written_ids': set()}
+        for row in rows:
+            try:
+                row_stats = upsert_changed(connection, 'seeking_alpha_db', insert_query, [row])
+            except Error as e:
+                print(f"Error inserting record ID {row[0]}: {e}")
+                connection.rollback()
+                continue
+            for outcome in ('inserted', 'updated', 'skipped'):
+                stats[outcome] += row_stats[outcome]
+            stats['written_ids'] |= row_stats['written_ids']
+
+    # Normalized ticker rows for the records that were written
+    written = [row for row in rows if str(row[0]) in stats['written_ids']]
+    tickers = []
+    for row in written:
+        tickers += ticker_rows(source_id, row[0], row[2], split_joined(row[7]), ROLE_PRIMARY)
+        tickers += ticker_rows(source_id, row[0], row[2], split_joined(row[8]), ROLE_SECONDARY)
+    try:
+        replace_article_tickers(connection, source_id, [row[0] for row in written], tickers)
+    except Error as e:
+        print(f"Error writing article_ticker rows: {e}")
+
+    # Full-text index of the written records (title, content or summary, tickers)
+    symbols = tickers_by_article(tickers)
+    index_articles([
+        (source_id, row[0], row[2], row[1], row[5] or row[4], symbols.get(str(row[0]))) for row in written
+    ])
+
+    # Cluster ids in the cross-source near-duplicate index (id, content)
+    index_documents([(source_id, row[0], row[5]) for row in rows])
+    return stats
@@ -0,0 +1,26 @@
+"""Runs benchmarks/check_import_time.py under pytest, one test per scraper entry point."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import check_import_time
+
+MODULES = [module for module, _ in check_import_time.MODULES]
+
+# Import times depend on the machine, so the ms budgets only run on request
+TIMED = os.environ.get('IMPORT_TIME_BUDGET') == '1'
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_import_is_side_effect_free(module):
+    # No heavy modules, schedule jobs, log handlers or new files
+    assert check_import_time.check(module, None, repeat=1) == []
+
+
+@pytest.mark.skipif(not TIMED, reason="set IMPORT_TIME_BUDGET=1 to check the import time budgets")
+@pytest.mark.parametrize('module, budget', check_import_time.MODULES, ids=MODULES)
+def test_import_is_within_budget(module, budget):
+    # Best of three imports, as the script does by default
+    assert check_import_time.check(module, budget, repeat=3) == []
@@ -0,0 +1,95 @@
+"""RateLimiter against a local stub server (benchmarks/stub_server.py)."""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+from stub_server import serve, json_response
+from scraper.common.rate_limiter import RateLimiter, QuotaExhausted, MAX_WINDOW_SECONDS
+
+
+def scripted(*responses):
+    """Route handler answering with the given (status, headers) in turn, then repeating the last."""
+    remaining = list(responses)
+
+    def handler(request):
+        status, headers = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        return json_response([{'id': 1}] if status == 200 else {'message': 'Too many requests'}, status, headers)
+
+    return handler
+
+
+def test_429_halves_the_rate_and_waits_for_retry_after():
+    limiter = RateLimiter(rate=4.0, max_rate=10.0, increase=0.0, decrease=0.5, burst=1)
+    with serve({'/news': scripted((429, {'Retry-After': '0.2'}), (200, {}))}) as server:
+        started = time.monotonic()
+        response = limiter.get(f"{server.url}/news")
+        elapsed = time.monotonic() - started
+
+    assert response.status_code == 200
+    assert server.requests['/news'] == 2
+    assert limiter.stats['throttled'] == 1
+    assert limiter.rate == pytest.approx(2.0)
+    assert elapsed >= 0.2
+
+
+def test_success_ramps_the_rate_up_to_max_rate():
+    limiter = RateLimiter(rate=1.0, max_rate=2.0, increase=0.5, burst=5)
+    with serve({'/news': scripted((200, {}))}) as server:
+        for _ in range(4):
+            limiter.get(f"{server.url}/news")
+    assert limiter.rate == pytest.approx(2.0)
+
+
+@pytest.mark.parametrize('family', ['x-ratelimit-requests', 'x-ratelimit', 'ratelimit'])
+def test_short_window_headers_spread_the_remaining_requests(family):
+    headers = {f'{family}-limit': '100', f'{family}-remaining': '6', f'{family}-reset': '30'}
+    limiter = RateLimiter(rate=5.0, max_rate=10.0, min_rate=0.01)
+    with serve({'/news': scripted((200, headers))}) as server:
+        limiter.get(f"{server.url}/news")
+    # 6 requests left over 30 seconds
+    assert limiter.rate == pytest.approx(0.2)
+
+
+def test_long_quota_window_does_not_pace():
+    headers = {'x-ratelimit-requests-limit': '10000', 'x-ratelimit-requests-remaining': '500',
+               'x-ratelimit-requests-reset': str(30 * 86400)}
+    limiter = RateLimiter(rate=5.0, max_rate=10.0, increase=0.0)
+    with serve({'/news': scripted((200, headers))}) as server:
+        limiter.get(f"{server.url}/news")
+    assert limiter.rate == pytest.approx(5.0)
+
+
+def test_exhausted_short_window_pauses_until_reset():
+    headers = {'x-ratelimit-limit': '10', 'x-ratelimit-remaining': '0', 'x-ratelimit-reset': '0.3'}
+    limiter = RateLimiter(rate=10.0, max_rate=10.0, burst=5)
+    with serve({'/news': scripted((200, headers), (200, {}))}) as server:
+        limiter.get(f"{server.url}/news")
+        started = time.monotonic()
+        limiter.get(f"{server.url}/news")
+    assert time.monotonic() - started >= 0.25
+
+
+def test_exhausted_quota_raises_instead_of_waiting():
+    headers = {'x-ratelimit-requests-limit': '500', 'x-ratelimit-requests-remaining': '0',
+               'x-ratelimit-requests-reset': str(7 * 86400)}
+    limiter = RateLimiter(rate=5.0, burst=5)
+    with serve({'/news': scripted((200, headers))}) as server:
+        assert limiter.get(f"{server.url}/news").status_code == 200
+        with pytest.raises(QuotaExhausted):
+            limiter.get(f"{server.url}/news")
+    assert server.requests['/news'] == 1
+
+
+def test_retry_after_beyond_max_window_returns_the_429_and_raises_next():
+    limiter = RateLimiter(rate=5.0, burst=5)
+    retry = {'Retry-After': str(MAX_WINDOW_SECONDS + 60)}
+    with serve({'/news': scripted((429, retry))}) as server:
+        started = time.monotonic()
+        assert limiter.get(f"{server.url}/news").status_code == 429
+        assert time.monotonic() - started < 5
+        with pytest.raises(QuotaExhausted):
+            limiter.get(f"{server.url}/news")
+    assert server.requests['/news'] == 1